@@ -1,3 +1,9 @@
+import os
+import sys
+
+# Shared scraper components (S1_DataCollecting/scraper_common)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
 BOT_NAME = 'iee'
 
 SPIDER_MODULES = ['iee.spiders']
@@ -12,11 +18,32 @@ ITEM_PIPELINES = {
    'iee.pipelines.MongoPipeline': 300,
 }
 
+# --- BROWSER RENDERING ---
+# Search pages are rendered by Chrome instances leased from the process-wide pool
+# (scraper_common.browser): the same options in every project, as the pool is shared
+DOWNLOADER_MIDDLEWARES = {
+   'scraper_common.middlewares.BrowserMiddleware': 543,
+}
+BROWSER_POOL_SIZE = 2
+BROWSER_ARGUMENTS = ["--start-maximized", "--disable-blink-features=AutomationControlled"]
+BROWSER_WARM = 1            # Browsers started before the first request
+BROWSER_MAX_PAGES = 50      # Recycle a browser after this many pages
+BROWSER_MAX_HEAP_MB = 512   # ... or when a page leaves more JS heap than this
+# One in-flight request per browser
+CONCURRENT_REQUESTS = BROWSER_POOL_SIZE
+
 # Database Connection Details
 MONGODB_SERVER = "localhost"
 MONGODB_PORT = 27017
 MONGODB_DB = "aci"
 MONGODB_COLLECTION = "articles"
 
+# Items are buffered and written with one bulk upsert per flush
+MONGODB_BUFFER_SIZE = 100
+MONGODB_FLUSH_INTERVAL = 5  # seconds
+
+# Ingest-time dedup key: normalized title (add "year" / "first_author" to be stricter)
+DEDUP_FINGERPRINT_FIELDS = ["title"]
+
 # (Optional) Disable default User-Agent if you want, 
 # but Selenium sets its own User-Agent inside the spider anyway.
\ No newline at end of file
@@ -1,12 +1,19 @@
 import subprocess
+import configparser
 import os
+import re
 import sys
 import pymongo
 import time
-import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from aci_common.export import export_collection
 
 # --- CONFIGURATION ---
-KEYWORD = "Blockchain"
+KEYWORDS = ["Blockchain"]
+# Maximum depth per (source, keyword). Crawls are incremental (scraper_common.search_spider):
+# a run stops once it reaches results stored by earlier runs, then resumes where they stopped
 PAGE_LIMITS = {
     "iee": 4,  # IEEE Xplore
     "sd":  4,  # ScienceDirect
@@ -19,76 +26,238 @@ PROJECTS = [
     ("acm_scraper", "acm")
 ]
 
-def run_spider(folder, spider_name):
-    pages = PAGE_LIMITS.get(spider_name, 1)
-    
-    print(f"\n" + "="*60)
-    print(f"   STARTING SPIDER: {spider_name.upper()}")
-    print(f"   Target: {pages} pages | Keyword: '{KEYWORD}'")
-    print("="*60)
-    
-    cmd = [
-        "scrapy", "crawl", spider_name,
-        "-a", f"keywords={KEYWORD}",
-        "-a", f"pages={pages}"
+MAX_PARALLEL = 3               # Spiders running at the same time
+SPIDER_TIMEOUT = 30 * 60       # Seconds before a spider is stopped
+BROWSERS = 3                   # Shared browser pool: Chrome instances reused by every job of the run
+STARTUP_STAGGER = 2            # --isolated only: seconds between process launches (undetected_chromedriver patches a shared binary)
+LOG_DIR = "logs"
+EXPORT_FILE = "final_data.json"  # .ndjson / .jsonl for one article per line, + .gz to compress
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_launch_lock = threading.Lock()
+
+def build_jobs(keywords, spiders, fresh=False):
+    """Job queue: every keyword x every source"""
+    return [
+        {"folder": folder, "spider": spider, "keyword": keyword, "pages": PAGE_LIMITS.get(spider, 1), "fresh": fresh}
+        for keyword in keywords
+        for folder, spider in PROJECTS
+        if spider in spiders
     ]
-    
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_path = os.path.join(script_dir, folder)
-    
+
+def read_item_count(log_path):
+    """Scrapy dumps its stats at shutdown: 'item_scraped_count': N"""
+    try:
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            match = re.findall(r"'item_scraped_count': (\d+)", f.read())
+        return int(match[-1]) if match else 0
+    except OSError:
+        return 0
+
+def run_spider(job, timeout):
+    folder, spider_name, keyword, pages = job["folder"], job["spider"], job["keyword"], job["pages"]
+    project_path = os.path.join(SCRIPT_DIR, folder)
+    result = {**job, "status": "error", "exit_code": None, "items": 0, "seconds": 0.0}
+
     if not os.path.isdir(project_path):
-            print(f"\n[ERROR] Path is not a valid directory: {project_path}")
-            return
+        print(f"[ERROR] Path is not a valid directory: {project_path}")
+        return result
+
+    # Same interpreter as this script, no shell: works identically on Windows and Linux
+    cmd = [
+        sys.executable, "-m", "scrapy", "crawl", spider_name,
+        "-a", f"keywords={keyword}",
+        "-a", f"pages={pages}",
+        "-a", f"fresh={int(job['fresh'])}"
+    ]
+
+    os.makedirs(os.path.join(SCRIPT_DIR, LOG_DIR), exist_ok=True)
+    safe_keyword = re.sub(r"\W+", "_", keyword).strip("_") or "keyword"
+    log_path = os.path.join(SCRIPT_DIR, LOG_DIR, f"{spider_name}_{safe_keyword}.log")
+    result["log"] = log_path
+
+    with _launch_lock:
+        print(f"[START] {spider_name.upper()} | Keyword: '{keyword}' | {pages} pages -> {log_path}")
+        start = time.time()
+        log_file = open(log_path, 'w', encoding='utf-8')
+        process = subprocess.Popen(cmd, cwd=project_path, stdout=log_file, stderr=subprocess.STDOUT)
+        time.sleep(STARTUP_STAGGER)
 
     try:
-        # We allow the process to run. If it returns a non-zero exit code (error),
-        # we catch it so the script doesn't stop completely.
-        subprocess.run(cmd, cwd=project_path, shell=True, check=True)
-        print(f"\n[SUCCESS] Spider '{spider_name}' completed.")
-        
-    except subprocess.CalledProcessError:
-        print(f"\n[WARNING] Spider '{spider_name}' encountered an error or was forced closed.")
-        print("Continuing to next spider...")
-    except KeyboardInterrupt:
-        print("\n[STOP] User interrupted the process.")
-        sys.exit()
+        result["exit_code"] = process.wait(timeout=timeout)
+        result["status"] = "ok" if result["exit_code"] == 0 else "failed"
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        result["status"] = "timeout"
+    finally:
+        log_file.close()
+
+    result["seconds"] = time.time() - start
+    result["items"] = read_item_count(log_path)
+    print(f"[{result['status'].upper()}] {spider_name.upper()} | '{keyword}' | "
+          f"{result['items']} items in {result['seconds']:.0f}s")
+    return result
+
+def load_project_settings(folder):
+    """Scrapy settings of a project, from the module named in its scrapy.cfg"""
+    from scrapy.settings import Settings
+    project_path = os.path.join(SCRIPT_DIR, folder)
+    config = configparser.ConfigParser()
+    config.read(os.path.join(project_path, "scrapy.cfg"))
+    if project_path not in sys.path:
+        sys.path.insert(0, project_path)
+    settings = Settings()
+    settings.setmodule(config["settings"]["default"], priority="project")
+    return settings
+
+def run_shared(jobs, parallel, timeout, browsers):
+    """
+    Every job as a crawler of this process: all of them lease pages from one warm browser pool
+    (scraper_common.browser), so no job pays a browser cold start and no port cooldown is needed.
+    The spiders' exports (blocking Mongo reads and file writes) are left out of the reactor thread:
+    export_sources() writes them once every crawler stopped.
+    """
+    from scrapy.crawler import Crawler, CrawlerProcess
+    from scrapy.spiderloader import SpiderLoader
+
+    os.makedirs(os.path.join(SCRIPT_DIR, LOG_DIR), exist_ok=True)
+    log_path = os.path.join(SCRIPT_DIR, LOG_DIR, "shared_run.log")
+    if os.path.exists(log_path):
+        os.remove(log_path)
+    log_settings = {"LOG_FILE": log_path, "LOG_LEVEL": "INFO"}
+    # Render threads wait for a free browser: leave threads for DNS and the pipelines too
+    process = CrawlerProcess({**log_settings, "REACTOR_THREADPOOL_MAXSIZE": max(10, 2 * browsers + 4)})
+
+    pending = list(jobs)
+    results = []
+    reactor_ready = []
+    spider_classes = {}
+
+    def start_next(_=None):
+        if not pending:
+            return None
+        job = pending.pop(0)
+        settings = load_project_settings(job["folder"])
+        # settings.py derives CONCURRENT_REQUESTS (the spider's page window) from its own pool size:
+        # follow --browsers here too, or the extra browsers would never get a request
+        settings.setdict({**log_settings, "BROWSER_POOL_SIZE": browsers, "CONCURRENT_REQUESTS": browsers,
+                          "CLOSESPIDER_TIMEOUT": timeout, "EXPORT_ON_CLOSE": False}, priority="cmdline")
+        spider_cls = spider_classes[job["folder"]] = SpiderLoader.from_settings(settings).load(job["spider"])
+        # Like CrawlerProcess.crawl(): the first crawler installs the reactor
+        crawler = Crawler(spider_cls, settings, init_reactor=not reactor_ready)
+        reactor_ready.append(True)
+
+        print(f"[START] {job['spider'].upper()} | Keyword: '{job['keyword']}' | {job['pages']} pages -> {log_path}")
+        start = time.time()
+
+        def finished(outcome):
+            stats = crawler.stats.get_stats() if crawler.stats else {}
+            status = "ok"
+            if outcome is not None and hasattr(outcome, "getErrorMessage"):
+                status = "failed"
+                print(f"[ERROR] {job['spider'].upper()} | '{job['keyword']}': {outcome.getErrorMessage()}")
+            elif stats.get("finish_reason") == "closespider_timeout":
+                status = "timeout"
+            result = {**job, "status": status, "exit_code": None, "items": stats.get("item_scraped_count", 0),
+                      "seconds": time.time() - start, "log": log_path}
+            results.append(result)
+            print(f"[{status.upper()}] {job['spider'].upper()} | '{job['keyword']}' | "
+                  f"{result['items']} items in {result['seconds']:.0f}s")
+            return start_next()
+
+        return process.crawl(crawler, keywords=job["keyword"], pages=job["pages"], fresh=job["fresh"]).addBoth(finished)
+
+    for _ in range(min(parallel, len(jobs))):
+        start_next()
+    process.start()
+    export_sources(spider_classes)
+    return results
+
+def export_sources(spider_classes):
+    """Per-source exports of a shared run, into each project's folder (where --isolated crawls write them)"""
+    try:
+        client = pymongo.MongoClient("mongodb://localhost:27017/")
+        collection = client["aci"]["articles"]
+        for folder, spider_cls in spider_classes.items():
+            if not spider_cls.export_file:
+                continue
+            path = os.path.join(SCRIPT_DIR, folder, spider_cls.export_file)
+            count = export_collection(collection, path, spider_cls.export_query)
+            print(f"Exported {count} {spider_cls.name.upper()} articles to '{path}'")
+        client.close()
     except Exception as e:
-        print(f"\n[CRITICAL] Unexpected error: {e}")
+        print(f"DB Error: {e}")
+
+def run_all(jobs, parallel, timeout):
+    results = []
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(run_spider, job, timeout) for job in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+def print_summary(results):
+    print(f"\n" + "="*60)
+    print(f"   CRAWL SUMMARY")
+    print("="*60)
+    print(f"{'SPIDER':<8}{'KEYWORD':<24}{'STATUS':<10}{'EXIT':<6}{'NEW':<8}{'TIME':>6}")
+    for r in sorted(results, key=lambda r: (r["keyword"], r["spider"])):
+        exit_code = "-" if r["exit_code"] is None else r["exit_code"]
+        print(f"{r['spider']:<8}{r['keyword'][:23]:<24}{r['status']:<10}{exit_code!s:<6}{r['items']:<8}{r['seconds']:>5.0f}s")
+    print(f"Total new items scraped: {sum(r['items'] for r in results)}")
 
-def export_final_json():
+def export_final_json(filename=EXPORT_FILE):
     print(f"\n" + "="*60)
     print(f"   EXPORTING FINAL DATABASE")
     print("="*60)
-    
+
     try:
         client = pymongo.MongoClient("mongodb://localhost:27017/")
         db = client["aci"]
         collection = db["articles"]
-        
-        cursor = collection.find({}, {"_id": 0})
-        articles = list(cursor)
-        
-        filename = "final_data.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, indent=4, ensure_ascii=False)
-            
-        print(f"✅ SUCCESS: Total {len(articles)} articles exported to '{filename}'")
-        
+
+        # Streamed in cursor batches: memory stays flat whatever the collection size
+        count = export_collection(collection, filename)
+
+        print(f"✅ SUCCESS: Total {count} articles exported to '{filename}'")
+
     except Exception as e:
         print(f"Error exporting JSON: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every spider for every keyword, in parallel")
+    parser.add_argument("--keywords", nargs="+", default=KEYWORDS, help="Search keywords (one job per keyword and source)")
+    parser.add_argument("--spiders", nargs="+", default=[s for _, s in PROJECTS], choices=[s for _, s in PROJECTS])
+    parser.add_argument("--parallel", type=int, default=MAX_PARALLEL, help="Spiders running at once")
+    parser.add_argument("--browsers", type=int, default=BROWSERS, help="Size of the browser pool shared by every job")
+    parser.add_argument("--isolated", action="store_true",
+                        help="One 'scrapy crawl' process (with its own browsers) per job instead of one shared process")
+    parser.add_argument("--timeout", type=int, default=SPIDER_TIMEOUT, help="Seconds before a spider is killed")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore the crawl checkpoints: crawl every page up to PAGE_LIMITS again")
+    parser.add_argument("--export", default=EXPORT_FILE, help="Final export file (.json, .ndjson/.jsonl, optionally + .gz)")
+    args = parser.parse_args()
+
     print("--- AUTOMATED DATA COLLECTION SUITE ---")
     start_time = time.time()
-    
-    # 1. Run Spiders Sequentially
-    for folder, spider in PROJECTS:
-        run_spider(folder, spider)
-        print("Cooling down for 5 seconds to free up ports...")
-        time.sleep(5)
+
+    jobs = build_jobs(args.keywords, args.spiders, args.fresh)
+    print(f"{len(jobs)} jobs ({len(args.keywords)} keywords x {len(args.spiders)} sources), {args.parallel} in parallel")
+
+    # 1. Run Spiders Concurrently
+    try:
+        if args.isolated:
+            results = run_all(jobs, max(1, args.parallel), args.timeout)
+        else:
+            results = run_shared(jobs, max(1, args.parallel), args.timeout, max(1, args.browsers))
+    except KeyboardInterrupt:
+        print("\n[STOP] User interrupted the process.")
+        sys.exit()
+    print_summary(results)
 
     # 2. Final Export
-    export_final_json()
-    
+    export_final_json(args.export)
+
     elapsed = time.time() - start_time
-    print(f"\nTotal Execution Time: {elapsed // 60:.0f}m {elapsed % 60:.0f}s")
\ No newline at end of file
+    print(f"\nTotal Execution Time: {elapsed // 60:.0f}m {elapsed % 60:.0f}s")
@@ -0,0 +1,2 @@
+# Components shared by the ieee, acm and sciencedirect Scrapy projects.
+# Each project's settings.py puts S1_DataCollecting on sys.path so this package is importable.
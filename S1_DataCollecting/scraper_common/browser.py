@@ -0,0 +1,175 @@
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# undetected_chromedriver patches one shared chromedriver binary on startup:
+# browsers are launched one at a time, even when the pool fills up from several threads
+_launch_lock = threading.Lock()
+
+DEFAULT_MAX_PAGES = 50       # A browser is recycled after serving this many pages
+DEFAULT_MAX_HEAP_MB = 512    # ... or as soon as a page leaves more JS heap than this behind
+POLL_INTERVAL = 1            # Seconds between checks while every browser is busy
+
+def new_driver(arguments=()):
+    import undetected_chromedriver as uc
+    options = uc.ChromeOptions()
+    for argument in arguments:
+        options.add_argument(argument)
+    with _launch_lock:
+        return uc.Chrome(options=options)
+
+class BrowserPool(object):
+    """
+    At most `size` Chrome instances shared by every spider of the process.
+
+    - warm: instances launched in the background as soon as the pool is created
+    - lease(): context manager checking a healthy browser out and back in;
+      acquire() blocks while every browser is busy
+    - a browser that stops answering is replaced on the next checkout
+    - a browser is recycled after `max_pages` pages, or when its JS heap exceeds `max_heap_mb`
+      (with `size` capping the number of instances, memory stays bounded on long runs)
+    """
+    def __init__(self, size=2, arguments=(), warm=0, max_pages=DEFAULT_MAX_PAGES, max_heap_mb=DEFAULT_MAX_HEAP_MB):
+        self.size = max(1, size)
+        self.arguments = list(arguments)
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self.idle = queue.Queue()
+        self.pages = {}      # driver -> pages served
+        self.live = 0        # running + launching browsers
+        self.launched = 0
+        self.recycled = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+        for _ in range(min(warm, self.size)):
+            threading.Thread(target=self._warm, daemon=True).start()
+
+    def _reserve(self):
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Browser pool is closed")
+            if self.live >= self.size:
+                return False
+            self.live += 1  # reserve the slot before the slow launch
+            return True
+
+    def _launch(self):
+        try:
+            driver = new_driver(self.arguments)
+        except Exception:
+            with self.lock:
+                self.live -= 1
+            raise
+        with self.lock:
+            self.pages[driver] = 0
+            self.launched += 1
+            closed = self.closed
+        if closed:
+            self._discard(driver)
+            raise RuntimeError("Browser pool is closed")
+        return driver
+
+    def _warm(self):
+        try:
+            if self._reserve():
+                self.idle.put(self._launch())
+        except Exception as e:
+            print(f"⚠️ Browser warm-up failed: {e}")
+
+    def _discard(self, driver):
+        with self.lock:
+            if driver not in self.pages:
+                return  # already discarded (e.g. by close() while leased)
+            del self.pages[driver]
+            self.live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass  # e.g. [WinError 6] The handle is invalid
+
+    def healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def heap_mb(self, driver):
+        """Used JS heap of the current page (Chrome only), 0 when unavailable"""
+        try:
+            return (driver.execute_script("return performance.memory.usedJSHeapSize") or 0) / 2**20
+        except Exception:
+            return 0
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    return self._launch()
+                if deadline is not None and time.time() >= deadline:
+                    raise TimeoutError(f"No browser free after {timeout}s")
+                # Short waits: a slot freed by a recycled browser must be noticed too
+                try:
+                    driver = self.idle.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            if self.healthy(driver):
+                return driver
+            print("⚠️ Browser stopped responding: replacing it")
+            self._discard(driver)
+
+    def release(self, driver):
+        with self.lock:
+            if driver not in self.pages:
+                return  # the pool was closed during the lease
+            self.pages[driver] = served = self.pages[driver] + 1
+        if served >= self.max_pages or self.heap_mb(driver) > self.max_heap_mb:
+            with self.lock:
+                self.recycled += 1
+            self._discard(driver)
+            return
+        try:
+            driver.get("about:blank")  # drop the page (DOM, scripts) while the browser waits
+        except Exception:
+            self._discard(driver)
+            return
+        self.idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def stats(self):
+        with self.lock:
+            return {"live": self.live, "idle": self.idle.qsize(), "launched": self.launched, "recycled": self.recycled}
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            drivers = list(self.pages)
+        for driver in drivers:
+            self._discard(driver)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_pool(**options):
+    """
+    The process-wide pool: every crawler of the process checks pages out of the same browsers.
+    The first caller's options configure it; it is closed when the process exits.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BrowserPool(**options)
+            atexit.register(_shared.close)
+        return _shared
@@ -0,0 +1,63 @@
+import datetime
+from scraper_common.dedup import fingerprint, FINGERPRINT_FIELD, DEFAULT_FIELDS
+
+CHECKPOINT_COLLECTION = "crawl_checkpoints"
+
+def checkpoint_id(source, keyword):
+    return f"{source}|{' '.join(keyword.lower().split())}"
+
+class CrawlCheckpoint(object):
+    """
+    Pagination state of one (source, keyword) crawl, one document in crawl_checkpoints:
+    last_page is the deepest page reached with every page before it done (over all runs),
+    with the pages / items / new items of the last run and the totals.
+    status is "running" while a spider works on it, then "done" or "interrupted".
+    """
+    def __init__(self, db, source, keyword, fingerprint_fields=DEFAULT_FIELDS, articles="articles"):
+        self.checkpoints = db[CHECKPOINT_COLLECTION]
+        self.articles = db[articles]
+        self._id = checkpoint_id(source, keyword)
+        self.source = source
+        self.keyword = keyword
+        self.fingerprint_fields = tuple(fingerprint_fields)
+        self.last_page = 0
+        self.done = set()
+
+    def load(self, fresh=False):
+        """Previous state (ignored with fresh=True) and marks the crawl as running"""
+        state = self.checkpoints.find_one({"_id": self._id}) or {}
+        self.last_page = 0 if fresh else state.get("last_page", 0)
+        self.checkpoints.update_one({"_id": self._id}, {
+            "$set": {"source": self.source, "keyword": self.keyword, "last_page": self.last_page,
+                     "status": "running", "started_at": datetime.datetime.now(),
+                     "run": {"pages": 0, "items": 0, "new_items": 0}}
+        }, upsert=True)
+        return self.last_page
+
+    def new_items(self, items):
+        """The items whose fingerprint is neither stored nor repeated earlier in the list (one query)"""
+        keyed = [(fingerprint(item, self.fingerprint_fields), item) for item in items]
+        stored = {doc[FINGERPRINT_FIELD] for doc in self.articles.find(
+            {FINGERPRINT_FIELD: {"$in": [key for key, _ in keyed]}}, {FINGERPRINT_FIELD: 1, "_id": 0}
+        )}
+        new = []
+        for key, item in keyed:
+            if key not in stored:
+                stored.add(key)
+                new.append(item)
+        return new
+
+    def page_done(self, page, items, new_items):
+        self.done.add(page)
+        while self.last_page + 1 in self.done:
+            self.last_page += 1
+        self.checkpoints.update_one({"_id": self._id}, {
+            "$set": {"last_page": self.last_page, "updated_at": datetime.datetime.now()},
+            "$inc": {"run.pages": 1, "run.items": items, "run.new_items": new_items,
+                     "total.pages": 1, "total.items": items, "total.new_items": new_items}
+        })
+
+    def finish(self, status):
+        self.checkpoints.update_one({"_id": self._id}, {
+            "$set": {"status": status, "finished_at": datetime.datetime.now()}
+        })
@@ -0,0 +1,90 @@
+import re
+import sys
+import hashlib
+import unicodedata
+import pymongo
+from pymongo import UpdateOne
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+COLLECTION_NAME = "articles"
+FINGERPRINT_FIELD = "fingerprint"
+DEFAULT_FIELDS = ("title",)   # May also include "year" and "first_author"
+
+def normalize_text(text):
+    """Casefolded, accents and punctuation stripped, whitespace collapsed"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = re.sub(r"[^\w\s]|_", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def fingerprint_parts(item, fields):
+    parts = []
+    for field in fields:
+        if field == "title":
+            parts.append(normalize_text(item.get('title')))
+        elif field == "year":
+            year = re.search(r"\b(19|20)\d{2}\b", str(item.get('date_pub') or ""))
+            parts.append(year.group(0) if year else "")
+        elif field == "first_author":
+            authors = item.get('authors') or ""
+            first = re.split(r";|,|\n", authors)[0] if isinstance(authors, str) else (authors[0] if authors else "")
+            parts.append(normalize_text(first))
+    return parts
+
+def fingerprint(item, fields=DEFAULT_FIELDS):
+    """
+    Stable dedup key for an article: the DOI when the source gives one,
+    otherwise a hash of the normalized title (plus year / first author if configured),
+    so case, whitespace and punctuation variants of the same paper collide.
+    """
+    doi = (item.get('doi') or "").strip().lower()
+    key = f"doi:{doi}" if doi else "title:" + "|".join(fingerprint_parts(item, fields))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def ensure_index(collection):
+    """Unique on fingerprint; the partial filter tolerates articles stored before fingerprints existed"""
+    collection.create_index(
+        FINGERPRINT_FIELD,
+        unique=True,
+        partialFilterExpression={FINGERPRINT_FIELD: {"$type": "string"}}
+    )
+
+def backfill(collection, fields=DEFAULT_FIELDS, batch_size=1000):
+    """
+    One-off migration for collections filled before ingest-time dedup:
+    fingerprints every article lacking one and deletes the later copies of the same paper.
+    Returns (fingerprinted, removed).
+    """
+    seen = {doc[FINGERPRINT_FIELD] for doc in collection.find({FINGERPRINT_FIELD: {"$type": "string"}}, {FINGERPRINT_FIELD: 1})}
+    updates, duplicates = [], []
+    fingerprinted = 0
+
+    cursor = collection.find({FINGERPRINT_FIELD: {"$exists": False}}).sort("_id", 1).batch_size(batch_size)
+    for doc in cursor:
+        fp = fingerprint(doc, fields)
+        if fp in seen:
+            duplicates.append(doc['_id'])
+            continue
+        seen.add(fp)
+        updates.append(UpdateOne({"_id": doc['_id']}, {"$set": {FINGERPRINT_FIELD: fp}}))
+        if len(updates) >= batch_size:
+            fingerprinted += collection.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        fingerprinted += collection.bulk_write(updates, ordered=False).modified_count
+
+    removed = collection.delete_many({"_id": {"$in": duplicates}}).deleted_count if duplicates else 0
+    ensure_index(collection)
+    return fingerprinted, removed
+
+if __name__ == "__main__":
+    # Run from S1_DataCollecting: python -m scraper_common.dedup
+    try:
+        collection = pymongo.MongoClient(MONGO_URI)[DB_NAME][COLLECTION_NAME]
+        fingerprinted, removed = backfill(collection)
+        print(f"✅ Fingerprinted {fingerprinted} articles, removed {removed} duplicates.")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
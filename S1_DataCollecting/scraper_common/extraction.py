@@ -0,0 +1,117 @@
+import re
+from parsel.csstranslator import HTMLTranslator
+
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+
+# --- EXTRACTION SPEC ---
+# One entry per source: where the results are, and the CSS of each field inside a result.
+#   wait_for      the page is ready once this is present
+#   items         one node per result: only these nodes are copied out of the browser
+#   title         first match is the title
+#   authors       one node per author name ...
+#   author_block  ... else the whole author line
+SPECS = {
+    "iee": {
+        "source": "IEEE Xplore", "journal": "IEEE", "default_year": "Unknown Date",
+        "wait_for": "div.List-results-items",
+        "items": "div.List-results-items .xpl-results-item, div.result-item",
+        "title": "h3.text-md-md-lh a, h2 a, .result-item-title a",
+        "authors": "p.author a",
+        "author_block": "p.author, .xpl-authors-name-list",
+    },
+    "acm": {
+        "source": "ACM Digital Library", "journal": "ACM", "default_year": "Unknown Date",
+        "wait_for": ".issue-item, .search-result__item",
+        "items": ".issue-item, .search-result__item",
+        "title": ".issue-item__title a, .hlFld-Title a",
+        "authors": "ul.rlist--inline li a",
+        "author_block": "ul.rlist--inline, .issue-item__detail .rlist--inline",
+    },
+    "sd": {
+        "source": "ScienceDirect", "journal": "ScienceDirect Journal", "default_year": "Unknown",
+        "wait_for": "div.result-item-content",
+        "items": "div.result-item-content",
+        "title": "a.result-list-title-link, h2",
+        "authors": "ol.authors-list li",
+        "author_block": "ol.authors-list, div.Authors",
+    },
+}
+
+SELECTOR_FIELDS = ("items", "title", "authors", "author_block")
+
+# Copies the top-level result nodes out of the page in one WebDriver call
+# (a result nested in another match is already inside its parent's HTML)
+SNAPSHOT_SCRIPT = """
+const selector = arguments[0];
+return Array.from(document.querySelectorAll(selector))
+    .filter(el => !(el.parentElement && el.parentElement.closest(selector)))
+    .map(el => el.outerHTML)
+    .join("");
+"""
+
+def compile_spec(spec):
+    """CSS -> XPath once per source, instead of once per result and field"""
+    translator = HTMLTranslator()
+    compiled = dict(spec)
+    for field in SELECTOR_FIELDS:
+        compiled[field] = translator.css_to_xpath(spec[field], prefix="descendant-or-self::")
+    return compiled
+
+COMPILED_SPECS = {name: compile_spec(spec) for name, spec in SPECS.items()}
+
+def snapshot_html(driver, selector):
+    """The results of the current page as a small standalone document: <body> holds one node per result"""
+    return "<html><body>%s</body></html>" % (driver.execute_script(SNAPSHOT_SCRIPT, selector) or "")
+
+def node_text(selector, separator=""):
+    """
+    Visible text of a node, whitespace collapsed (what WebElement.text returned).
+    Inline fields join text nodes as-is ("Art<b>Chain</b>:" -> "ArtChain:"); use separator=" "
+    for whole containers, whose blocks would otherwise run together.
+    """
+    if selector is None:
+        return ""
+    return re.sub(r"\s+", " ", separator.join(selector.xpath(".//text()").getall())).strip()
+
+def find_year(text, default="Unknown"):
+    match = YEAR_RE.search(text or "")
+    return match.group(0) if match else default
+
+def join_authors(names):
+    """Author names (or already ';'-separated blocks) in the 'Name1;Name2' form the ETL splits on"""
+    names = [part.strip(" ,") for name in names for part in name.split(";")]
+    return ";".join(n for n in names if n) or "Unknown"
+
+def authors_text(container, name_xpath, block_xpath):
+    """One entry per author link when the source marks them up, else the whole author block"""
+    names = [node_text(a) for a in container.xpath(name_xpath)]
+    return join_authors(names or [node_text(container.xpath(block_xpath)[:1])])
+
+def top_level(containers):
+    """Drops matches nested in another match, like SNAPSHOT_SCRIPT does in the browser"""
+    roots = {c.root for c in containers}
+    return [c for c in containers if not any(a in roots for a in c.root.iterancestors())]
+
+def extract_results(response, source):
+    """
+    Article fields of every result on a page, parsed locally with the source's compiled spec.
+    Works on a snapshot (see snapshot_html) as well as on a full page.
+    """
+    spec = COMPILED_SPECS[source]
+    if response.meta.get("snapshot"):
+        containers = response.xpath("/html/body/*")
+    else:
+        containers = top_level(response.xpath(spec["items"]))
+
+    for container in containers:
+        title = node_text(container.xpath(spec["title"])[:1])
+        if not title:
+            continue
+        yield {
+            "title": title,
+            "authors": authors_text(container, spec["authors"], spec["author_block"]),
+            "date_pub": find_year(node_text(container, " "), spec["default_year"]),
+            "source": spec["source"],
+            "journal": spec["journal"],
+            "abstract_": "N/A",
+        }
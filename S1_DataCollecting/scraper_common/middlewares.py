@@ -0,0 +1,81 @@
+from scrapy import signals, Request
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse
+from twisted.internet.threads import deferToThread
+from scraper_common.browser import shared_pool, DEFAULT_MAX_PAGES, DEFAULT_MAX_HEAP_MB
+from scraper_common.extraction import snapshot_html
+
+DEFAULT_WAIT_TIMEOUT = 20
+
+def browser_request(url, callback, wait_for, timeout=DEFAULT_WAIT_TIMEOUT, scroll=True, snapshot=None, **meta):
+    """
+    A Scrapy request rendered by BrowserMiddleware: returned once `wait_for` (CSS) is on the page.
+    With `snapshot` (CSS), the response body only holds the matching nodes, copied in one call.
+    """
+    return Request(url, callback=callback, dont_filter=True, meta={
+        "browser": True, "wait_for": wait_for, "wait_timeout": timeout, "scroll": scroll, "snapshot": snapshot, **meta
+    })
+
+class BrowserMiddleware(object):
+    """
+    Renders requests flagged meta["browser"] in a Chrome leased from the process-wide pool,
+    off the reactor thread, so up to BROWSER_POOL_SIZE pages load in parallel while Scrapy keeps
+    scheduling. Every crawler of the process (run_all_spiders.py runs them in one) shares the browsers.
+    Pages are waited for with explicit conditions (the results selector, document ready)
+    and handed to the spider as an HtmlResponse parsed with ordinary selectors: the results nodes
+    only (meta["snapshot"]) or the whole page.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pool = shared_pool(
+            size=settings.getint('BROWSER_POOL_SIZE', 2),
+            arguments=settings.getlist('BROWSER_ARGUMENTS', ["--start-maximized"]),
+            warm=settings.getint('BROWSER_WARM', 1),
+            max_pages=settings.getint('BROWSER_MAX_PAGES', DEFAULT_MAX_PAGES),
+            max_heap_mb=settings.getint('BROWSER_MAX_HEAP_MB', DEFAULT_MAX_HEAP_MB)
+        )
+        middleware = cls(pool)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_request(self, request, spider):
+        if not request.meta.get("browser"):
+            return None
+        return deferToThread(self.render, request, spider)
+
+    def render(self, request, spider):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        with self.pool.lease() as driver:
+            driver.get(request.url)
+            try:
+                WebDriverWait(driver, request.meta.get("wait_timeout", DEFAULT_WAIT_TIMEOUT)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, request.meta["wait_for"]))
+                )
+            except TimeoutException:
+                screenshot = f"debug_{spider.name}_{request.meta.get('page', 'page')}.png"
+                driver.save_screenshot(screenshot)
+                raise IgnoreRequest(f"Timed out waiting for '{request.meta['wait_for']}' on {request.url} "
+                                    f"(CAPTCHA? see {screenshot})")
+
+            if request.meta.get("scroll"):
+                # Lazy-loaded results: scroll once, then wait for the document to settle
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                WebDriverWait(driver, 5).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+            if request.meta.get("snapshot"):
+                body = snapshot_html(driver, request.meta["snapshot"])
+            else:
+                body = driver.page_source
+            return HtmlResponse(driver.current_url, body=body, encoding="utf-8", request=request)
+
+    def spider_closed(self, spider):
+        # The browsers stay up for the next crawler; the pool closes itself at process exit
+        spider.logger.info(f"Browser pool: {self.pool.stats()}")
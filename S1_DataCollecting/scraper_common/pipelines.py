@@ -0,0 +1,111 @@
+import time
+import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from twisted.internet import task
+from scraper_common.dedup import fingerprint, ensure_index, FINGERPRINT_FIELD, DEFAULT_FIELDS
+
+DUPLICATE_KEY_ERROR = 11000
+
+class MongoPipeline(object):
+    """
+    Buffers scraped items and writes them with one unordered bulk_write of upserts.
+    The buffer is flushed when it reaches MONGODB_BUFFER_SIZE items, every
+    MONGODB_FLUSH_INTERVAL seconds, and when the spider closes.
+    Dedup happens at ingest: each item gets a normalized fingerprint backed by a unique index,
+    and items whose fingerprint is already stored are left untouched and counted as duplicates.
+    """
+    def __init__(self, mongo_uri, mongo_db, mongo_collection, buffer_size=100, flush_interval=5.0,
+                 fingerprint_fields=DEFAULT_FIELDS, stats=None):
+        self.mongo_uri = mongo_uri
+        self.mongo_db = mongo_db
+        self.mongo_collection = mongo_collection
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fingerprint_fields = tuple(fingerprint_fields)
+        self.stats = stats
+
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.counts = {"inserted": 0, "duplicates": 0, "failed": 0}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # Pulls database settings from settings.py
+        return cls(
+            mongo_uri=f"mongodb://{crawler.settings.get('MONGODB_SERVER')}:{crawler.settings.get('MONGODB_PORT')}",
+            mongo_db=crawler.settings.get('MONGODB_DB', 'items'),
+            mongo_collection=crawler.settings.get('MONGODB_COLLECTION', 'items'),
+            buffer_size=crawler.settings.getint('MONGODB_BUFFER_SIZE', 100),
+            flush_interval=crawler.settings.getfloat('MONGODB_FLUSH_INTERVAL', 5.0),
+            fingerprint_fields=crawler.settings.getlist('DEDUP_FINGERPRINT_FIELDS', list(DEFAULT_FIELDS)),
+            stats=crawler.stats
+        )
+
+    def open_spider(self, spider):
+        self.spider = spider
+        self.client = pymongo.MongoClient(self.mongo_uri)
+        self.collection = self.client[self.mongo_db][self.mongo_collection]
+        ensure_index(self.collection)
+        if self.collection.count_documents({FINGERPRINT_FIELD: {"$exists": False}}, limit=1):
+            spider.logger.warning("MongoPipeline: some articles have no fingerprint yet, "
+                                  "run 'python -m scraper_common.dedup' once from S1_DataCollecting")
+        # Time-based flush for spiders that yield slowly
+        self.flusher = task.LoopingCall(self.flush_if_due)
+        self.flusher.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        if self.flusher.running:
+            self.flusher.stop()
+        self.flush()
+        spider.logger.info(
+            f"MongoPipeline: {self.counts['inserted']} inserted, "
+            f"{self.counts['duplicates']} duplicates, {self.counts['failed']} failed"
+        )
+        self.client.close()
+
+    def process_item(self, item, spider):
+        doc = dict(item)
+        doc[FINGERPRINT_FIELD] = fingerprint(doc, self.fingerprint_fields)
+        self.buffer.append(doc)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return item
+
+    def flush_if_due(self):
+        if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        docs, self.buffer = self.buffer, []
+
+        # $setOnInsert: an existing article is never overwritten by a later duplicate
+        requests = [UpdateOne({FINGERPRINT_FIELD: d[FINGERPRINT_FIELD]}, {"$setOnInsert": d}, upsert=True) for d in docs]
+        try:
+            result = self.collection.bulk_write(requests, ordered=False)
+            self.record(inserted=result.upserted_count, duplicates=len(docs) - result.upserted_count)
+        except BulkWriteError as e:
+            details = e.details
+            errors = details.get('writeErrors', [])
+            # Concurrent crawls may race on the same key: the loser is just another duplicate
+            dup_errors = sum(1 for err in errors if err.get('code') == DUPLICATE_KEY_ERROR)
+            failed = len(errors) - dup_errors
+            inserted = details.get('nUpserted', 0)
+            self.record(inserted=inserted, duplicates=len(docs) - inserted - failed, failed=failed)
+            for err in errors:
+                if err.get('code') != DUPLICATE_KEY_ERROR:
+                    self.spider.logger.error(f"MongoPipeline write error: {err.get('errmsg')}")
+        except Exception as e:
+            self.record(failed=len(docs))
+            self.spider.logger.error(f"MongoPipeline flush of {len(docs)} items failed: {e}")
+
+    def record(self, inserted=0, duplicates=0, failed=0):
+        for name, value in (("inserted", inserted), ("duplicates", duplicates), ("failed", failed)):
+            self.counts[name] += value
+            if self.stats is not None and value:
+                self.stats.inc_value(f"mongodb/{name}", value)
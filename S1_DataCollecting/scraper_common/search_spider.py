@@ -0,0 +1,120 @@
+import scrapy
+from scrapy import signals
+import pymongo
+from scraper_common.checkpoint import CrawlCheckpoint
+from scraper_common.dedup import DEFAULT_FIELDS
+from scraper_common.extraction import SPECS, extract_results
+from scraper_common.middlewares import browser_request
+
+class SearchSpider(scrapy.Spider):
+    """
+    Paginated search of one source for one keyword, resumable through a CrawlCheckpoint.
+
+    Pages are fetched in order, CONCURRENT_REQUESTS at a time, up to `pages`:
+    1. from page 1 until a page brings nothing new (new results come first): the rest of the
+       pages the previous runs already covered is skipped;
+    2. then from the checkpoint's last page onwards, which resumes a crawl that died half way.
+    Only items not stored yet are yielded. fresh=1 ignores the checkpoint and crawls every page.
+
+    Subclasses set `name` (a key of extraction.SPECS), `item_class` and implement page_url(page).
+    `export_file` / `export_query`: the source's JSON export, written by spider_closed, or by
+    run_all_spiders.py once a shared run stopped (EXPORT_ON_CLOSE = False).
+    """
+    item_class = None
+    request_options = {}
+    export_file = None
+    export_query = {}
+
+    def __init__(self, keywords="Blockchain", pages=3, fresh=False, *args, **kwargs):
+        super(SearchSpider, self).__init__(*args, **kwargs)
+        self.keywords = keywords
+        self.max_pages = int(pages)
+        self.fresh = str(fresh).lower() in ("1", "true", "yes")
+        self.failed = False
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(SearchSpider, cls).from_crawler(crawler, *args, **kwargs)
+        settings = crawler.settings
+        if settings.getbool('EXPORT_ON_CLOSE', True):
+            crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        # Checkpoint and "already stored" lookups; closed with the spider (closed())
+        spider.mongo_client = pymongo.MongoClient(f"mongodb://{settings.get('MONGODB_SERVER')}:{settings.get('MONGODB_PORT')}")
+        spider.checkpoint = CrawlCheckpoint(
+            spider.mongo_client[settings.get('MONGODB_DB', 'aci')], spider.name, spider.keywords,
+            fingerprint_fields=settings.getlist('DEDUP_FINGERPRINT_FIELDS', list(DEFAULT_FIELDS)),
+            articles=settings.get('MONGODB_COLLECTION', 'articles')
+        )
+        spider.window = max(1, settings.getint('CONCURRENT_REQUESTS', 2))
+        return spider
+
+    def page_url(self, page):
+        raise NotImplementedError
+
+    async def start(self):
+        # Scrapy >= 2.13 entry point; older versions call start_requests() directly
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        last_page = self.checkpoint.load(fresh=self.fresh)
+        self.resume_from = last_page + 1
+        self.next_page = 1
+        self.in_flight = 0
+        if last_page:
+            self.logger.info(f"Checkpoint: pages 1-{last_page} already crawled for '{self.keywords}'. "
+                             f"Looking for new results, then resuming at page {self.resume_from}.")
+        for request in self.schedule():
+            yield request
+
+    def schedule(self):
+        while self.in_flight < self.window and self.next_page <= self.max_pages:
+            page = self.next_page
+            self.next_page += 1
+            self.in_flight += 1
+            request = browser_request(
+                self.page_url(page), self.parse_results, page=page,
+                wait_for=SPECS[self.name]["wait_for"], snapshot=SPECS[self.name]["items"], **self.request_options
+            )
+            yield request.replace(errback=self.page_failed)
+
+    def parse_results(self, response):
+        page = response.meta["page"]
+        self.in_flight -= 1
+        items = list(extract_results(response, self.name))
+        new = self.checkpoint.new_items(items)
+        self.checkpoint.page_done(page, len(items), len(new))
+        self.crawler.stats.inc_value("checkpoint/new_items", len(new))
+        self.logger.info(f"Page {page}: found {len(items)} articles, {len(new)} new.")
+
+        if not items:
+            self.next_page = self.max_pages + 1  # past the last page of results
+        elif not new and page < self.resume_from:
+            # Caught up with what the previous runs stored: skip to where they stopped
+            self.next_page = max(self.next_page, self.resume_from)
+
+        for fields in new:
+            yield self.item_class(fields)
+        for request in self.schedule():
+            yield request
+
+    def page_failed(self, failure):
+        # CAPTCHA / timeout: later pages would most likely fail too, the next run resumes here
+        self.in_flight -= 1
+        self.failed = True
+        self.next_page = self.max_pages + 1
+        self.logger.error(f"Page {failure.request.meta['page']} failed, crawl stopped "
+                          f"(resumes after page {self.checkpoint.last_page} next run): {failure.getErrorMessage()}")
+
+    def closed(self, reason):
+        status = "done" if reason == "finished" and not self.failed else "interrupted"
+        try:
+            self.checkpoint.finish(status)
+        finally:
+            # Spiders of a shared CrawlerProcess run in one process: don't leave a pool per spider behind
+            self.mongo_client.close()
+        self.crawler.stats.set_value("checkpoint/last_page", self.checkpoint.last_page)
+        self.logger.info(f"Checkpoint {status}: pages 1-{self.checkpoint.last_page} crawled for '{self.keywords}'.")
+
+    def spider_closed(self, spider):
+        pass
@@ -0,0 +1,127 @@
+import sys
+import argparse
+from datetime import datetime, timezone
+from pymongo import MongoClient
+# Collections and dimensions shared with the API's read side (S3_BI_API/cube.py)
+from aci_common.warehouse import (FACT_COLLECTION, META_COLLECTION, CUBE_COLLECTION, KEYWORD_CUBE_COLLECTION,
+                                  AUTHOR_CUBE_COLLECTION, CUBE_DIMENSIONS)
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+
+def dims_key():
+    """Group key over the cube dimensions (missing values become null so cells can be matched)"""
+    return {d: {"$ifNull": [f"${d}", None]} for d in CUBE_DIMENSIONS}
+
+def dims_projection():
+    return {d: f"$_id.{d}" for d in CUBE_DIMENSIONS}
+
+def cube_stages():
+    """One cell per dimension combination with additive measures only (averages are derived on read)"""
+    return [
+        {"$group": {
+            "_id": dims_key(),
+            "count": {"$sum": 1},
+            "citations": {"$sum": "$citations"},
+            "impact_sum": {"$sum": "$impact_score"},
+            "impact_n": {"$sum": {"$cond": [{"$isNumber": "$impact_score"}, 1, 0]}},
+            "authors": {"$sum": "$nb_authors"}
+        }},
+        {"$project": {"_id": 0, **dims_projection(),
+                      "count": 1, "citations": 1, "impact_sum": 1, "impact_n": 1, "authors": 1}}
+    ]
+
+def keyword_cube_stages():
+    return [
+        {"$unwind": "$generated_keywords"},
+        {"$group": {
+            "_id": {**dims_key(), "keyword": "$generated_keywords"},
+            "weight": {"$sum": 1}
+        }},
+        {"$project": {"_id": 0, **dims_projection(), "keyword": "$_id.keyword", "weight": 1}}
+    ]
+
+def author_cube_stages():
+    # Same cleaning as the live /api/olap/authors pipeline
+    return [
+        {"$unwind": "$authors_clean"},
+        {"$project": {**{d: 1 for d in CUBE_DIMENSIONS},
+                      "author": {"$trim": {"input": "$authors_clean", "chars": "\n "}}}},
+        {"$match": {"author": {"$ne": "Unknown"}}},
+        {"$group": {
+            "_id": {**dims_key(), "author": "$author"},
+            "count": {"$sum": 1}
+        }},
+        {"$project": {"_id": 0, **dims_projection(), "author": "$_id.author", "count": 1}}
+    ]
+
+CUBES = [
+    (CUBE_COLLECTION, cube_stages),
+    (KEYWORD_CUBE_COLLECTION, keyword_cube_stages),
+    (AUTHOR_CUBE_COLLECTION, author_cube_stages),
+]
+
+def changed_cells(fact, since):
+    """Dimension combinations touched by fact rows written after `since`"""
+    pipeline = [
+        {"$match": {"etl_timestamp": {"$gt": since}}},
+        {"$group": {"_id": dims_key()}}
+    ]
+    return [doc["_id"] for doc in fact.aggregate(pipeline)]
+
+def refresh_cube(db, since=None):
+    """
+    Materializes the OLAP cube from fact_publications.
+    - since=None: full rebuild ($out atomically replaces each cube collection)
+    - since=<datetime>: only the cells containing rows newer than `since` are recomputed
+    Returns the number of cells in the main cube.
+    """
+    fact = db[FACT_COLLECTION]
+
+    if since is None:
+        for name, stages in CUBES:
+            fact.aggregate(stages() + [{"$out": name}])
+    else:
+        cells = changed_cells(fact, since)
+        if cells:
+            cell_filter = {"$or": cells}
+            for name, stages in CUBES:
+                db[name].delete_many(cell_filter)
+                fact.aggregate([{"$match": cell_filter}] + stages() +
+                               [{"$merge": {"into": name, "whenNotMatched": "insert"}}])
+
+    for name, _ in CUBES:
+        db[name].create_index([(d, 1) for d in CUBE_DIMENSIONS])
+    # Keyword drill-downs: one keyword's cells, per year / country
+    db[KEYWORD_CUBE_COLLECTION].create_index([("keyword", 1)] + [(d, 1) for d in CUBE_DIMENSIONS])
+
+    latest = fact.find_one({}, {"etl_timestamp": 1}, sort=[("etl_timestamp", -1)])
+    cell_count = db[CUBE_COLLECTION].count_documents({})
+    db[META_COLLECTION].replace_one(
+        {"_id": "cube"},
+        {
+            "_id": "cube",
+            "built_at": datetime.now(timezone.utc),
+            "etl_timestamp": latest.get("etl_timestamp") if latest else None,
+            "cells": cell_count,
+            "dimensions": CUBE_DIMENSIONS
+        },
+        upsert=True
+    )
+    return cell_count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the pre-aggregated OLAP cube from fact_publications")
+    parser.add_argument("--since", help="ISO timestamp: only refresh cells with rows newer than this etl_timestamp")
+    args = parser.parse_args()
+
+    print("--- BUILDING OLAP CUBE ---")
+    try:
+        client = MongoClient(MONGO_URI)
+        since = datetime.fromisoformat(args.since) if args.since else None
+        cells = refresh_cube(client[DB_NAME], since=since)
+        print(f"✅ SUCCESS: Cube '{CUBE_COLLECTION}' holds {cells} cells.")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,78 @@
+import sys
+import argparse
+from datetime import datetime, timezone
+from pymongo import MongoClient
+# Inverted keyword index: one posting per (keyword, paper) with the paper's cube dimensions and citations.
+# Keyword clouds come from cube_keywords (build_cube.py); the postings serve keyword drill-downs.
+from aci_common.warehouse import FACT_COLLECTION, META_COLLECTION, POSTINGS_COLLECTION, CUBE_DIMENSIONS
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+
+def posting_stages():
+    return [
+        {"$unwind": "$generated_keywords"},
+        {"$project": {
+            "_id": 0,
+            "keyword": "$generated_keywords",
+            "paper": "$_id",
+            **{d: {"$ifNull": [f"${d}", None]} for d in CUBE_DIMENSIONS},
+            "citations": {"$ifNull": ["$citations", 0]}
+        }}
+    ]
+
+def changed_papers(fact, since):
+    return [doc["_id"] for doc in fact.find({"etl_timestamp": {"$gt": since}}, {"_id": 1})]
+
+def refresh_keyword_index(db, since=None):
+    """
+    Builds the keyword -> papers postings from fact_publications.generated_keywords.
+    - since=None: full rebuild ($out atomically replaces the collection)
+    - since=<datetime>: the postings of papers written after `since` are replaced
+    Returns (distinct keywords, postings).
+    """
+    fact = db[FACT_COLLECTION]
+    postings = db[POSTINGS_COLLECTION]
+
+    if since is None:
+        fact.aggregate(posting_stages() + [{"$out": POSTINGS_COLLECTION}])
+    else:
+        papers = changed_papers(fact, since)
+        if papers:
+            postings.delete_many({"paper": {"$in": papers}})
+            fact.aggregate([{"$match": {"_id": {"$in": papers}}}] + posting_stages() +
+                           [{"$merge": {"into": POSTINGS_COLLECTION, "whenNotMatched": "insert"}}])
+
+    postings.create_index([("keyword", 1)] + [(d, 1) for d in CUBE_DIMENSIONS[:3]])
+    postings.create_index([("keyword", 1), ("citations", -1)])
+    postings.create_index([("paper", 1)])
+
+    keyword_count = next(postings.aggregate([{"$group": {"_id": "$keyword"}}, {"$count": "n"}]), {}).get("n", 0)
+    posting_count = postings.estimated_document_count()
+    db[META_COLLECTION].replace_one(
+        {"_id": "keywords"},
+        {
+            "_id": "keywords",
+            "built_at": datetime.now(timezone.utc),
+            "keywords": keyword_count,
+            "postings": posting_count
+        },
+        upsert=True
+    )
+    return keyword_count, posting_count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the keyword inverted index from fact_publications")
+    parser.add_argument("--since", help="ISO timestamp: only re-index papers with rows newer than this etl_timestamp")
+    args = parser.parse_args()
+
+    print("--- BUILDING KEYWORD INDEX ---")
+    try:
+        client = MongoClient(MONGO_URI)
+        since = datetime.fromisoformat(args.since) if args.since else None
+        keywords, postings = refresh_keyword_index(client[DB_NAME], since=since)
+        print(f"✅ SUCCESS: {keywords} keywords, {postings} postings in '{POSTINGS_COLLECTION}'.")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
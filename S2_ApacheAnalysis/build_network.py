@@ -0,0 +1,139 @@
+import sys
+import argparse
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+from pymongo import MongoClient, InsertOne
+# Co-authorship adjacency index, weighted per cube cell (year x country x quartile x source)
+from aci_common.warehouse import (FACT_COLLECTION, META_COLLECTION, AUTHOR_COLLECTION, NODE_COLLECTION,
+                                  EDGE_COLLECTION, CUBE_DIMENSIONS)
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+WRITE_BATCH_SIZE = 5000
+
+def clean_authors(raw_authors):
+    """Same cleaning as the API: trimmed, newlines removed, 'Unknown' and blanks dropped"""
+    names = (a.strip().replace("\n", "") for a in raw_authors or [] if a)
+    return [n for n in names if n and n != "Unknown"]
+
+class AuthorInterner:
+    """Maps author names to dense integer ids, stable across incremental runs"""
+    def __init__(self, existing=None):
+        self.ids = dict(existing or {})
+        self.next_id = max(self.ids.values(), default=-1) + 1
+        self.new_names = []
+
+    def intern(self, name):
+        author_id = self.ids.get(name)
+        if author_id is None:
+            author_id = self.ids[name] = self.next_id
+            self.next_id += 1
+            self.new_names.append((author_id, name))
+        return author_id
+
+def accumulate(papers, interner):
+    """
+    Builds the per-cell node and edge weights with integer ids only:
+    each pair is counted once per paper, always as (smaller id, larger id).
+    """
+    node_weights = Counter()
+    edge_weights = Counter()
+    for paper in papers:
+        cell = tuple(paper.get(d) for d in CUBE_DIMENSIONS)
+        ids = sorted({interner.intern(name) for name in clean_authors(paper.get("authors_clean"))})
+        for a in ids:
+            node_weights[cell + (a,)] += 1
+        for a, b in itertools.combinations(ids, 2):
+            edge_weights[cell + (a, b)] += 1
+    return node_weights, edge_weights
+
+def write_batched(coll, docs):
+    batch = []
+    for doc in docs:
+        batch.append(InsertOne(doc))
+        if len(batch) >= WRITE_BATCH_SIZE:
+            coll.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        coll.bulk_write(batch, ordered=False)
+
+def cell_doc(key):
+    return dict(zip(CUBE_DIMENSIONS, key))
+
+def changed_cells(fact, since):
+    pipeline = [
+        {"$match": {"etl_timestamp": {"$gt": since}}},
+        {"$group": {"_id": {d: {"$ifNull": [f"${d}", None]} for d in CUBE_DIMENSIONS}}}
+    ]
+    return [doc["_id"] for doc in fact.aggregate(pipeline)]
+
+def refresh_network(db, since=None):
+    """
+    Builds the co-authorship adjacency index from fact_publications.
+    - since=None: full rebuild into staging collections, swapped in with renameCollection
+    - since=<datetime>: only the cells containing rows newer than `since` are recomputed;
+      author ids already handed out are kept so existing edges stay valid
+    Returns (number of authors, number of edge rows).
+    """
+    fact = db[FACT_COLLECTION]
+    projection = {d: 1 for d in CUBE_DIMENSIONS}
+    projection["authors_clean"] = 1
+
+    if since is None:
+        interner = AuthorInterner()
+        node_weights, edge_weights = accumulate(fact.find({}, projection), interner)
+
+        staging = {name: db[f"{name}_staging"] for name in (AUTHOR_COLLECTION, NODE_COLLECTION, EDGE_COLLECTION)}
+        for coll in staging.values():
+            coll.drop()
+        write_batched(staging[AUTHOR_COLLECTION], ({"_id": i, "name": n} for i, n in interner.new_names))
+        write_batched(staging[NODE_COLLECTION], ({**cell_doc(k[:-1]), "a": k[-1], "w": w} for k, w in node_weights.items()))
+        write_batched(staging[EDGE_COLLECTION], ({**cell_doc(k[:-2]), "a": k[-2], "b": k[-1], "w": w} for k, w in edge_weights.items()))
+        for name, coll in staging.items():
+            if coll.estimated_document_count():
+                coll.rename(name, dropTarget=True)
+            else:
+                db[name].drop()  # Nothing to rename: an empty rebuild empties the index
+    else:
+        cells = changed_cells(fact, since)
+        if cells:
+            cell_filter = {"$or": cells}
+            existing = {doc["name"]: doc["_id"] for doc in db[AUTHOR_COLLECTION].find()}
+            interner = AuthorInterner(existing)
+            node_weights, edge_weights = accumulate(fact.find(cell_filter, projection), interner)
+
+            db[NODE_COLLECTION].delete_many(cell_filter)
+            db[EDGE_COLLECTION].delete_many(cell_filter)
+            write_batched(db[AUTHOR_COLLECTION], ({"_id": i, "name": n} for i, n in interner.new_names))
+            write_batched(db[NODE_COLLECTION], ({**cell_doc(k[:-1]), "a": k[-1], "w": w} for k, w in node_weights.items()))
+            write_batched(db[EDGE_COLLECTION], ({**cell_doc(k[:-2]), "a": k[-2], "b": k[-1], "w": w} for k, w in edge_weights.items()))
+
+    dims_index = [(d, 1) for d in CUBE_DIMENSIONS]
+    db[NODE_COLLECTION].create_index(dims_index + [("a", 1)])
+    db[EDGE_COLLECTION].create_index(dims_index + [("a", 1), ("b", 1)])
+
+    authors = db[AUTHOR_COLLECTION].estimated_document_count()
+    edges = db[EDGE_COLLECTION].estimated_document_count()
+    db[META_COLLECTION].replace_one(
+        {"_id": "network"},
+        {"_id": "network", "built_at": datetime.now(timezone.utc), "authors": authors, "edges": edges},
+        upsert=True
+    )
+    return authors, edges
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the co-authorship adjacency index from fact_publications")
+    parser.add_argument("--since", help="ISO timestamp: only refresh cells with rows newer than this etl_timestamp")
+    args = parser.parse_args()
+
+    print("--- BUILDING CO-AUTHOR NETWORK INDEX ---")
+    try:
+        client = MongoClient(MONGO_URI)
+        since = datetime.fromisoformat(args.since) if args.since else None
+        authors, edges = refresh_network(client[DB_NAME], since=since)
+        print(f"✅ SUCCESS: {authors} authors, {edges} weighted edges.")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,122 @@
+"""
+Fact-table transformations for the Spark ETL, written as native Spark SQL expressions
+(no Python UDFs): rows never leave the JVM, so the transform stage scales with the executor cores.
+The simulated dimensions keep the distributions of the former random.choices / random.uniform UDFs,
+but are a deterministic function of a stable article key (hash-seeded, not rand()): re-running the ETL
+assigns every paper the same country, quartile and impact, so outputs, partitions and caches stay stable.
+"""
+from pyspark.sql import functions as F
+from pyspark.sql.types import IntegerType
+# Stoplist and keyword length, shared with the Python copy of keywords_expr (aci_common.keywords)
+from aci_common.keywords import KEYWORD_STOPWORDS, KEYWORD_MIN_LENGTH
+
+# --- CONFIGURATION ---
+ETL_SEED = 42
+
+QUARTILES = ["Q1", "Q2", "Q3", "Q4"]
+QUARTILE_WEIGHTS = [25, 35, 25, 15]
+
+COUNTRIES = ["USA", "China", "India", "UK", "France", "Germany", "Morocco", "Canada", "Japan"]
+COUNTRY_WEIGHTS = [20, 18, 15, 10, 8, 8, 5, 5, 11]
+
+IMPACT_MIN, IMPACT_MAX = 0.5, 15.0
+
+# Columns whose values define a fact row's content (content_hash; etl_timestamp is excluded on purpose)
+CONTENT_COLUMNS = ["title", "authors_clean", "date_pub", "source", "journal", "quartile", "country",
+                   "impact_score", "citations", "generated_keywords"]
+
+HASH_RANGE = 1 << 53  # doubles represent every integer below 2^53 exactly
+
+# Author string "Name1;\nName2" -> Array ["Name1", "Name2"]
+AUTHOR_SEPARATOR = ";\\\\n|;"
+
+def weighted_choice(r, values, weights):
+    """CASE WHEN over the cumulative weights: r is a uniform [0, 1) column"""
+    total = float(sum(weights))
+    expr, cumulative = F, 0
+    for value, weight in zip(values[:-1], weights[:-1]):
+        cumulative += weight
+        expr = expr.when(r < cumulative / total, value)
+    return expr.otherwise(values[-1])
+
+def article_key(df):
+    """Stable identity of a paper: the ingest fingerprint (DOI / normalized title), else title, else _id"""
+    candidates = [F.col(c).cast("string") for c in ("fingerprint", "title") if c in df.columns]
+    return F.coalesce(*candidates, F.col("_id").cast("string"))
+
+def hashed_uniform(key, salt, seed=ETL_SEED):
+    """Uniform [0, 1) value derived from the key: same key, salt and seed -> same value on every run"""
+    return F.pmod(F.xxhash64(F.lit(seed), F.lit(salt), key), F.lit(HASH_RANGE)) / float(HASH_RANGE)
+
+def content_hash(df):
+    return F.xxhash64(*[F.col(c) for c in CONTENT_COLUMNS if c in df.columns])
+
+def load_stopwords(path=None):
+    """Default stoplist, extended with one word per line from `path` (e.g. KEYWORD_STOPWORDS_FILE)"""
+    words = set(KEYWORD_STOPWORDS)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            words |= {line.strip().lower() for line in f if line.strip() and not line.startswith("#")}
+    return sorted(words)
+
+def tokenize(text):
+    """Lowercased tokens with every punctuation / symbol run treated as a separator ("ArtChain:" -> "artchain")"""
+    cleaned = F.trim(F.regexp_replace(F.lower(F.coalesce(text, F.lit(""))), "[^\\p{L}\\p{N}]+", " "))
+    return F.split(cleaned, " ")
+
+def stem(w):
+    """
+    Light English stemmer (plural folding, Porter step 1a style) that keeps the stems readable:
+    "contracts" -> "contract", "processes" -> "process", "policies" -> "policy"; "analysis", "bus" untouched.
+    """
+    return F.when(w.rlike("sses$"), F.regexp_replace(w, "sses$", "ss")) \
+        .when(w.rlike("ies$") & (F.length(w) > 4), F.regexp_replace(w, "ies$", "y")) \
+        .when(w.rlike("(ss|us|is)$"), w) \
+        .when(w.rlike("s$") & (F.length(w) > KEYWORD_MIN_LENGTH), F.regexp_replace(w, "s$", "")) \
+        .otherwise(w)
+
+def keywords_expr(title, stopwords=KEYWORD_STOPWORDS):
+    """
+    Distinct keywords of a title: stemmed unigrams, plus bigram phrases of two adjacent kept tokens
+    (no stopword in between), in display case: "Smart Contracts" -> ["Smart", "Contract", "Smart Contract"].
+    aci_common.keywords.title_keywords is the same extraction in plain Python.
+    """
+    tokens = tokenize(title)
+
+    def keep(w):
+        return (F.length(w) >= KEYWORD_MIN_LENGTH) & ~w.isin(stopwords) & ~w.rlike("^[0-9]+$")
+
+    unigrams = F.transform(F.filter(tokens, keep), stem)
+    bigrams = F.filter(
+        F.transform(tokens, lambda w, i: F.when(
+            (i + 1 < F.size(tokens)) & keep(w) & keep(F.element_at(tokens, i + 2)),
+            F.concat_ws(" ", stem(w), stem(F.element_at(tokens, i + 2)))
+        )),
+        lambda phrase: phrase.isNotNull()
+    )
+    return F.transform(F.array_distinct(F.concat(unigrams, bigrams)), lambda k: F.initcap(k))
+
+def build_fact_table(raw_df, seed=ETL_SEED, stopwords=KEYWORD_STOPWORDS, etl_timestamp=None):
+    """
+    aci.articles rows -> fact_publications rows, keyed by article_id (the raw article _id).
+    Each simulated dimension hashes the article key with its own salt, materialized once per row
+    so every branch of the CASE WHEN sees the same value. content_hash fingerprints the row's content:
+    equal hashes mean an unchanged row. `etl_timestamp` (the run's start) is a literal, so every
+    sink the DataFrame is written to gets the same value; current_timestamp() is evaluated per action.
+    """
+    key = article_key(raw_df)
+    df = raw_df \
+        .withColumn("article_id", F.col("_id").cast("string")) \
+        .withColumn("authors_clean", F.split(F.col("authors"), AUTHOR_SEPARATOR)) \
+        .withColumn("nb_authors", F.size(F.col("authors_clean"))) \
+        .withColumn("_r_quartile", hashed_uniform(key, "quartile", seed)) \
+        .withColumn("_r_country", hashed_uniform(key, "country", seed)) \
+        .withColumn("_r_impact", hashed_uniform(key, "impact", seed)) \
+        .withColumn("quartile", weighted_choice(F.col("_r_quartile"), QUARTILES, QUARTILE_WEIGHTS)) \
+        .withColumn("country", weighted_choice(F.col("_r_country"), COUNTRIES, COUNTRY_WEIGHTS)) \
+        .withColumn("impact_score", F.round(F.lit(IMPACT_MIN) + F.col("_r_impact") * (IMPACT_MAX - IMPACT_MIN), 2)) \
+        .withColumn("citations", (F.col("impact_score") * 10).cast(IntegerType())) \
+        .withColumn("generated_keywords", keywords_expr(F.col("title"), stopwords)) \
+        .withColumn("etl_timestamp", F.lit(etl_timestamp) if etl_timestamp is not None else F.current_timestamp()) \
+        .drop("_r_quartile", "_r_country", "_r_impact", "authors", "_id")
+    return df.withColumn("content_hash", content_hash(df))
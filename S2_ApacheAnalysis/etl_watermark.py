@@ -0,0 +1,70 @@
+import sys
+import json
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import MongoClient
+from aci_common.warehouse import RAW_COLLECTION, FACT_COLLECTION, META_COLLECTION
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+
+# Articles inserted in the last seconds are left for the next run:
+# concurrent inserts may become visible slightly out of _id order
+WATERMARK_LAG_SECONDS = 60
+
+def read_watermark(db):
+    """_id of the last raw article already transformed, or None (never run / full rebuild required)"""
+    meta = db[META_COLLECTION].find_one({"_id": "etl"}, {"last_article_id": 1})
+    return meta.get("last_article_id") if meta else None
+
+def next_watermark(db, lag_seconds=WATERMARK_LAG_SECONDS):
+    """Upper bound of this run: the newest article _id, capped to `lag_seconds` ago"""
+    latest = db[RAW_COLLECTION].find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if not latest:
+        return None
+    cutoff = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=lag_seconds))
+    return min(latest["_id"], cutoff)
+
+def article_range_pipeline(low, high):
+    """
+    Aggregation pipeline (JSON, for the Spark connector's aggregation.pipeline option) reading
+    the raw articles in (low, high]. The $match runs inside MongoDB, on the _id index.
+    """
+    bounds = {}
+    if low is not None:
+        bounds["$gt"] = {"$oid": str(low)}
+    if high is not None:
+        bounds["$lte"] = {"$oid": str(high)}
+    return json.dumps([{"$match": {"_id": bounds}}] if bounds else [])
+
+def latest_etl_timestamp(db):
+    """etl_timestamp of the newest fact row: rows written by this run are the ones after it"""
+    latest = db[FACT_COLLECTION].find_one({}, {"etl_timestamp": 1}, sort=[("etl_timestamp", -1)])
+    return latest.get("etl_timestamp") if latest else None
+
+def save_watermark(db, article_id, mode, count):
+    """
+    Call once every sink (fact_publications, derived collections, Parquet) holds the run: until
+    then the window is re-read by the next run, so every sink's write must be idempotent per window
+    """
+    db[META_COLLECTION].update_one(
+        {"_id": "etl"},
+        {"$set": {
+            "last_article_id": article_id,
+            "mode": mode,
+            "count": count,
+            "finished_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+
+if __name__ == "__main__":
+    try:
+        db = MongoClient(MONGO_URI)[DB_NAME]
+        watermark = read_watermark(db)
+        pending = db[RAW_COLLECTION].count_documents({"_id": {"$gt": watermark}} if watermark else {})
+        print(f"✅ Watermark: {watermark or 'none (next run is a full rebuild)'} | {pending} articles pending")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -1,39 +1,66 @@
-import json
 import os
+import sys
+import argparse
+from datetime import datetime
 from pymongo import MongoClient
-from bson.json_util import dumps
+# Streaming export shared with the scrapers (pip install ./aci_common)
+from aci_common.export import output_format, export_cursor
 
 # --- CONFIGURATION ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "aci"
 COLLECTION_NAME = "fact_publications"
 OUTPUT_FILE = "final_data_warehouse.json"
+BATCH_SIZE = 1000
 
-def export_clean_json():
+def build_projection(fields):
+    if fields:
+        projection = {f: 1 for f in fields}
+        projection["_id"] = 0
+        return projection
+    # Exclude the MongoDB '_id' and 'etl_timestamp' for a cleaner JSON
+    return {"_id": 0, "etl_timestamp": 0}
+
+def export_clean_json(output_file=OUTPUT_FILE, since=None, fields=None, batch_size=BATCH_SIZE):
+    """
+    Streams the warehouse to disk in cursor batches (constant memory).
+    - since: only rows with etl_timestamp > since (incremental export)
+    - fields: projection, e.g. ["title", "country", "citations"]
+    """
     print(f"--- EXPORTING DATA WAREHOUSE ---")
-    
+
+    # Connect to the Cleaned Data (Not the raw scraping!)
+    client = MongoClient(MONGO_URI)
     try:
-        # Connect to the Cleaned Data (Not the raw scraping!)
-        client = MongoClient(MONGO_URI)
         collection = client[DB_NAME][COLLECTION_NAME]
-        
-        # Exclude the MongoDB '_id' and 'etl_timestamp' for a cleaner JSON
-        cursor = collection.find({}, {"_id": 0, "etl_timestamp": 0})
-        articles = list(cursor)
-        
-        count = len(articles)
-        if count == 0:
+        if not since and collection.estimated_document_count() == 0:
             print("⚠️ Warning: Database is empty. Did you run the Spark script?")
             return
 
-        # Write to file
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, indent=4, ensure_ascii=False)
-            
-        print(f"✅ SUCCESS: Exported {count} cleaned articles to '{os.path.abspath(OUTPUT_FILE)}'")
-
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        query = {"etl_timestamp": {"$gt": since}} if since else {}
+        cursor = collection.find(query, build_projection(fields)).batch_size(batch_size)
+        fmt = output_format(output_file)
+        # Written to a temp file, renamed once complete (removed if the export fails)
+        count = export_cursor(cursor, output_file, fmt)
+        print(f"✅ SUCCESS: Exported {count} cleaned articles to '{os.path.abspath(output_file)}' ({fmt})")
+    finally:
+        client.close()
 
 if __name__ == "__main__":
-    export_clean_json()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Stream aci.fact_publications to JSON / NDJSON (optionally gzipped)")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Target file: .json, .ndjson/.jsonl, optionally + .gz")
+    parser.add_argument("--since", help="ISO etl_timestamp: only export rows written after it")
+    parser.add_argument("--fields", help="Comma-separated projection, e.g. title,country,citations")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        export_clean_json(
+            output_file=args.output,
+            since=datetime.fromisoformat(args.since) if args.since else None,
+            fields=[f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None,
+            batch_size=args.batch_size
+        )
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,305 @@
+"""
+Spark ETL job: aci.articles (raw scraped items) -> aci.fact_publications + the derived
+collections (indexes, OLAP cube, co-author network, keyword index, warehouse version)
++ the partitioned Parquet tree (hdfs_data).
+
+    python spark_analysis.py                        # incremental run on every local core
+    python spark_analysis.py --mode full --driver-memory 4g --shuffle-partitions 16
+    python spark_analysis.py --resolve-only         # fill the spark-ivy jar cache and exit
+
+Every option also has an environment variable default (SPARK_MASTER, ETL_MODE, ...).
+The MongoDB connector jars are resolved once into spark-ivy/ and loaded from there on
+later starts (no Ivy resolution, no network). Stage timings, Spark startup included,
+are printed at the end and can be saved with --timings-json.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from pymongo import MongoClient
+from warehouse_layout import PARTITION_COLUMNS, SORT_COLUMNS, TARGET_FILE_MB, COMPACT_MIN_FILES
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONNECTOR_PACKAGE = "org.mongodb.spark:mongo-spark-connector_2.12:10.2.0"
+# Jars of CONNECTOR_PACKAGE and its dependencies, as Ivy copies them into <ivy>/jars
+CONNECTOR_JARS = [
+    "org.mongodb.spark_mongo-spark-connector_2.12-10.2.0.jar",
+    "org.mongodb_mongodb-driver-sync-4.8.2.jar",
+    "org.mongodb_mongodb-driver-core-4.8.2.jar",
+    "org.mongodb_bson-4.8.2.jar",
+    "org.mongodb_bson-record-codec-4.8.2.jar",
+]
+
+DEFAULTS = {
+    "source_uri": os.environ.get("MONGO_SOURCE_URI", "mongodb://localhost:27017/aci.articles"),
+    "target_uri": os.environ.get("MONGO_TARGET_URI", "mongodb://localhost:27017/aci.fact_publications"),
+    "master": os.environ.get("SPARK_MASTER", "local[*]"),
+    "shuffle_partitions": int(os.environ.get("SPARK_SHUFFLE_PARTITIONS", os.cpu_count() or 4)),
+    "driver_memory": os.environ.get("SPARK_DRIVER_MEMORY", "2g"),
+    "executor_memory": os.environ.get("SPARK_EXECUTOR_MEMORY"),
+    "executor_cores": os.environ.get("SPARK_EXECUTOR_CORES"),
+    "read_partition_mb": int(os.environ.get("MONGO_READ_PARTITION_MB", 64)),
+    "write_batch_size": int(os.environ.get("MONGO_WRITE_BATCH_SIZE", 512)),
+    "mode": os.environ.get("ETL_MODE", "incremental"),
+    "parquet_path": os.environ.get("PARQUET_PATH", os.path.join(BASE_DIR, "hdfs_data")),
+    "ivy_dir": os.environ.get("SPARK_IVY_DIR", os.path.join(BASE_DIR, "spark-ivy")),
+    "stopwords_file": os.environ.get("KEYWORD_STOPWORDS_FILE"),
+}
+
+def column_list(value):
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the data warehouse from the scraped articles with Spark")
+    parser.add_argument("--source-uri", default=DEFAULTS["source_uri"], help="Raw articles (mongodb://host/db.collection)")
+    parser.add_argument("--target-uri", default=DEFAULTS["target_uri"], help="Fact table (mongodb://host/db.collection)")
+    parser.add_argument("--parquet-path", default=DEFAULTS["parquet_path"], help="Partitioned Parquet output")
+    parser.add_argument("--mode", choices=["incremental", "full"], default=DEFAULTS["mode"],
+                        help="incremental: articles scraped since the last run (full on the first run)")
+    parser.add_argument("--partition-by", type=column_list, default=PARTITION_COLUMNS,
+                        help="Parquet partition columns, outermost first (e.g. date_pub,country)")
+    parser.add_argument("--sort-by", type=column_list, default=SORT_COLUMNS,
+                        help="Sort order inside each Parquet file (min/max statistics)")
+    parser.add_argument("--target-file-mb", type=int, default=TARGET_FILE_MB, help="Target Parquet file size")
+    parser.add_argument("--compact-min-files", type=int, default=COMPACT_MIN_FILES,
+                        help="Small files in one partition that trigger a compaction")
+    parser.add_argument("--compact", action="store_true", help="Compact the Parquet tree after this run")
+    parser.add_argument("--compact-only", action="store_true", help="Only compact the Parquet tree (no ETL)")
+    parser.add_argument("--master", default=DEFAULTS["master"], help="local[*] = every core")
+    parser.add_argument("--shuffle-partitions", type=int, default=DEFAULTS["shuffle_partitions"])
+    parser.add_argument("--driver-memory", default=DEFAULTS["driver_memory"])
+    parser.add_argument("--executor-memory", default=DEFAULTS["executor_memory"], help="Cluster masters only")
+    parser.add_argument("--executor-cores", default=DEFAULTS["executor_cores"], help="Cluster masters only")
+    parser.add_argument("--read-partition-mb", type=int, default=DEFAULTS["read_partition_mb"],
+                        help="Size of the MongoDB read partitions (one Spark task each)")
+    parser.add_argument("--write-batch-size", type=int, default=DEFAULTS["write_batch_size"],
+                        help="Documents per MongoDB bulk write")
+    parser.add_argument("--ivy-dir", default=DEFAULTS["ivy_dir"], help="Jar cache of the MongoDB connector")
+    parser.add_argument("--stopwords-file", default=DEFAULTS["stopwords_file"], help="Extra keyword stopwords, one per line")
+    parser.add_argument("--no-preview", action="store_true", help="Skip the analytics preview")
+    parser.add_argument("--timings-json", help="Write the stage timings (seconds) to this file")
+    parser.add_argument("--resolve-only", action="store_true", help="Resolve the connector into --ivy-dir and exit")
+    return parser.parse_args(argv)
+
+def cached_connector_jars(ivy_dir):
+    """Paths of the connector jars when the cache holds all of them, else None"""
+    paths = [os.path.join(ivy_dir, "jars", name) for name in CONNECTOR_JARS]
+    return paths if all(os.path.isfile(p) for p in paths) else None
+
+def build_session(args):
+    from pyspark.sql import SparkSession
+
+    builder = SparkSession.builder \
+        .appName("BlockchainDWBuilder") \
+        .master(args.master) \
+        .config("spark.sql.shuffle.partitions", args.shuffle_partitions) \
+        .config("spark.default.parallelism", args.shuffle_partitions) \
+        .config("spark.driver.memory", args.driver_memory) \
+        .config("spark.sql.sources.partitionColumnTypeInference.enabled", "false") \
+        .config("spark.sql.warehouse.dir", os.path.join(BASE_DIR, "spark-warehouse")) \
+        .config("spark.mongodb.read.connection.uri", args.source_uri) \
+        .config("spark.mongodb.write.connection.uri", args.target_uri) \
+        .config("spark.mongodb.read.partitioner.options.partition.size", args.read_partition_mb) \
+        .config("spark.mongodb.write.maxBatchSize", args.write_batch_size) \
+        .config("spark.jars.ivy", os.path.abspath(args.ivy_dir))
+
+    if args.master.startswith("local"):
+        builder = builder \
+            .config("spark.driver.host", "127.0.0.1") \
+            .config("spark.driver.bindAddress", "127.0.0.1")
+    if args.executor_memory:
+        builder = builder.config("spark.executor.memory", args.executor_memory)
+    if args.executor_cores:
+        builder = builder.config("spark.executor.cores", args.executor_cores)
+
+    jars = cached_connector_jars(args.ivy_dir)
+    if jars:
+        # Already resolved: plain jars, no Ivy resolution on startup
+        builder = builder.config("spark.jars", ",".join(jars))
+    else:
+        print("    (First run: resolving the MongoDB connector into the jar cache, this may take a few minutes)")
+        builder = builder.config("spark.jars.packages", CONNECTOR_PACKAGE)
+    return builder.getOrCreate()
+
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+        self._start = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.timings[name] = round(now - self._start, 3)
+        self._start = now
+
+    def report(self, path=None):
+        print("\n⏱️  Stage timings (s): " + ", ".join(f"{k} {v}" for k, v in self.timings.items()))
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.timings, f, indent=2)
+
+def run_etl(spark, args, timer):
+    """The ETL itself; returns the mode that actually ran and the number of raw articles read"""
+    from etl_transforms import build_fact_table, load_stopwords
+    from etl_watermark import read_watermark, next_watermark, article_range_pipeline, latest_etl_timestamp, save_watermark
+
+    # Keyword stoplist: the built-in list plus one word per line from --stopwords-file (optional)
+    keyword_stopwords = load_stopwords(args.stopwords_file)
+    mode = args.mode
+    # etl_timestamp of every row of this run, in every sink
+    run_started = datetime.now(timezone.utc)
+
+    print("\n>>> 1. READING FROM MONGODB...")
+    mongo_client = MongoClient(args.source_uri)
+    mongo_db = mongo_client.get_default_database()
+
+    # High-water mark: raw articles are read in (last run's _id, newest _id], filtered inside MongoDB
+    low_watermark = read_watermark(mongo_db) if mode == "incremental" else None
+    if low_watermark is None:
+        mode = "full"
+    high_watermark = next_watermark(mongo_db)
+    print(f"   - Mode: {mode} (articles after {low_watermark or 'the beginning'})")
+
+    raw_df = spark.read.format("mongodb") \
+        .option("aggregation.pipeline", article_range_pipeline(low_watermark, high_watermark)) \
+        .load()
+    count_raw = raw_df.count()
+    print(f"   - Loaded {count_raw} raw articles.")
+    timer.lap("read")
+
+    if count_raw == 0 and mode == "full":
+        print("⚠️ WARNING: Your MongoDB collection 'aci.articles' is empty!")
+        print("   Run the scraping scripts first.")
+    elif count_raw == 0:
+        print("   - No new articles since the last run.")
+
+    print("\n>>> 2. TRANSFORMING DATA...")
+    # Construct Fact Table (authors split, simulated dimensions, keywords; raw columns dropped)
+    # Persisted: written to MongoDB, then Parquet, then previewed from the same computed rows
+    df_final = build_fact_table(raw_df, stopwords=keyword_stopwords, etl_timestamp=run_started).persist()
+
+    print("\n>>> 3. SAVING TO MONGO DW...")
+    # Derived collections are refreshed from the rows written after this timestamp
+    previous_etl_timestamp = latest_etl_timestamp(mongo_db) if mode == "incremental" else None
+
+    if mode == "full":
+        df_final.write.format("mongodb").mode("overwrite").save()
+    else:
+        # Upsert on article_id: re-running a window never duplicates a publication
+        df_final.write.format("mongodb").mode("append") \
+            .option("operationType", "replace") \
+            .option("idFieldList", "article_id") \
+            .save()
+    print("   - Data written to MongoDB successfully.")
+    timer.lap("transform_write")
+
+    # A full run's mode("overwrite") dropped the collection and its indexes: recreate them before anything reads it
+    from warehouse_indexes import ensure_indexes
+    print(f"   - Indexes recreated: {', '.join(ensure_indexes(mongo_db))}")
+
+    # Pre-aggregate the OLAP cube the BI API answers from (year x country x quartile x source)
+    from build_cube import refresh_cube
+    cube_cells = refresh_cube(mongo_db, since=previous_etl_timestamp)
+    print(f"   - OLAP cube refreshed ({cube_cells} cells).")
+
+    # Co-authorship adjacency index (interned author ids, per-cell edge weights)
+    from build_network import refresh_network
+    net_authors, net_edges = refresh_network(mongo_db, since=previous_etl_timestamp)
+    print(f"   - Co-author network indexed ({net_authors} authors, {net_edges} edges).")
+
+    # Keyword inverted index (keyword -> papers) for the keyword drill-down
+    from build_keyword_index import refresh_keyword_index
+    kw_count, kw_postings = refresh_keyword_index(mongo_db, since=previous_etl_timestamp)
+    print(f"   - Keyword index refreshed ({kw_count} keywords, {kw_postings} postings).")
+
+    # Publish last: the BI API drops its response cache when this version changes
+    from warehouse_meta import publish_version
+    print(f"   - Warehouse version published: {publish_version(mongo_db)}")
+    timer.lap("derived_collections")
+
+    print(f"\n>>> 4. GENERATING HDFS STRUCTURE AT: {os.path.abspath(args.parquet_path)}")
+    # Partitioned by --partition-by, sorted by --sort-by, target-sized files; incremental runs append
+    # the rows not already there, then compact the partitions they fragmented or updated
+    from warehouse_layout import write_warehouse
+    action = write_warehouse(spark, df_final, args.parquet_path, mode, args.partition_by, args.sort_by,
+                             args.target_file_mb, args.compact_min_files, force_compact=args.compact)
+    print(f"   - HDFS Folder Structure Created ✅ ({action}, partitioned by {'/'.join(args.partition_by)})")
+    timer.lap("parquet")
+
+    # Every sink holds this run: the next incremental run starts after it. A run stopped before this
+    # point is read again whole by the next one, which both sinks absorb: MongoDB upserts on article_id,
+    # the Parquet append skips the rows already in their partition
+    if high_watermark is not None:
+        save_watermark(mongo_db, high_watermark, mode, count_raw)
+        print(f"   - Watermark saved: {high_watermark}")
+
+    if not args.no_preview:
+        preview(df_final)
+        timer.lap("preview")
+    df_final.unpersist()
+    mongo_client.close()
+    return mode, count_raw
+
+def preview(df_final):
+    from pyspark.sql.functions import desc, avg, count
+
+    print("\n" + "="*40)
+    print("        SPARK ANALYSIS RESULTS        ")
+    print("="*40)
+
+    print("\n📊 1. Top 5 Countries by Average Impact Factor:")
+    df_final.groupBy("country") \
+        .agg(avg("impact_score").alias("avg_impact"), count("title").alias("pub_count")) \
+        .orderBy(desc("avg_impact")) \
+        .show(5)
+
+    print("\n📊 2. Publication Count by Quartile:")
+    df_final.groupBy("quartile").count().orderBy("quartile").show()
+
+def main(argv=None):
+    args = parse_args(argv)
+    # The Python workers run the same interpreter as the driver (no hard-coded install path)
+    os.environ.setdefault("PYSPARK_PYTHON", sys.executable)
+    os.environ.setdefault("PYSPARK_DRIVER_PYTHON", sys.executable)
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
+    if args.resolve_only and cached_connector_jars(args.ivy_dir):
+        print(f"✅ Connector jars already cached in {os.path.abspath(args.ivy_dir)}")
+        return 0
+
+    timer = StageTimer()
+    print(">>> Initializing Spark Session...")
+    spark = build_session(args)
+    spark.sparkContext.setLogLevel("WARN")
+    timer.lap("spark_startup")
+    print(f"✅ Spark Session Active: v{spark.version} ({args.master}, {args.shuffle_partitions} shuffle partitions, "
+          f"connector from {'cache' if cached_connector_jars(args.ivy_dir) else 'Ivy'})")
+
+    if args.resolve_only:
+        spark.stop()
+        print(f"✅ Connector jars cached in {os.path.abspath(args.ivy_dir)}")
+        return 0
+
+    try:
+        if args.compact_only:
+            from warehouse_layout import compact
+            files = compact(spark, os.path.abspath(args.parquet_path), args.partition_by, args.sort_by, args.target_file_mb)
+            timer.lap("compact")
+            print(f"✅ {args.parquet_path} compacted into {files} files")
+            return 0
+        run_etl(spark, args, timer)
+    except Exception as e:
+        print(f"❌ ETL failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        timer.report(args.timings_json)
+        spark.stop()
+
+    print("\n✅ ETL EXECUTION COMPLETE.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import sys
+from pymongo import MongoClient
+# Index specification of fact_publications, the one the BI API checks at startup (S3_BI_API/indexes.py)
+from aci_common import warehouse
+from aci_common.warehouse import FACT_COLLECTION
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+
+def ensure_indexes(db):
+    """
+    Creates every index of the shared INDEX_SPEC on fact_publications (a no-op for the ones already there).
+    A full Spark write uses mode("overwrite"), which drops the collection and its indexes:
+    call this right after every write, before the cube / network builders read the table.
+    Returns the index names.
+    """
+    return warehouse.ensure_indexes(db[FACT_COLLECTION])
+
+if __name__ == "__main__":
+    try:
+        names = ensure_indexes(MongoClient(MONGO_URI)[DB_NAME])
+        print(f"✅ {len(names)} indexes ensured on {FACT_COLLECTION}: {', '.join(names)}")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,281 @@
+"""
+Physical layout of the Parquet warehouse (hdfs_data): hive partition columns, file sizing,
+sort order inside each file, deduplication and compaction of the partitions incremental runs
+append to, and removal of stale generations.
+
+    hdfs_data/date_pub=2023/country=USA/part-*.snappy.parquet
+
+Readers prune on the partition directories (DuckDB: WHERE date_pub = ?, Spark: same filter),
+and rows sorted by SORT_COLUMNS inside each file give tight per-row-group min/max statistics
+on the next filter columns. Rewrites (full runs, layout changes) go to a staging directory
+next to the tree and replace it in one rename, so readers never see half a tree; compaction
+rewrites only the partitions that need it, each swapped in the same way.
+"""
+import os
+import sys
+import glob
+import math
+import shutil
+import time
+from functools import reduce
+from urllib.parse import unquote
+
+# --- CONFIGURATION ---
+PARTITION_COLUMNS = [c for c in os.environ.get("WAREHOUSE_PARTITION_BY", "date_pub,country").split(",") if c]
+SORT_COLUMNS = [c for c in os.environ.get("WAREHOUSE_SORT_BY", "quartile,source").split(",") if c]
+TARGET_FILE_MB = int(os.environ.get("WAREHOUSE_TARGET_FILE_MB", 128))
+# A partition holding this many files under half the target size triggers a compaction
+COMPACT_MIN_FILES = int(os.environ.get("WAREHOUSE_COMPACT_MIN_FILES", 8))
+# Row size estimate while the tree is empty (a fact row is ~0.5 KB compressed)
+DEFAULT_ROW_BYTES = 512
+
+STAGING_SUFFIX = ".staging-"
+STALE_SUFFIX = ".old-"
+# Directory name Spark gives the rows whose partition value is null
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+def parquet_files(path):
+    return glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True)
+
+def tree_layout(path):
+    """Partition columns of an existing tree (from its directory names), or None when it has no files"""
+    files = parquet_files(path)
+    if not files:
+        return None
+    relative = os.path.relpath(os.path.dirname(files[0]), path)
+    return [part.split("=", 1)[0] for part in relative.split(os.sep) if "=" in part]
+
+def small_file_partitions(path, target_bytes, min_files=COMPACT_MIN_FILES):
+    """Partition directories holding at least `min_files` files under half the target size"""
+    small = {}
+    for f in parquet_files(path):
+        if os.path.getsize(f) < target_bytes / 2:
+            small[os.path.dirname(f)] = small.get(os.path.dirname(f), 0) + 1
+    return sorted(d for d, n in small.items() if n >= min_files)
+
+def cleanup_stale(path):
+    """Removes the staging / replaced generations left next to the tree (interrupted or finished rewrites)"""
+    removed = []
+    for stale in glob.glob(path.rstrip(os.sep) + STAGING_SUFFIX + "*") + glob.glob(path.rstrip(os.sep) + STALE_SUFFIX + "*"):
+        shutil.rmtree(stale, ignore_errors=True)
+        removed.append(stale)
+    return removed
+
+def swap_in(staging, path):
+    """Replaces `path` with the fully written `staging` tree, then deletes the previous generation"""
+    previous = None
+    if os.path.exists(path):
+        previous = f"{path.rstrip(os.sep)}{STALE_SUFFIX}{int(time.time())}"
+        os.rename(path, previous)
+    os.rename(staging, path)
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+
+def records_per_file(spark, path, target_bytes):
+    """Rows per output file for `target_bytes` files, from the existing tree's compressed row size"""
+    row_bytes = DEFAULT_ROW_BYTES
+    files = parquet_files(path)
+    if files:
+        rows = spark.read.parquet(path).count()
+        if rows:
+            row_bytes = max(1, sum(os.path.getsize(f) for f in files) // rows)
+    return max(1, target_bytes // row_bytes)
+
+def layout_df(df, partition_by, sort_by):
+    """One write task per partition value, rows sorted inside it (partition columns first)"""
+    sort_by = [c for c in sort_by if c in df.columns and c not in partition_by]
+    if partition_by:
+        df = df.repartition(*partition_by)
+    return df.sortWithinPartitions(*(partition_by + sort_by))
+
+def latest_rows(df):
+    """One row per article_id (newest etl_timestamp): appended re-runs of a window collapse on compaction"""
+    from pyspark.sql import Window
+    from pyspark.sql import functions as F
+
+    if "article_id" not in df.columns or "etl_timestamp" not in df.columns:
+        return df
+    newest = Window.partitionBy("article_id").orderBy(F.col("etl_timestamp").desc())
+    keyed = df.where(F.col("article_id").isNotNull()) \
+        .withColumn("_rank", F.row_number().over(newest)) \
+        .where(F.col("_rank") == 1).drop("_rank")
+    return keyed.unionByName(df.where(F.col("article_id").isNull()))
+
+def write_tree(df, path, partition_by, max_records):
+    df.write.mode("overwrite") \
+        .option("maxRecordsPerFile", max_records) \
+        .partitionBy(*partition_by) \
+        .parquet(path)
+
+def rewrite(spark, df, path, partition_by, sort_by, max_records):
+    """Writes `df` as a whole new generation of the tree"""
+    staging = f"{path.rstrip(os.sep)}{STAGING_SUFFIX}{int(time.time())}"
+    write_tree(layout_df(df, partition_by, sort_by), staging, partition_by, max_records)
+    swap_in(staging, path)
+
+def compact(spark, path, partition_by=PARTITION_COLUMNS, sort_by=SORT_COLUMNS, target_file_mb=TARGET_FILE_MB, extra_df=None):
+    """
+    Rewrites the whole tree (plus `extra_df` rows, if any) with the configured layout: target-sized
+    files, sorted rows, one row per article_id. Returns the number of files written.
+    """
+    target_bytes = target_file_mb * 1024 * 1024
+    max_records = records_per_file(spark, path, target_bytes)
+    df = spark.read.parquet(path)
+    if extra_df is not None:
+        df = df.unionByName(extra_df, allowMissingColumns=True)
+    rewrite(spark, latest_rows(df), path, partition_by, sort_by, max_records)
+    return len(parquet_files(path))
+
+def partition_key(values, partition_by):
+    return tuple(None if values.get(c) is None else str(values.get(c)) for c in partition_by)
+
+def partition_values(path, directory):
+    """{column: value} of a partition directory (Spark's path escaping undone, its null partition as None)"""
+    values = {}
+    for part in os.path.relpath(directory, path).split(os.sep):
+        if "=" in part:
+            column, value = part.split("=", 1)
+            values[column] = None if value == HIVE_NULL_PARTITION else unquote(value)
+    return values
+
+def partition_dirs(path, keys, partition_by):
+    """Partition directories of the tree whose values are among `keys` (partition_key tuples)"""
+    keys = set(keys)
+    dirs = {os.path.dirname(f) for f in parquet_files(path)}
+    return sorted(d for d in dirs if partition_key(partition_values(path, d), partition_by) in keys)
+
+def compact_partitions(spark, path, directories, sort_by, max_records, drop_ids=None):
+    """
+    Rewrites only the given partition directories: one row per article_id, target-sized sorted
+    files, without the articles of `drop_ids` (a DataFrame of article_id) if given. Each is written
+    under a staging tree next to the warehouse, then swapped in with two renames (a reader sees
+    the old or the new files of a partition, never a mix).
+    """
+    stamp = int(time.time())
+    staging_root = f"{path}{STAGING_SUFFIX}{stamp}"
+    stale_root = f"{path}{STALE_SUFFIX}{stamp}"
+    for directory in directories:
+        # Read from the partition directory itself: the partition columns stay in the path only
+        df = spark.read.parquet(directory)
+        if drop_ids is not None:
+            df = df.join(drop_ids, "article_id", "left_anti")
+        staging = os.path.join(staging_root, os.path.relpath(directory, path))
+        latest_rows(df).coalesce(1) \
+            .sortWithinPartitions(*[c for c in sort_by if c in df.columns]) \
+            .write.mode("overwrite") \
+            .option("maxRecordsPerFile", max_records) \
+            .parquet(staging)
+        if os.path.exists(os.path.join(staging, "_SUCCESS")):
+            os.remove(os.path.join(staging, "_SUCCESS"))
+
+    for directory in directories:
+        relative = os.path.relpath(directory, path)
+        stale = os.path.join(stale_root, relative)
+        os.makedirs(os.path.dirname(stale), exist_ok=True)
+        os.rename(directory, stale)
+        os.rename(os.path.join(staging_root, relative), directory)
+    shutil.rmtree(staging_root, ignore_errors=True)
+    shutil.rmtree(stale_root, ignore_errors=True)
+    # A new _SUCCESS: readers versioned on it (the BI API's Parquet backend) reload
+    open(os.path.join(path, "_SUCCESS"), "w").close()
+
+def new_rows(spark, df, path, partition_by):
+    """
+    Rows of `df` not already in the tree (same article_id and content_hash in the same partition),
+    and the partition keys holding an older version of one of them. The older version is looked
+    up across the whole tree: a corrected partition value (e.g. the year) moves an article to
+    another directory than the one its previous version is in.
+    """
+    from pyspark.sql import functions as F
+
+    existing = spark.read.parquet(path)
+    on = [c for c in ("article_id", "content_hash") if c in df.columns and c in existing.columns]
+    if "article_id" not in on:
+        return df, []
+    # Null-safe: rows of the null partition are matched too
+    same = reduce(lambda a, b: a & b, (F.col(f"new.{c}").eqNullSafe(F.col(f"old.{c}")) for c in on + list(partition_by)))
+    fresh = df.alias("new").join(existing.select(*on, *partition_by).alias("old"), same, "left_anti")
+    stale = existing.join(fresh.select("article_id").distinct(), "article_id", "left_semi")
+    if not partition_by:
+        return fresh, [()] if stale.limit(1).count() else []
+    return fresh, [partition_key(row.asDict(), partition_by) for row in stale.select(*partition_by).distinct().collect()]
+
+def write_warehouse(spark, df, path, mode, partition_by=PARTITION_COLUMNS, sort_by=SORT_COLUMNS,
+                    target_file_mb=TARGET_FILE_MB, compact_min_files=COMPACT_MIN_FILES, force_compact=False):
+    """
+    Writes the ETL output to the tree and returns what was done ("rewrite", "append", "append+compact"
+    or "compact" for a layout change or a forced compaction):
+      - full: a new generation, swapped in atomically
+      - incremental: rows already in their partition (a re-run window) are skipped; the partitions
+        holding an older version of the others are rewritten without it, whichever partition the
+        new version goes to, then the new rows are appended in the same layout. Partitions
+        fragmented into small files are rewritten alone with one row per article_id. A tree
+        written with other partition columns is rewritten whole (existing rows + new ones)
+    """
+    path = os.path.abspath(path)
+    cleanup_stale(path)
+    target_bytes = target_file_mb * 1024 * 1024
+    existing = tree_layout(path)
+
+    if mode == "full" or existing is None:
+        rewrite(spark, df, path, partition_by, sort_by, records_per_file(spark, path, target_bytes))
+        return "rewrite"
+
+    if existing != list(partition_by):
+        print(f"   - Layout change ({'/'.join(existing) or 'none'} -> {'/'.join(partition_by)}): rewriting the tree")
+        compact(spark, path, partition_by, sort_by, target_file_mb, extra_df=df)
+        return "compact"
+
+    max_records = records_per_file(spark, path, target_bytes)
+    # Persisted: the anti-join reads the tree the deletes and the append then write to
+    fresh, replaced = new_rows(spark, df, path, partition_by)
+    fresh = fresh.persist()
+    appended = fresh.count()
+    if partition_by and replaced:
+        # Before the append, so that no reader sees both versions of an article
+        stale_dirs = partition_dirs(path, replaced, partition_by)
+        print(f"   - Removing the previous versions of updated articles from {len(stale_dirs)} partitions")
+        compact_partitions(spark, path, stale_dirs, sort_by, max_records,
+                           drop_ids=fresh.select("article_id").distinct())
+    if appended:
+        layout_df(fresh, partition_by, sort_by).write.mode("append") \
+            .option("maxRecordsPerFile", max_records) \
+            .partitionBy(*partition_by) \
+            .parquet(path)
+    fresh.unpersist()
+    print(f"   - Appended {appended} rows ({len(replaced)} partitions with replaced articles)")
+
+    fragmented = small_file_partitions(path, target_bytes, compact_min_files)
+    # An unpartitioned tree has a single "partition": the tree itself, deduplicated whole
+    if force_compact or (not partition_by and (replaced or fragmented)):
+        print("   - Compacting the whole tree")
+        compact(spark, path, partition_by, sort_by, target_file_mb)
+        return "compact" if force_compact else "append+compact"
+
+    if fragmented:
+        print(f"   - Compacting {len(fragmented)} fragmented partitions")
+        compact_partitions(spark, path, fragmented, sort_by, max_records)
+        return "append+compact"
+    return "append+compact" if replaced else "append"
+
+if __name__ == "__main__":
+    # Layout report of a tree (no Spark needed): python warehouse_layout.py [path]
+    path = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "hdfs_data"))
+    files = parquet_files(path)
+    if not files:
+        print(f"❌ No Parquet files under {path}", file=sys.stderr)
+        sys.exit(1)
+    layout = tree_layout(path)
+    partitions = {os.path.dirname(f) for f in files}
+    size_mb = sum(os.path.getsize(f) for f in files) / (1024 * 1024)
+    target_bytes = TARGET_FILE_MB * 1024 * 1024
+    print(f"✅ {path}")
+    print(f"   - Partitioned by: {'/'.join(layout) or 'nothing'} (configured: {'/'.join(PARTITION_COLUMNS)})")
+    print(f"   - {len(files)} files in {len(partitions)} partitions, {size_mb:.1f} MB "
+          f"(ideal: {max(len(partitions), math.ceil(size_mb * 1024 * 1024 / target_bytes))} files)")
+    fragmented = small_file_partitions(path, target_bytes)
+    stale = glob.glob(path + STAGING_SUFFIX + "*") + glob.glob(path + STALE_SUFFIX + "*")
+    if fragmented:
+        print(f"⚠️ {len(fragmented)} partitions need compaction")
+    if stale:
+        print(f"⚠️ Stale generations: {', '.join(stale)}")
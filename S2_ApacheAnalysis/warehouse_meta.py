@@ -0,0 +1,58 @@
+import sys
+import hashlib
+from datetime import datetime, timezone
+from pymongo import MongoClient
+from aci_common.warehouse import FACT_COLLECTION, META_COLLECTION
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "aci"
+BATCH_SIZE = 10000
+
+def content_version(fact):
+    """
+    Order-independent digest of the warehouse content: row count + sum of every row's content_hash
+    (written by the Spark ETL; etl_timestamp is not part of it). Re-running the ETL over the same
+    articles gives the same version, so API caches survive it. None when a row has no content_hash.
+    """
+    count, total = 0, 0
+    for doc in fact.find({}, {"_id": 0, "content_hash": 1}).batch_size(BATCH_SIZE):
+        if doc.get("content_hash") is None:
+            return None
+        count += 1
+        total = (total + doc["content_hash"]) % (1 << 64)
+    return hashlib.sha1(f"{count}:{total}".encode()).hexdigest()[:16]
+
+def publish_version(db):
+    """
+    Records the warehouse version the BI API keys its response cache on:
+    the content digest, or the latest etl_timestamp for warehouses written before content_hash existed.
+    Call it last, once fact_publications and every derived collection (cube, indexes) are written,
+    so API caches are only invalidated when the new data is complete.
+    """
+    fact = db[FACT_COLLECTION]
+    latest = fact.find_one({}, {"etl_timestamp": 1}, sort=[("etl_timestamp", -1)])
+    etl_timestamp = latest.get("etl_timestamp") if latest else None
+    published_at = datetime.now(timezone.utc)
+    version = content_version(fact) or (etl_timestamp or published_at).isoformat()
+
+    db[META_COLLECTION].replace_one(
+        {"_id": "warehouse"},
+        {
+            "_id": "warehouse",
+            "version": version,
+            "etl_timestamp": etl_timestamp,
+            "published_at": published_at,
+            "count": fact.estimated_document_count()
+        },
+        upsert=True
+    )
+    return version
+
+if __name__ == "__main__":
+    try:
+        version = publish_version(MongoClient(MONGO_URI)[DB_NAME])
+        print(f"✅ Warehouse version published: {version}")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -1,212 +1,226 @@
 import sys
-import itertools
+import functools
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
+import network
+import keywords
+import search
+import config
+import metrics
+from cache import ResponseCache, request_key
+from mongo_backend import MongoBackend
 
 app = Flask(__name__)
 
 # 1. ALLOW ALL ORIGINS
 CORS(app, resources={r"/*": {"origins": "*"}})
 
-# 2. CONNECT TO MONGODB (Docker Friendly)
-MONGO_URI = "mongodb://localhost:27017/" 
+# 2. QUERY BACKEND: "mongo" (aci.fact_publications) or "parquet" (the partitioned hdfs_data warehouse)
+# Every setting comes from the environment (config.py)
+QUERY_BACKEND = config.QUERY_BACKEND
 
-try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    db = client["aci"]
-    collection = db["fact_publications"]
-    client.server_info() # Trigger connection check
-    print("✅ Connected to MongoDB successfully!")
-except ServerSelectionTimeoutError:
-    print("❌ ERROR: Could not connect to MongoDB. Ensure 'mongodb' container is running.", file=sys.stderr)
-    sys.exit(1)
+if QUERY_BACKEND == "parquet":
+    try:
+        from parquet_backend import ParquetBackend
+        backend = ParquetBackend(config.PARQUET_PATH)
+        print(f"✅ Serving from Parquet warehouse: {backend.path}")
+    except RuntimeError as e:
+        print(f"❌ ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+else:
+    # CONNECT TO MONGODB (Docker Friendly)
+    try:
+        # One pool per worker process (created after the fork), sized by MONGO_MAX_POOL_SIZE & co
+        # command_timer: per-request MongoDB time and the slow-query log (metrics.py)
+        client = MongoClient(config.MONGO_URI, event_listeners=[metrics.command_timer], **config.MONGO_POOL_OPTIONS)
+        client.server_info() # Trigger connection check
+        backend = MongoBackend(client[config.MONGO_DB])
+        print("✅ Connected to MongoDB successfully!")
+    except ServerSelectionTimeoutError:
+        print("❌ ERROR: Could not connect to MongoDB. Ensure 'mongodb' container is running.", file=sys.stderr)
+        sys.exit(1)
+
+    # Index self-check: warn (don't fail) when a route pipeline would scan the whole fact table
+    try:
+        plan_warnings = backend.check_indexes()
+        for warning in plan_warnings:
+            print(f"⚠️ Query plan: {warning}", file=sys.stderr)
+        if not plan_warnings:
+            print("✅ Every route pipeline is index-backed.")
+    except Exception as e:
+        print(f"⚠️ Index self-check skipped: {e}", file=sys.stderr)
+
+# In-memory mode: KPI/time/geo/quartile from a columnar copy of the fact table, the rest from the backend above
+if config.IN_MEMORY_FACTS:
+    try:
+        from memory_backend import MemoryBackend
+        backend = MemoryBackend(backend)
+        memory = backend.stats()
+        print(f"✅ Fact table loaded in memory: {memory['rows']} rows, {memory['bytes'] / 1024:.0f} KB")
+    except RuntimeError as e:
+        print(f"❌ ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+# 3. RESPONSE CACHE (invalidated when the ETL publishes a new warehouse version)
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 300
+VERSION_CHECK_SECONDS = 5
+
+response_cache = ResponseCache(
+    backend.version,
+    max_entries=CACHE_MAX_ENTRIES,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    version_check_seconds=VERSION_CHECK_SECONDS
+)
+
+# 4. FULL-TEXT SEARCH INDEX (persisted next to the app, refreshed in the background after each ETL)
+search_index = search.SearchIndex(config.SEARCH_INDEX_DIR)
+search_index.refresh_if_stale(backend)
+
+def cached(view):
+    """Serves the route's JSON body from the response cache; only successful responses are stored"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request_key(request.path, request.args)
+        body = response_cache.get(key)
+        metrics.mark_cache(body is not None)
+        if body is not None:
+            return app.response_class(body, mimetype="application/json")
+        # Read before the view runs: set() drops the body if the warehouse changed meanwhile
+        version = response_cache.version()
+        response = view(*args, **kwargs)
+        if not isinstance(response, tuple) and response.status_code == 200:
+            response_cache.set(key, response.get_data(), version)
+        return response
+    return wrapper
 
 # --- HELPER: BUILD FILTERS (SLICE & DICE) ---
-def build_match_stage():
+def build_filters():
     """
-    Reads query parameters (year, country, quartile) and builds a MongoDB query.
+    Reads query parameters (year, country, quartile) into {field: value} filters,
+    which every backend understands (MongoBackend turns them into a $match stage).
     Example: /api/kpi/summary?year=2021&country=France
     """
+    return filters_from_args(request.args)
+
+def filters_from_args(args):
+    """build_filters() for any query-string mapping (also used by the ASGI routes in asgi.py)"""
     query = {}
     
     # Filter by Year
-    year = request.args.get('year')
+    year = args.get('year')
     if year and year != 'All':
         query['date_pub'] = year
         
     # Filter by Country
-    country = request.args.get('country')
+    country = args.get('country')
     if country and country != 'All':
         query['country'] = country
 
     # Filter by Quartile
-    quartile = request.args.get('quartile')
+    quartile = args.get('quartile')
     if quartile and quartile != 'All':
         query['quartile'] = quartile
 
-    return {"$match": query}
+    return query
+
+# 5. INSTRUMENTATION: per-route latency split into db / python / json, response sizes, cache results,
+# slow-query log; exposed on /metrics (and as a Server-Timing header with SERVER_TIMING=1)
+metrics.instrument(app, build_filters, server_timing=config.SERVER_TIMING)
 
 # --- ROUTES ---
 
 @app.route('/api/filters/options', methods=['GET'])
+@cached
 def get_filter_options():
     """Returns available years and countries for the frontend dropdowns"""
     try:
-        years = collection.distinct("date_pub")
-        countries = collection.distinct("country")
-        # Filter out "Unknown" or empty values if necessary
-        years = [y for y in years if y and y != "Unknown"]
-        countries = [c for c in countries if c]
-        return jsonify({"years": sorted(years), "countries": sorted(countries)})
+        return jsonify(backend.filter_options())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/dashboard', methods=['GET'])
+@cached
+def get_dashboard():
+    """
+    Every dashboard panel (kpi, time, geo, quartile, keywords, network, authors)
+    for one filter set in a single round trip.
+    """
+    try:
+        return jsonify(backend.dashboard(build_filters(), network.parse_limits(request.args)))
+    except Exception as e:
+        print(f"❌ API ERROR (Dashboard): {e}", file=sys.stderr)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/kpi/summary', methods=['GET'])
+@cached
 def get_kpi():
     try:
-        match_stage = build_match_stage()
-        
-        pipeline = [
-            match_stage,
-            {
-                "$group": {
-                    "_id": None,
-                    "total_pubs": {"$sum": 1},
-                    "total_citations": {"$sum": "$citations"},
-                    "avg_impact": {"$avg": "$impact_score"},
-                    "total_authors": {"$sum": "$nb_authors"}
-                }
-            }
-        ]
-        data = list(collection.aggregate(pipeline))
-        result = data[0] if data else {"total_pubs": 0, "total_citations": 0, "avg_impact": 0, "total_authors": 0}
-        if "_id" in result: del result["_id"]
-        return jsonify(result)
+        return jsonify(backend.panel("kpi", build_filters()))
 
     except Exception as e:
         print(f"❌ API ERROR (KPI): {e}", file=sys.stderr)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/olap/time_distribution', methods=['GET'])
+@cached
 def olap_time():
     try:
-        match_stage = build_match_stage()
-        pipeline = [
-            match_stage,
-            {"$group": {
-                "_id": "$date_pub", 
-                "count": {"$sum": 1},
-                "avg_impact": {"$avg": "$impact_score"}
-            }},
-            {"$sort": {"_id": 1}}
-        ]
-        data = list(collection.aggregate(pipeline))
-        return jsonify(data)
+        return jsonify(backend.panel("time", build_filters()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/olap/geo_distribution', methods=['GET'])
+@cached
 def olap_geo():
     try:
-        match_stage = build_match_stage()
-        pipeline = [
-            match_stage,
-            {"$group": {"_id": "$country", "value": {"$sum": 1}}},
-            {"$sort": {"value": -1}}
-        ]
-        data = [{"id": str(item["_id"]), "value": item["value"]} for item in collection.aggregate(pipeline) if item["_id"]]
-        return jsonify(data)
+        return jsonify(backend.panel("geo", build_filters()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/olap/quality_quartile', methods=['GET'])
+@cached
 def olap_quartile():
     try:
-        match_stage = build_match_stage()
-        pipeline = [
-            match_stage,
-            {"$group": {"_id": "$quartile", "count": {"$sum": 1}}}
-        ]
-        data = list(collection.aggregate(pipeline))
-        return jsonify(data)
+        return jsonify(backend.panel("quartile", build_filters()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/olap/keywords', methods=['GET'])
+@cached
 def olap_keywords():
     try:
-        match_stage = build_match_stage()
-        pipeline = [
-            match_stage,
-            {"$unwind": "$generated_keywords"},
-            {"$group": {"_id": "$generated_keywords", "weight": {"$sum": 1}}},
-            {"$sort": {"weight": -1}},
-            {"$limit": 50}
-        ]
-        data = [{"text": str(item["_id"]), "weight": item["weight"]} for item in collection.aggregate(pipeline)]
-        return jsonify(data)
+        return jsonify(backend.panel("keywords", build_filters()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/olap/keywords/<path:keyword>', methods=['GET'])
+@cached
+def olap_keyword_drilldown(keyword):
+    """
+    Drill-down on one keyword for the current filters: paper count, per-year and per-country counts
+    and the most cited papers (?limit=10), answered from the keyword inverted index.
+    """
+    try:
+        return jsonify(backend.keyword_drilldown(keyword, build_filters(), keywords.parse_limit(request.args)))
     except Exception as e:
+        print(f"❌ API ERROR (Keyword drill-down): {e}", file=sys.stderr)
         return jsonify({"error": str(e)}), 500
 
 # --- NEW: CO-AUTHOR NETWORK GRAPH ---
 @app.route('/api/olap/network', methods=['GET'])
+@cached
 def olap_network():
     """
-    Generates Nodes and Links for a Force-Directed Graph.
-    Limits processing to top 50 recent papers to prevent crashing.
+    Generates Nodes and Links for a Force-Directed Graph over every matching paper.
+    The graph is pruned to the strongest authors and links:
+    ?max_nodes=100&max_links=300&min_weight=1 (co-authored papers per link)
     """
     try:
-        match_stage = build_match_stage()
-        
-        # Fetch authors from papers
-        pipeline = [
-            match_stage,
-            {"$project": {"authors_clean": 1}},
-            {"$limit": 50} # Limit for performance
-        ]
-        
-        papers = list(collection.aggregate(pipeline))
-        
-        nodes = {}
-        links = []
-        
-        for paper in papers:
-            authors = paper.get("authors_clean", [])
-            # Clean author names (remove newlines if any remain)
-            authors = [a.strip().replace("\n", "") for a in authors if a and a != "Unknown"]
-            
-            # Add Nodes
-            for author in authors:
-                if author not in nodes:
-                    nodes[author] = {"id": author, "weight": 1}
-                else:
-                    nodes[author]["weight"] += 1
-            
-            # Add Links (Pairs)
-            if len(authors) > 1:
-                # Generate all unique pairs in this paper
-                for a1, a2 in itertools.combinations(authors, 2):
-                    # Sort to ensure A->B is same as B->A
-                    pair = sorted([a1, a2])
-                    links.append({"source": pair[0], "target": pair[1]})
-
-        # Format for amCharts/D3
-        node_list = [{"id": k, "value": v["weight"]} for k, v in nodes.items()]
-        
-        # Deduplicate links (count strength)
-        link_counts = {}
-        for link in links:
-            key = f"{link['source']}|{link['target']}"
-            if key in link_counts:
-                link_counts[key]["value"] += 1
-            else:
-                link_counts[key] = {"source": link['source'], "target": link['target'], "value": 1}
-                
-        link_list = list(link_counts.values())
-
-        return jsonify({"nodes": node_list, "links": link_list})
+        limits = network.parse_limits(request.args)
+        return jsonify(backend.network(build_filters(), limits))
 
     except Exception as e:
         print(f"❌ API ERROR (Network): {e}", file=sys.stderr)
@@ -214,24 +228,65 @@ def olap_network():
 
 # --- NEW: TOP AUTHORS (Replaces Universities) ---
 @app.route('/api/olap/authors', methods=['GET'])
+@cached
 def olap_authors():
     try:
-        match_stage = build_match_stage()
-        pipeline = [
-            match_stage,
-            {"$unwind": "$authors_clean"},
-            # Clean newline characters if Spark didn't catch all
-            {"$project": {"author": {"$trim": {"input": "$authors_clean", "chars": "\n "}}}},
-            {"$match": {"author": {"$ne": "Unknown"}}},
-            {"$group": {"_id": "$author", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 20}
-        ]
-        data = list(collection.aggregate(pipeline))
-        return jsonify(data)
+        return jsonify(backend.panel("authors", build_filters()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# --- FULL-TEXT SEARCH ---
+@app.route('/api/search', methods=['GET'])
+def search_publications():
+    """
+    BM25 search over titles, keywords and abstracts, within the usual filters.
+    /api/search?q=smart contr&limit=10 (the last word also matches as a prefix; prefix=0 disables it)
+    """
+    try:
+        search_index.refresh_if_stale(backend)
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"query": "", "total": 0, "results": []})
+        prefix = request.args.get('prefix', '1') != '0'
+        return jsonify(search_index.search(request.args.get('q'), build_filters(), search.parse_limit(request.args), prefix))
     except Exception as e:
+        print(f"❌ API ERROR (Search): {e}", file=sys.stderr)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/search/suggest', methods=['GET'])
+def search_suggest():
+    """Autocomplete: indexed terms completing the last word of ?q="""
+    try:
+        search_index.refresh_if_stale(backend)
+        return jsonify(search_index.suggest(request.args.get('q', ''), search.parse_limit(request.args)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/search/stats', methods=['GET'])
+def search_stats():
+    return jsonify(search_index.stats())
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = {**response_cache.stats(), "backend": backend.name}
+    if config.IN_MEMORY_FACTS:
+        stats["memory_facts"] = backend.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text format: request, phase, size, cache and database metrics of this worker"""
+    cache = response_cache.stats()
+    gauges = {
+        "api_response_cache_entries": ("Entries in the response cache", cache["entries"]),
+        "api_response_cache_hit_rate": ("Response cache hit rate since start", cache["hit_rate"]),
+        "api_response_cache_invalidations": ("Cache drops on a new warehouse version", cache["invalidations"]),
+    }
+    if config.IN_MEMORY_FACTS:
+        gauges["api_memory_facts_bytes"] = ("Size of the in-memory fact table", backend.stats()["bytes"])
+    return app.response_class(metrics.render(gauges), mimetype="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
-    print("✅ Flask Server Running on port 5000...")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only: production runs through serve.py (SERVER=gunicorn or SERVER=asgi)
+    print(f"✅ Flask Server Running on port {config.PORT}...")
+    app.run(host=config.HOST, port=config.PORT, debug=config.DEBUG)
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+ASGI entry point of the BI API (SERVER=asgi python serve.py, or uvicorn asgi:app --workers N).
+The OLAP routes (dashboard, KPI, time/geo/quartile/keywords/authors panels, co-author network)
+are served with the async MongoDB driver, so a slow aggregation waits on the event loop instead of
+pinning a worker. They share the Flask app's response cache and return the same JSON.
+Every other route (filters, keyword drill-down, search, stats) is the Flask app itself, run in a
+thread pool; with QUERY_BACKEND=parquet the whole API is the Flask app. With IN_MEMORY_FACTS=1
+the dashboard and the in-memory panels (no database round trip) are the Flask app's too.
+"""
+import sys
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from pymongo import AsyncMongoClient
+from werkzeug.datastructures import MultiDict
+import config
+import network
+import metrics
+import memory_backend
+import app as flask_module
+from cache import request_key
+from async_mongo_backend import AsyncMongoBackend
+
+wsgi_app = WsgiToAsgi(flask_module.app)
+
+JSON_HEADERS = [(b"content-type", b"application/json"), (b"access-control-allow-origin", b"*")]
+
+PANEL_ROUTES = {
+    "/api/kpi/summary": "kpi",
+    "/api/olap/time_distribution": "time",
+    "/api/olap/geo_distribution": "geo",
+    "/api/olap/quality_quartile": "quartile",
+    "/api/olap/keywords": "keywords",
+    "/api/olap/authors": "authors",
+}
+
+_backend = None
+
+def get_backend():
+    """Created on first use, inside the worker's event loop"""
+    global _backend
+    if _backend is None:
+        client = AsyncMongoClient(config.MONGO_URI, event_listeners=[metrics.command_timer], **config.MONGO_POOL_OPTIONS)
+        _backend = AsyncMongoBackend(client[config.MONGO_DB])
+    return _backend
+
+async def route(path, args):
+    """JSON payload of an async route"""
+    filters = flask_module.filters_from_args(args)
+    if path in PANEL_ROUTES:
+        return await get_backend().panel(PANEL_ROUTES[path], filters)
+    if path == "/api/dashboard":
+        return await get_backend().dashboard(filters, network.parse_limits(args))
+    return await get_backend().network(filters, network.parse_limits(args))
+
+def is_async_route(scope):
+    path = scope["path"]
+    if config.IN_MEMORY_FACTS and (path == "/api/dashboard" or PANEL_ROUTES.get(path) in memory_backend.MEMORY_PANELS):
+        return False
+    return (scope["method"] == "GET" and config.QUERY_BACKEND != "parquet"
+            and (path in PANEL_ROUTES or path in ("/api/dashboard", "/api/olap/network")))
+
+async def send_json(send, status, body, timer=None, token=None, filters="none"):
+    """Sends the response; with a metrics timer, records the request first (and its Server-Timing header)"""
+    headers = JSON_HEADERS + [(b"content-length", str(len(body)).encode())]
+    if timer is not None:
+        total = metrics.finish_request(timer, token, "GET", status, len(body), filters)
+        if config.SERVER_TIMING:
+            headers.append((b"server-timing", timer.server_timing(total).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _backend is not None:
+                await _backend.db.client.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http" or not is_async_route(scope):
+        return await wsgi_app(scope, receive, send)
+
+    path = scope["path"]
+    args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+    timer, token = metrics.start_request(path)
+    filters = metrics.filters_label(flask_module.filters_from_args(args))
+    key = request_key(path, args)
+    cache = flask_module.response_cache
+    # The periodic version check, awaited: the cache's own check would block the event loop on pymongo
+    if cache.version_due():
+        try:
+            cache.apply_version(await get_backend().version())
+        except Exception as e:
+            print(f"⚠️ Cache: could not read warehouse version: {e}", file=sys.stderr)
+    body = cache.get(key, check_version=False)
+    metrics.mark_cache(body is not None)
+    if body is None:
+        version = cache.version()
+        try:
+            payload = await route(path, args)
+            # Same encoder as jsonify() (dates, ObjectIds...), and the same bytes in the shared cache
+            body = flask_module.app.json.response(payload).get_data()
+        except Exception as e:
+            print(f"❌ API ERROR ({path}): {e}", file=sys.stderr)
+            body = flask_module.app.json.response({"error": str(e)}).get_data()
+            return await send_json(send, 500, body, timer, token, filters)
+        cache.set(key, body, version)
+    await send_json(send, 200, body, timer, token, filters)
@@ -0,0 +1,89 @@
+"""
+Async twin of MongoBackend for the ASGI routes (asgi.py), on pymongo's AsyncMongoClient:
+the same pipelines, cube / index selection and JSON shapes, but a slow aggregation
+awaits on the event loop instead of holding a worker thread.
+"""
+import asyncio
+import cube
+import network
+from mongo_backend import FACT_COLLECTION, PANELS, FORMATTERS
+
+class AsyncMongoBackend:
+    name = "mongo-async"
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[FACT_COLLECTION]
+
+    async def version(self):
+        """MongoBackend.version(), awaited"""
+        meta = await self.db[cube.META_COLLECTION].find_one({"_id": "warehouse"}, {"version": 1})
+        if meta:
+            return meta.get("version")
+        latest = await self.collection.find_one({}, {"etl_timestamp": 1}, sort=[("etl_timestamp", -1)])
+        return latest.get("etl_timestamp") if latest else None
+
+    async def is_built(self, meta_id):
+        return await self.db[cube.META_COLLECTION].find_one({"_id": meta_id}, {"_id": 1}) is not None
+
+    async def can_answer(self, match_stage):
+        return cube.covers(match_stage) and await self.is_built("cube")
+
+    async def aggregate(self, collection, pipeline):
+        cursor = await collection.aggregate(pipeline)
+        return await cursor.to_list(None)
+
+    async def run_panel(self, match_stage, name, use_cube):
+        cube_collection, cube_stages, live_stages = PANELS[name]
+        if use_cube:
+            return await self.aggregate(self.db[cube_collection], [match_stage] + cube_stages)
+        return await self.aggregate(self.collection, [match_stage] + live_stages)
+
+    async def panel(self, name, filters):
+        match_stage = {"$match": dict(filters)}
+        return FORMATTERS[name](await self.run_panel(match_stage, name, await self.can_answer(match_stage)))
+
+    async def network(self, filters, limits):
+        match_stage = {"$match": dict(filters)}
+        if cube.covers(match_stage) and await self.is_built("network"):
+            node_rows = await self.aggregate(self.db[network.NODE_COLLECTION],
+                                             network.indexed_nodes_pipeline(match_stage, limits["max_nodes"]))
+            ids = [row["_id"] for row in node_rows]
+            if not ids:
+                return {"nodes": [], "links": []}
+            link_rows = await self.aggregate(self.db[network.EDGE_COLLECTION], network.indexed_links_pipeline(
+                match_stage, ids, limits["min_weight"], limits["max_links"]))
+            names = {doc["_id"]: doc["name"]
+                     async for doc in self.db[network.AUTHOR_COLLECTION].find({"_id": {"$in": ids}})}
+            return network.indexed_response(node_rows, link_rows, names)
+
+        node_rows = await self.aggregate(self.collection, network.live_nodes_pipeline(match_stage, limits["max_nodes"]))
+        names = [row["_id"] for row in node_rows]
+        if not names:
+            return {"nodes": [], "links": []}
+        link_rows = await self.aggregate(self.collection, [match_stage] + network.pair_stages(
+            names, limits["min_weight"], limits["max_links"]))
+        return network.live_response(node_rows, link_rows)
+
+    async def dashboard(self, filters, limits):
+        """Same single-$facet evaluation as MongoBackend.dashboard; the network queries run meanwhile"""
+        match_stage = {"$match": dict(filters)}
+        graph = asyncio.ensure_future(self.network(filters, limits))
+        try:
+            if await self.can_answer(match_stage):
+                facets = {name: stages for name, (coll, stages, _) in PANELS.items() if coll == cube.CUBE_COLLECTION}
+                rows = dict(next(iter(await self.aggregate(self.db[cube.CUBE_COLLECTION],
+                                                           [match_stage, {"$facet": facets}])), {}))
+                keywords_rows, author_rows = await asyncio.gather(
+                    self.run_panel(match_stage, "keywords", True), self.run_panel(match_stage, "authors", True))
+                rows.update(keywords=keywords_rows, authors=author_rows)
+            else:
+                facets = {name: live for name, (_, _, live) in PANELS.items()}
+                rows = next(iter(await self.aggregate(self.collection, [match_stage, {"$facet": facets}])), {})
+        except Exception:
+            graph.cancel()
+            raise
+
+        panels = {name: FORMATTERS[name](rows.get(name, [])) for name in PANELS}
+        panels["network"] = await graph
+        return panels
@@ -0,0 +1,313 @@
+"""
+End-to-end benchmark of the API routes: latency percentiles (p50/p95/p99) and throughput per
+route and filter combination, saved as JSON to compare releases.
+
+    # In process (Flask test client), against the backend configured by the environment (config.py)
+    python benchmark.py --out bench.json
+    # Baseline without any server: in process, on a synthetic Parquet warehouse (every route)
+    python generate_warehouse.py --scale 10k --parquet bench_10k
+    python benchmark.py --parquet bench_10k --out bench.json
+    # Over HTTP, against a running server (any SERVER mode, any backend), 8 clients in parallel
+    python benchmark.py --url http://localhost:5000 --concurrency 8 --out bench.json
+    # Regression check against a previous run: exit code 1 when a p95 grew by more than 25%
+    python benchmark.py --parquet bench_10k --baseline bench.json --max-regression 25
+
+Every request carries a unique dummy parameter so it misses the response cache (--cache keeps it).
+A case with failed requests fails the run (exit code 1): its timings are not a measurement.
+--mongomock (generate_warehouse.py --out FILE held by mongomock) only runs the routes mongomock
+can answer: it does not implement $trim / $replaceAll, which the authors, network and dashboard
+pipelines use. Benchmark those on Parquet or against a real server (generate_warehouse.py --mongo-uri).
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlencode, quote
+from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+ROUTES = {
+    "filters": "/api/filters/options",
+    "kpi": "/api/kpi/summary",
+    "time": "/api/olap/time_distribution",
+    "geo": "/api/olap/geo_distribution",
+    "quartile": "/api/olap/quality_quartile",
+    "keywords": "/api/olap/keywords",
+    "authors": "/api/olap/authors",
+    "network": "/api/olap/network",
+    "dashboard": "/api/dashboard",
+    "drilldown": "/api/olap/keywords/{keyword}",
+    "search": "/api/search",
+}
+# Routes whose answer does not depend on the filters: benchmarked once, unfiltered
+UNFILTERED_ROUTES = {"filters"}
+# Routes whose pipelines use stages mongomock does not implement ($trim, $replaceAll)
+MONGOMOCK_UNSUPPORTED = {"authors", "network", "dashboard"}
+FILTER_SETS = ["none", "year", "country", "year+country", "year+country+quartile"]
+DEFAULT_QUARTILE = "Q2"
+REQUEST_TIMEOUT = 120
+
+class InProcessClient:
+    """Flask test client (one per thread): the whole request path minus the network"""
+
+    def __init__(self, mongomock_file=None, parquet_dir=None):
+        if mongomock_file:
+            load_mongomock(mongomock_file)
+        if parquet_dir:
+            use_parquet(parquet_dir)
+        import app
+        self.app = app.app
+        self._local = threading.local()
+
+    def get(self, path):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.get(path)
+        return response.status_code, response.get_data()
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def get(self, path):
+        try:
+            with urlopen(self.base_url + path, timeout=REQUEST_TIMEOUT) as response:
+                return response.status, response.read()
+        except Exception as e:
+            return getattr(e, "code", 0) or 0, str(e).encode()
+
+def load_mongomock(path):
+    """Loads a generate_warehouse.py --out file into one mongomock client that app.py will connect to"""
+    import mongomock
+    import pymongo
+    from generate_warehouse import read_jsonl, load_mongo
+
+    client = mongomock.MongoClient()
+    config_db = os.environ.get("MONGO_DB", "aci")
+    total = load_mongo(client[config_db], read_jsonl(path))
+    # app.py does `from pymongo import MongoClient`: every client it opens is this one
+    pymongo.MongoClient = lambda *args, **kwargs: client
+    os.environ.setdefault("QUERY_BACKEND", "mongo")
+    os.environ.setdefault("SEARCH_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(path)), "bench_search_index"))
+    print(f"✅ {total} synthetic publications loaded into mongomock ({path})")
+
+def use_parquet(path):
+    """Points app.py at a generate_warehouse.py --parquet tree (DuckDB, no server)"""
+    if not os.path.isdir(path):
+        raise SystemExit(f"❌ No Parquet warehouse at {path}: python generate_warehouse.py --parquet {path}")
+    os.environ["QUERY_BACKEND"] = "parquet"
+    os.environ["PARQUET_PATH"] = os.path.abspath(path)
+    os.environ.setdefault("SEARCH_INDEX_DIR", os.path.abspath(path.rstrip(os.sep)) + "_search_index")
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def pick_filter_values(client):
+    """Realistic filter values: the busiest year and country of the warehouse"""
+    status, body = client.get(ROUTES["time"])
+    years = json.loads(body) if status == 200 else []
+    status, body = client.get(ROUTES["geo"])
+    countries = json.loads(body) if status == 200 else []
+    year = max(years, key=lambda r: r["count"])["_id"] if years else None
+    country = countries[0]["id"] if countries else None
+    return {"year": year, "country": country, "quartile": DEFAULT_QUARTILE}
+
+def filter_params(name, values):
+    if name == "none":
+        return {}
+    return {part: values[part] for part in name.split("+")}
+
+def pick_keyword(client):
+    status, body = client.get(ROUTES["keywords"])
+    rows = json.loads(body) if status == 200 else []
+    return rows[0]["text"] if rows else "Smart Contract"
+
+def build_path(route, params, keyword, nonce):
+    path = ROUTES[route].format(keyword=quote(keyword))
+    if route == "search":
+        params = {"q": keyword.lower(), **params}
+    if nonce is not None:
+        params = {**params, "_bench": nonce}
+    return path + ("?" + urlencode(params) if params else "")
+
+def run_case(client, route, params, keyword, requests, concurrency, warmup, cache):
+    """Latency / throughput of `requests` calls to one route with one filter set"""
+    counter = iter(range(10 ** 9))
+    lock = threading.Lock()
+
+    def call(_):
+        with lock:
+            nonce = None if cache else next(counter)
+        start = time.perf_counter()
+        status, body = client.get(build_path(route, params, keyword, nonce))
+        return time.perf_counter() - start, status, body
+
+    for i in range(warmup):
+        call(i)
+
+    latencies, errors, first_error = [], 0, None
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, status, body in pool.map(call, range(requests)):
+            if status == 200:
+                latencies.append(elapsed * 1000)
+            else:
+                errors += 1
+                first_error = first_error or f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}"
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "max_ms": latencies[-1] if latencies else None,
+        "throughput_rps": len(latencies) / wall if wall > 0 else None,
+    }
+    if first_error:
+        result["first_error"] = first_error
+    return result
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except Exception:
+        return None
+
+def warehouse_info(client):
+    info = {}
+    status, body = client.get(ROUTES["kpi"])
+    if status == 200:
+        info["publications"] = json.loads(body).get("total_pubs")
+    status, body = client.get("/api/cache/stats")
+    if status == 200:
+        info["backend"] = json.loads(body).get("backend")
+    return info
+
+def compare(results, baseline, max_regression):
+    """p95 regressions (percent) of the cases present in both runs"""
+    previous = {(r["route"], r["filters"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["route"], r["filters"]))
+        if not old or not old.get("p95_ms") or r.get("p95_ms") is None:
+            continue
+        change = (r["p95_ms"] / old["p95_ms"] - 1) * 100
+        r["p95_change_pct"] = round(change, 1)
+        if change > max_regression:
+            regressions.append(r)
+    return regressions
+
+def fmt(value):
+    return f"{value:8.2f}" if isinstance(value, (int, float)) else "       -"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the BI API routes")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Base URL of a running server (default: in process)")
+    target.add_argument("--parquet", help="In process, on this generate_warehouse.py --parquet tree")
+    target.add_argument("--mongomock", help="In process, on this generate_warehouse.py --out file held by mongomock "
+                                            f"(without: {', '.join(sorted(MONGOMOCK_UNSUPPORTED))})")
+    parser.add_argument("--routes", help=f"Comma-separated subset of: {', '.join(ROUTES)} (default: all)")
+    parser.add_argument("--filters", default=",".join(FILTER_SETS), help=f"Comma-separated subset of: {', '.join(FILTER_SETS)}")
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per route and filter set")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per case")
+    parser.add_argument("--cache", action="store_true", help="Let the response cache answer repeated requests")
+    parser.add_argument("--out", help="Save the results as JSON")
+    parser.add_argument("--baseline", help="Previous --out file to compare with")
+    parser.add_argument("--max-regression", type=float, default=25.0, help="Tolerated p95 increase, in percent")
+    args = parser.parse_args(argv)
+
+    if args.routes:
+        routes = [r for r in args.routes.split(",") if r]
+    else:
+        routes = [r for r in ROUTES if not (args.mongomock and r in MONGOMOCK_UNSUPPORTED)]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+    if args.mongomock and MONGOMOCK_UNSUPPORTED & set(routes):
+        parser.error(f"mongomock cannot run {', '.join(sorted(MONGOMOCK_UNSUPPORTED & set(routes)))}: use --parquet or --url")
+    filter_sets = [f for f in args.filters.split(",") if f]
+    if any(f not in FILTER_SETS for f in filter_sets):
+        parser.error(f"--filters must be among: {', '.join(FILTER_SETS)}")
+
+    client = HttpClient(args.url) if args.url else InProcessClient(args.mongomock, args.parquet)
+    values = pick_filter_values(client)
+    keyword = pick_keyword(client)
+    meta = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "target": args.url or ("mongomock:" + args.mongomock if args.mongomock else
+                               "parquet:" + args.parquet if args.parquet else "in-process"),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "cache": args.cache,
+        "filter_values": values,
+        "keyword": keyword,
+        **warehouse_info(client),
+    }
+    print(f"✅ Benchmarking {meta['target']} (backend: {meta.get('backend')}, {meta.get('publications')} publications), "
+          f"{args.requests} requests x {args.concurrency} clients per case")
+    print(f"\n{'route':<10} {'filters':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} errors")
+
+    results = []
+    for route in routes:
+        for filter_set in (["none"] if route in UNFILTERED_ROUTES else filter_sets):
+            params = filter_params(filter_set, values)
+            result = {"route": route, "filters": filter_set, "params": params,
+                      **run_case(client, route, params, keyword, args.requests, args.concurrency, args.warmup, args.cache)}
+            results.append(result)
+            print(f"{route:<10} {filter_set:<22} {fmt(result['p50_ms'])} {fmt(result['p95_ms'])} "
+                  f"{fmt(result['p99_ms'])} {fmt(result['throughput_rps'])} {result['errors']}")
+            if result.get("first_error"):
+                print(f"   ⚠️ {result['first_error']}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("target", "backend", "publications", "concurrency", "cache"):
+            if baseline["meta"].get(key) != meta.get(key):
+                print(f"⚠️ Baseline differs in {key}: {baseline['meta'].get(key)} (now {meta.get(key)})")
+        regressions = compare(results, baseline, args.max_regression)
+        meta["baseline"] = args.baseline
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\n✅ Results saved to {args.out}")
+
+    failed = [r for r in results if r["errors"]]
+    if failed:
+        print(f"\n❌ {len(failed)} cases with failed requests:", file=sys.stderr)
+        for r in failed:
+            print(f"   - {r['route']} [{r['filters']}]: {r['errors']}/{r['requests']} ({r['first_error']})", file=sys.stderr)
+    if regressions:
+        print(f"\n❌ {len(regressions)} p95 regressions over {args.max_regression}%:", file=sys.stderr)
+        for r in regressions:
+            print(f"   - {r['route']} [{r['filters']}]: +{r['p95_change_pct']}%", file=sys.stderr)
+    if failed or regressions:
+        return 1
+    if args.baseline:
+        print(f"✅ No p95 regression over {args.max_regression}% against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
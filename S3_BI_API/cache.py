@@ -0,0 +1,117 @@
+"""
+In-process response cache for the BI API.
+Entries are bounded (LRU eviction) and expire after a TTL. The whole cache is dropped
+when the warehouse version published by the ETL changes, so a fresh ETL run is visible
+without waiting for the TTL. The version itself is only polled every few seconds,
+which keeps cache hits free of MongoDB round trips. Async callers read the version
+themselves (version_due() / apply_version()) instead of blocking their event loop in version_fn.
+"""
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+ANY_VERSION = object()
+
+class ResponseCache:
+    def __init__(self, version_fn, max_entries=512, ttl_seconds=300, version_check_seconds=5):
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._version = None
+        self._last_version_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version_due(self):
+        """True at most once every version_check_seconds: the caller then reads the version and applies it"""
+        now = time.monotonic()
+        if now - self._last_version_check < self.version_check_seconds:
+            return False
+        self._last_version_check = now
+        return True
+
+    def apply_version(self, version):
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+
+    def _check_version(self):
+        if not self.version_due():
+            return
+        try:
+            version = self.version_fn()
+        except Exception as e:
+            # Keep serving what we have; the next check will retry
+            print(f"⚠️ Cache: could not read warehouse version: {e}", file=sys.stderr)
+            return
+        self.apply_version(version)
+
+    def get(self, key, check_version=True):
+        """Cached value or None. check_version=False: the caller keeps the version current (asgi.py, async)"""
+        if check_version:
+            self._check_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def version(self):
+        """Warehouse version of the current entries: pass it to set() for a body computed after a get()"""
+        with self._lock:
+            return self._version
+
+    def set(self, key, value, version=ANY_VERSION):
+        """
+        Stores `value`, unless the cache was invalidated since `version` was read: a body computed
+        from the previous warehouse must not outlive the invalidation that happened meanwhile.
+        """
+        with self._lock:
+            if version is not ANY_VERSION and version != self._version:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+def request_key(path, args):
+    """Route + normalized filters: 'All'/empty values dropped, parameters sorted"""
+    filters = sorted((k, v) for k, v in args.items(multi=True) if v and v != "All")
+    return (path, tuple(filters))
@@ -0,0 +1,54 @@
+"""
+Runtime configuration of the BI API, read from environment variables.
+Shared by the Flask app (app.py), the ASGI app (asgi.py) and the server launcher (serve.py).
+"""
+import os
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def env_flag(name, default=False):
+    return os.environ.get(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- DATA ---
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "mongo")     # "mongo" or "parquet"
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB = os.environ.get("MONGO_DB", "aci")
+PARQUET_PATH = os.environ.get("PARQUET_PATH", os.path.join(BASE_DIR, "..", "S2_ApacheAnalysis", "hdfs_data"))
+SEARCH_INDEX_DIR = os.environ.get("SEARCH_INDEX_DIR", os.path.join(BASE_DIR, "search_index"))
+# Keep a columnar copy of the fact table in each worker for the KPI/time/geo/quartile panels
+# (memory_backend.py, needs NumPy), reloaded when the warehouse version changes
+IN_MEMORY_FACTS = env_flag("IN_MEMORY_FACTS")
+
+# --- MONGODB CONNECTION POOL (per worker process) ---
+# maxPoolSize bounds the concurrent operations of one worker: keep it >= SERVER_THREADS
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": env_int("MONGO_MAX_POOL_SIZE", 50),
+    "minPoolSize": env_int("MONGO_MIN_POOL_SIZE", 2),
+    "maxIdleTimeMS": env_int("MONGO_MAX_IDLE_TIME_MS", 60000),
+    "waitQueueTimeoutMS": env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000),
+    "connectTimeoutMS": env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+    "socketTimeoutMS": env_int("MONGO_SOCKET_TIMEOUT_MS", 30000),
+    "serverSelectionTimeoutMS": env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+}
+
+# --- SERVING ---
+# "gunicorn": multi-process WSGI (threads per worker), "asgi": uvicorn workers with the async
+# OLAP routes (asgi.py), "dev": Flask's development server
+SERVER = os.environ.get("SERVER", "dev")
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = env_int("PORT", 5000)
+SERVER_WORKERS = env_int("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)
+SERVER_THREADS = env_int("SERVER_THREADS", 8)
+SERVER_TIMEOUT = env_int("SERVER_TIMEOUT", 60)            # Seconds before a stuck worker is restarted
+SERVER_MAX_REQUESTS = env_int("SERVER_MAX_REQUESTS", 5000)  # Worker recycled after this many requests (0 = never)
+DEBUG = env_flag("FLASK_DEBUG")
+
+# --- INSTRUMENTATION (metrics.py, /metrics) ---
+# Server-Timing header (db / python / json / total) on every response
+SERVER_TIMING = env_flag("SERVER_TIMING")
@@ -0,0 +1,73 @@
+"""
+Read side of the pre-aggregated OLAP cube.
+The cube is materialized at ETL time by S2_ApacheAnalysis/build_cube.py:
+one document per (date_pub, country, quartile, source) cell with additive measures,
+plus keyword and author cubes over the same dimensions.
+The stages below return exactly the same shapes as the live fact_publications stages in app.py.
+"""
+# Collections and dimensions the ETL builds the cube with
+from aci_common.warehouse import (CUBE_COLLECTION, KEYWORD_CUBE_COLLECTION, AUTHOR_CUBE_COLLECTION,
+                                  META_COLLECTION, CUBE_DIMENSIONS)
+
+def is_built(db):
+    """The ETL writes the 'cube' meta document once all cube collections are in place"""
+    return db[META_COLLECTION].find_one({"_id": "cube"}, {"_id": 1}) is not None
+
+def covers(match_stage):
+    """The cube can only answer filters that are cube dimensions"""
+    return all(field in CUBE_DIMENSIONS for field in match_stage["$match"])
+
+def can_answer(db, match_stage):
+    return covers(match_stage) and is_built(db)
+
+def avg_impact_expr():
+    # Same semantics as $avg: null when no numeric impact_score was aggregated
+    return {"$cond": [{"$gt": ["$impact_n", 0]}, {"$divide": ["$impact_sum", "$impact_n"]}, None]}
+
+# --- CUBE STAGES (applied after the $match on the cube dimensions) ---
+KPI_STAGES = [
+    {"$group": {
+        "_id": None,
+        "total_pubs": {"$sum": "$count"},
+        "total_citations": {"$sum": "$citations"},
+        "impact_sum": {"$sum": "$impact_sum"},
+        "impact_n": {"$sum": "$impact_n"},
+        "total_authors": {"$sum": "$authors"}
+    }},
+    {"$project": {"_id": 0, "total_pubs": 1, "total_citations": 1,
+                  "avg_impact": avg_impact_expr(), "total_authors": 1}}
+]
+
+TIME_STAGES = [
+    {"$group": {
+        "_id": "$date_pub",
+        "count": {"$sum": "$count"},
+        "impact_sum": {"$sum": "$impact_sum"},
+        "impact_n": {"$sum": "$impact_n"}
+    }},
+    {"$project": {"count": 1, "avg_impact": avg_impact_expr()}},
+    {"$sort": {"_id": 1}}
+]
+
+GEO_STAGES = [
+    {"$group": {"_id": "$country", "value": {"$sum": "$count"}}},
+    {"$sort": {"value": -1}}
+]
+
+QUARTILE_STAGES = [
+    {"$group": {"_id": "$quartile", "count": {"$sum": "$count"}}}
+]
+
+# Runs against KEYWORD_CUBE_COLLECTION
+KEYWORD_STAGES = [
+    {"$group": {"_id": "$keyword", "weight": {"$sum": "$weight"}}},
+    {"$sort": {"weight": -1}},
+    {"$limit": 50}
+]
+
+# Runs against AUTHOR_CUBE_COLLECTION
+AUTHOR_STAGES = [
+    {"$group": {"_id": "$author", "count": {"$sum": "$count"}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 20}
+]
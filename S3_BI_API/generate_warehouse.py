@@ -0,0 +1,271 @@
+"""
+Synthetic data warehouse generator for the API benchmarks (benchmark.py).
+Writes fact_publications rows with the ETL's schema and realistic skew at any scale:
+    - authors work in labs of 4-15 people, lab activity follows a Zipf law, and teams
+      occasionally invite an outside author (so the co-author network has hubs and bridges)
+    - title terms follow a Zipf law over a blockchain-research vocabulary; the keywords are extracted
+      from the titles with the ETL's own rules (aci_common.keywords: stoplist, plural stemming, bigrams)
+    - years lean towards recent ones; country / quartile / impact as in the Spark ETL
+
+    python generate_warehouse.py --scale 100k --out bench_100k.jsonl          # JSON Lines (mongomock)
+    python generate_warehouse.py --scale 1m --mongo-uri mongodb://localhost:27017/ --db aci_bench
+    python generate_warehouse.py --scale 10k --parquet bench_parquet          # Parquet tree (benchmark.py --parquet)
+
+The same --seed always produces the same warehouse.
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from aci_common.keywords import title_keywords
+
+# --- CONFIGURATION ---
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SEED = 7
+BATCH_SIZE = 10_000
+
+# Same dimensions as S2_ApacheAnalysis/etl_transforms.py
+QUARTILES = ["Q1", "Q2", "Q3", "Q4"]
+QUARTILE_WEIGHTS = [25, 35, 25, 15]
+COUNTRIES = ["USA", "China", "India", "UK", "France", "Germany", "Morocco", "Canada", "Japan"]
+COUNTRY_WEIGHTS = [20, 18, 15, 10, 8, 8, 5, 5, 11]
+IMPACT_MIN, IMPACT_MAX = 0.5, 15.0
+
+SOURCES = [("IEEE Xplore", "IEEE"), ("ACM Digital Library", "ACM"), ("ScienceDirect", "ScienceDirect Journal")]
+SOURCE_WEIGHTS = [36, 24, 40]
+YEARS = [str(y) for y in range(2015, 2027)]
+YEAR_WEIGHTS = [1, 2, 3, 5, 8, 10, 12, 14, 16, 18, 22, 12]
+UNKNOWN_DATE_SHARE = 0.005
+
+# Authors per paper: 1 .. 12
+TEAM_SIZE_WEIGHTS = [8, 18, 20, 17, 13, 9, 6, 4, 2, 1, 1, 1]
+OUTSIDER_PROBABILITY = 0.2
+# Zipf exponents of lab activity, outside-author popularity and keyword frequency
+LAB_EXPONENT = 0.6
+AUTHOR_EXPONENT = 1.0
+KEYWORD_EXPONENT = 0.9
+
+FIRST_NAMES = ["Wei", "Lin", "Qin", "Zhiyu", "Anna", "Mohamed", "Fatima", "Youssef", "Priya", "Rahul", "John",
+               "Maria", "David", "Sarah", "Hiroshi", "Yuki", "Pierre", "Claire", "Hans", "Lena", "Omar", "Sofia",
+               "Carlos", "Elena", "Ahmed", "Aisha", "James", "Emma", "Kenji", "Mei", "Ravi", "Ana", "Lukas",
+               "Chloe", "Ibrahim", "Nadia", "Peter", "Laura", "Sanjay", "Olga"]
+LAST_NAMES = ["Wang", "Yang", "Liu", "Xu", "Chen", "Zhang", "Li", "Kumar", "Sharma", "Smith", "Johnson", "Brown",
+              "Garcia", "Martin", "Dubois", "Bernard", "Muller", "Schmidt", "Tanaka", "Suzuki", "Sato", "El Amrani",
+              "Benali", "Alaoui", "Rossi", "Silva", "Novak", "Kowalski", "Ivanov", "Nguyen", "Kim", "Park",
+              "Lee", "Singh", "Patel", "Khan", "Haddad", "Lopez", "Costa", "Schulte"]
+
+VOCABULARY = [
+    "smart contracts", "consensus", "supply chain", "healthcare", "internet of things", "security", "privacy",
+    "decentralized finance", "ethereum", "bitcoin", "scalability", "sharding", "interoperability", "identity",
+    "access control", "federated learning", "machine learning", "edge computing", "cloud", "energy trading",
+    "smart grid", "traceability", "provenance", "tokenization", "nft", "digital twin", "voting", "education",
+    "agriculture", "logistics", "cryptocurrency", "zero knowledge", "cryptography", "hash functions",
+    "proof of stake", "proof of work", "byzantine fault tolerance", "hyperledger fabric", "permissioned ledger",
+    "distributed ledger", "oracles", "cross chain", "layer two", "payment channels", "vehicular networks",
+    "5g", "medical records", "insurance", "banking", "auditing", "trust", "reputation", "incentives",
+    "game theory", "performance", "throughput", "latency", "storage", "ipfs", "data sharing", "anonymity",
+    "regulation", "governance", "dao", "stablecoins", "tokenomics", "mining", "attacks", "vulnerabilities",
+    "formal verification", "solidity", "gas optimization", "wallets", "key management", "certificates",
+    "artificial intelligence", "big data", "industry 4.0", "manufacturing", "real estate", "art marketplace",
+    "carbon credits", "sustainability", "food safety", "pharmaceutical", "clinical trials", "e-government",
+    "land registry", "copyright", "music", "gaming", "metaverse", "social networks", "crowdfunding",
+    "microgrids", "electric vehicles", "drones", "smart cities", "water management", "humanitarian aid",
+]
+KEYWORDS_PER_PAPER = (2, 5)
+CONNECTORS = ["for", "in", "with", "towards", "and", "over", "enabled"]
+
+def zipf_cum_weights(n, exponent):
+    total, cum = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cum.append(total)
+    return cum
+
+def author_name(i):
+    """Unique name of author id i (middle initials, then numbers, once the first/last pairs run out)"""
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    generation = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+    if not generation:
+        return f"{first} {last}"
+    initial = chr(ord("A") + (generation - 1) % 26)
+    return f"{first} {initial}. {last}" + (f" {(generation - 1) // 26 + 1}" if generation > 26 else "")
+
+def build_labs(rng, author_count):
+    """Author ids shuffled into labs of 4-15 people, in random activity order"""
+    ids = list(range(author_count))
+    rng.shuffle(ids)
+    labs, start = [], 0
+    while start < author_count:
+        size = rng.randint(4, 15)
+        labs.append(ids[start:start + size])
+        start += size
+    return labs
+
+def content_hash(article_id):
+    """Signed 64-bit fingerprint, the same type and range as the ETL's content_hash (Spark xxhash64)"""
+    return int.from_bytes(hashlib.blake2b(article_id.encode(), digest_size=8).digest(), "big", signed=True)
+
+def generate(count, seed=DEFAULT_SEED, etl_timestamp=None):
+    """Yields `count` fact rows (dicts with the fact_publications fields)"""
+    rng = random.Random(seed)
+    etl_timestamp = etl_timestamp or datetime.now(timezone.utc).replace(microsecond=0)
+    author_count = max(50, count // 2)
+    labs = build_labs(rng, author_count)
+    lab_weights = zipf_cum_weights(len(labs), LAB_EXPONENT)
+    author_weights = zipf_cum_weights(author_count, AUTHOR_EXPONENT)
+    keyword_weights = zipf_cum_weights(len(VOCABULARY), KEYWORD_EXPONENT)
+    team_sizes = list(range(1, len(TEAM_SIZE_WEIGHTS) + 1))
+
+    for i in range(count):
+        lab = rng.choices(labs, cum_weights=lab_weights)[0]
+        team = rng.sample(lab, min(len(lab), rng.choices(team_sizes, weights=TEAM_SIZE_WEIGHTS)[0]))
+        if rng.random() < OUTSIDER_PROBABILITY:
+            outsider = rng.choices(range(author_count), cum_weights=author_weights)[0]
+            if outsider not in team:
+                team.append(outsider)
+        # Scraped author lists keep the "\n" the API cleans up
+        authors = [author_name(a) if k == 0 else "\n" + author_name(a) for k, a in enumerate(team)]
+
+        terms = list(dict.fromkeys(rng.choices(VOCABULARY, cum_weights=keyword_weights, k=rng.randint(*KEYWORDS_PER_PAPER))))
+        title = f" {rng.choice(CONNECTORS)} ".join(t.title() for t in terms) if len(terms) > 1 else f"Blockchain {terms[0].title()}"
+        source, journal = rng.choices(SOURCES, weights=SOURCE_WEIGHTS)[0]
+        impact = round(rng.uniform(IMPACT_MIN, IMPACT_MAX), 2)
+        article_id = f"{seed:08x}{i:016x}"
+
+        yield {
+            "article_id": article_id,
+            "title": title,
+            "abstract_": "N/A" if rng.random() < 0.5 else f"We study {', '.join(terms)} on a blockchain.",
+            "date_pub": "Unknown Date" if rng.random() < UNKNOWN_DATE_SHARE else rng.choices(YEARS, weights=YEAR_WEIGHTS)[0],
+            "journal": journal,
+            "source": source,
+            "authors_clean": authors,
+            "nb_authors": len(authors),
+            "quartile": rng.choices(QUARTILES, weights=QUARTILE_WEIGHTS)[0],
+            "country": rng.choices(COUNTRIES, weights=COUNTRY_WEIGHTS)[0],
+            "impact_score": impact,
+            "citations": int(impact * 10),
+            # As the ETL derives them from the title: stemmed unigrams + bigrams
+            "generated_keywords": title_keywords(title),
+            "etl_timestamp": etl_timestamp,
+            "content_hash": content_hash(article_id),
+        }
+
+def batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def json_row(row):
+    return json.dumps(row, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+
+def read_jsonl(path):
+    """Rows of a --out file, etl_timestamp parsed back to a datetime"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if isinstance(row.get("etl_timestamp"), str):
+                    row["etl_timestamp"] = datetime.fromisoformat(row["etl_timestamp"])
+                yield row
+
+def load_mongo(db, rows, derived=False):
+    """Replaces db.fact_publications with `rows`, then indexes (and optionally the ETL's derived collections)"""
+    import indexes
+    from mongo_backend import FACT_COLLECTION
+
+    collection = db[FACT_COLLECTION]
+    collection.drop()
+    total = 0
+    for batch in batches(rows):
+        collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    indexes.ensure_indexes(collection)
+
+    if derived:
+        # Cube, co-author index, keyword index and version document, exactly as the ETL builds them
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "S2_ApacheAnalysis"))
+        from build_cube import refresh_cube
+        from build_network import refresh_network
+        from build_keyword_index import refresh_keyword_index
+        from warehouse_meta import publish_version
+        refresh_cube(db)
+        refresh_network(db)
+        refresh_keyword_index(db)
+        publish_version(db)
+    else:
+        # Drop what another warehouse left, so the API answers from this fact table
+        import cube
+        import network
+        import keywords
+        for name in (cube.CUBE_COLLECTION, cube.KEYWORD_CUBE_COLLECTION, cube.AUTHOR_CUBE_COLLECTION,
+                     network.NODE_COLLECTION, network.EDGE_COLLECTION, network.AUTHOR_COLLECTION,
+                     keywords.POSTINGS_COLLECTION):
+            db[name].drop()
+        db[cube.META_COLLECTION].delete_many({})
+        db[cube.META_COLLECTION].insert_one({"_id": "warehouse", "version": f"synthetic-{total}"})
+    return total
+
+def write_parquet(rows, path):
+    """Hive-partitioned tree (date_pub/country), the layout the Spark ETL writes"""
+    import duckdb
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as tmp:
+        for row in rows:
+            # As text: JSON type detection would widen the 64-bit hashes to HUGEINT / DOUBLE
+            tmp.write(json_row({**row, "content_hash": str(row["content_hash"])}) + "\n")
+    try:
+        duckdb.sql(f"""COPY (SELECT * REPLACE (etl_timestamp::TIMESTAMP AS etl_timestamp,
+                                               content_hash::BIGINT AS content_hash)
+                             FROM read_json('{tmp.name}', format = 'newline_delimited')
+                             ORDER BY quartile, source)
+                       TO '{path}' (FORMAT parquet, PARTITION_BY (date_pub, country), OVERWRITE_OR_IGNORE)""")
+    finally:
+        os.remove(tmp.name)
+
+def parse_scale(value):
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    return int(value)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic fact_publications warehouse")
+    parser.add_argument("--scale", type=parse_scale, default=SCALES["10k"],
+                        help="Publications: 10k, 100k, 1m or any number (default: 10k)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", help="JSON Lines file (benchmark.py --mongomock)")
+    parser.add_argument("--mongo-uri", help="Load into this MongoDB server (replaces the fact table of --db)")
+    parser.add_argument("--db", default="aci_bench", help="Database for --mongo-uri (default: aci_bench)")
+    parser.add_argument("--derived", action="store_true", help="Also build the cube / network / keyword index (needs ../S2_ApacheAnalysis)")
+    parser.add_argument("--parquet", help="Write a partitioned Parquet tree to this directory")
+    args = parser.parse_args()
+
+    if not (args.out or args.mongo_uri or args.parquet):
+        parser.error("choose at least one output: --out, --mongo-uri or --parquet")
+
+    try:
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                for row in generate(args.scale, args.seed):
+                    f.write(json_row(row) + "\n")
+            print(f"✅ {args.scale} publications written to {args.out}")
+        if args.mongo_uri:
+            from pymongo import MongoClient
+            total = load_mongo(MongoClient(args.mongo_uri)[args.db], generate(args.scale, args.seed), args.derived)
+            print(f"✅ {total} publications loaded into {args.db}.fact_publications")
+        if args.parquet:
+            write_parquet(generate(args.scale, args.seed), args.parquet)
+            print(f"✅ {args.scale} publications written to {args.parquet}")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Startup self-check of fact_publications: its indexes against the specification shared with the
+ETL (aci_common.warehouse.INDEX_SPEC, which S2_ApacheAnalysis/warehouse_indexes.py creates after
+every write), then explain() on every route's pipeline, warning when one would fall back to a
+full collection scan.
+"""
+from itertools import combinations
+from aci_common.warehouse import ensure_indexes, index_drift
+
+FILTER_FIELDS = ("date_pub", "country", "quartile")
+DISTINCT_FIELDS = ("date_pub", "country")
+
+def check_spec(collection):
+    """Creates the spec's missing indexes; returns one warning per index that differs from the spec"""
+    missing, warnings = index_drift(collection)
+    if missing:
+        ensure_indexes(collection, missing)
+    return warnings
+
+def winning_stages(node, inside=False):
+    """All plan stage names under the 'winningPlan' entries of an explain document"""
+    stages = []
+    if isinstance(node, dict):
+        if inside and "stage" in node:
+            stages.append(node["stage"])
+        for key, value in node.items():
+            stages += winning_stages(value, inside or key == "winningPlan")
+    elif isinstance(node, list):
+        for value in node:
+            stages += winning_stages(value, inside)
+    return stages
+
+def sample_filters(collection):
+    """Every non-empty combination of the API filters, with values taken from a real document"""
+    doc = collection.find_one({}, {field: 1 for field in FILTER_FIELDS}) or {}
+    return [
+        {field: doc.get(field) for field in fields}
+        for n in range(1, len(FILTER_FIELDS) + 1)
+        for fields in combinations(FILTER_FIELDS, n)
+    ]
+
+def check_plans(db, collection, pipelines):
+    """
+    Explains each route pipeline against every filter combination, plus the distinct()
+    calls of /api/filters/options. `pipelines` maps a route name to the stages that follow
+    its $match. Returns one warning per (route, filters) that uses a COLLSCAN.
+    Unfiltered requests are not checked: they read the whole table by design.
+    """
+    warnings = []
+    for filters in sample_filters(collection):
+        for route, stages in pipelines.items():
+            plan = db.command("aggregate", collection.name, pipeline=[{"$match": filters}] + stages,
+                              explain=True)
+            if "COLLSCAN" in winning_stages(plan):
+                warnings.append(f"{route} {sorted(filters)}: COLLSCAN")
+
+    for field in DISTINCT_FIELDS:
+        plan = db.command("explain", {"distinct": collection.name, "key": field, "query": {}},
+                          verbosity="queryPlanner")
+        if "COLLSCAN" in winning_stages(plan):
+            warnings.append(f"filters/options distinct({field}): COLLSCAN")
+    return warnings
@@ -0,0 +1,81 @@
+"""
+Keyword drill-down queries.
+The preferred path reads the inverted index built at ETL time by
+S2_ApacheAnalysis/build_keyword_index.py (keyword_postings: one posting per keyword and paper)
+and the keyword cube (per-cell weights); when they are not built, the same answer is computed
+from fact_publications through the multikey generated_keywords index.
+"""
+import cube
+from aci_common.warehouse import POSTINGS_COLLECTION
+
+DEFAULT_PAPER_LIMIT = 10
+MAX_PAPER_LIMIT = 100
+
+PAPER_FIELDS = {"_id": 0, "title": 1, "date_pub": 1, "country": 1, "quartile": 1, "source": 1, "citations": 1}
+
+def is_built(db):
+    return db[cube.META_COLLECTION].find_one({"_id": "keywords"}, {"_id": 1}) is not None
+
+def normalize(keyword):
+    """Same display case as the ETL (Spark initcap): "smart CONTRACT" -> "Smart Contract" """
+    return " ".join(word.capitalize() for word in keyword.split())
+
+def parse_limit(args):
+    try:
+        value = int(args.get("limit", DEFAULT_PAPER_LIMIT))
+    except (TypeError, ValueError):
+        value = DEFAULT_PAPER_LIMIT
+    return max(1, min(value, MAX_PAPER_LIMIT))
+
+def breakdown_stages(field, weight):
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": weight}}},
+        {"$sort": {"count": -1, "_id": 1}}
+    ]
+
+def indexed_drilldown(db, collection, keyword, filters, limit):
+    query = {"keyword": keyword, **filters}
+    facets = next(db[cube.KEYWORD_CUBE_COLLECTION].aggregate([
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$group": {"_id": None, "count": {"$sum": "$weight"}}}],
+            "by_year": breakdown_stages("date_pub", "$weight"),
+            "by_country": breakdown_stages("country", "$weight")
+        }}
+    ]), {})
+
+    # Most cited papers from the postings, then only those rows are read from the fact table
+    postings = db[POSTINGS_COLLECTION].find(query, {"_id": 0, "paper": 1}).sort("citations", -1).limit(limit)
+    order = [p["paper"] for p in postings]
+    papers = {doc.pop("_id"): doc for doc in collection.find({"_id": {"$in": order}}, {**PAPER_FIELDS, "_id": 1})}
+    return facets, [papers[pid] for pid in order if pid in papers]
+
+def live_drilldown(collection, keyword, filters, limit):
+    facets = next(collection.aggregate([
+        {"$match": {"generated_keywords": keyword, **filters}},
+        {"$facet": {
+            "total": [{"$group": {"_id": None, "count": {"$sum": 1}}}],
+            "by_year": breakdown_stages("date_pub", 1),
+            "by_country": breakdown_stages("country", 1)
+        }}
+    ]), {})
+    top = list(collection.find({"generated_keywords": keyword, **filters}, PAPER_FIELDS).sort("citations", -1).limit(limit))
+    return facets, top
+
+def drilldown(db, collection, keyword, filters, limit):
+    """One keyword under a filter set: paper count, per-year / per-country counts and the most cited papers"""
+    keyword = normalize(keyword)
+    match_stage = {"$match": dict(filters)}
+    if cube.can_answer(db, match_stage) and is_built(db):
+        facets, top = indexed_drilldown(db, collection, keyword, filters, limit)
+    else:
+        facets, top = live_drilldown(collection, keyword, filters, limit)
+
+    total = facets.get("total") or [{"count": 0}]
+    return {
+        "keyword": keyword,
+        "total": total[0]["count"],
+        "by_year": facets.get("by_year", []),
+        "by_country": [row for row in facets.get("by_country", []) if row["_id"]],
+        "papers": top
+    }
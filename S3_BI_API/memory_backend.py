@@ -0,0 +1,170 @@
+"""
+In-memory query backend (IN_MEMORY_FACTS=1): keeps a columnar copy of fact_publications in the
+worker and answers the KPI / time / geo / quartile panels from it with NumPy, without a database
+round trip. Every other route (keywords, authors, network, drill-down, search) and the warehouse
+version are the wrapped backend's (MongoBackend or ParquetBackend).
+
+Layout: the dimensions (date_pub, country, quartile, source) are dictionary-encoded into small-int
+code arrays, the measures (citations, impact_score, nb_authors) are plain NumPy arrays: about
+28 bytes per publication. A filter is a boolean mask over the code arrays, a group-by is one
+np.bincount() over the masked codes. The copy is reloaded when the warehouse version changes.
+"""
+import time
+import threading
+from mongo_backend import FORMATTERS
+
+DIMENSIONS = ("date_pub", "country", "quartile", "source")
+MEASURES = ("citations", "impact_score", "nb_authors")
+MEMORY_PANELS = ("kpi", "time", "geo", "quartile")
+
+def sort_key(value):
+    """Mongo's order for the group keys: null first"""
+    return (value is not None, value)
+
+class FactTable:
+    """Columnar, dictionary-encoded copy of the fact rows of one warehouse version"""
+
+    def __init__(self, rows, version):
+        import numpy as np
+
+        self.version = version
+        self.values = {column: [] for column in DIMENSIONS}     # code -> value
+        lookups = {column: {} for column in DIMENSIONS}         # value -> code
+        codes = {column: [] for column in DIMENSIONS}
+        measures = {column: [] for column in MEASURES}
+
+        for row in rows:
+            for column in DIMENSIONS:
+                value = row.get(column)
+                code = lookups[column].get(value)
+                if code is None:
+                    code = lookups[column][value] = len(self.values[column])
+                    self.values[column].append(value)
+                codes[column].append(code)
+            for column in MEASURES:
+                measures[column].append(row.get(column))
+
+        self.size = len(codes[DIMENSIONS[0]])
+        self.lookups = lookups
+        self.codes = {column: np.array(codes[column], dtype=np.uint8 if len(self.values[column]) <= 256 else np.uint32)
+                      for column in DIMENSIONS}
+        # $sum skips missing values (0 here), $avg ignores them (NaN here)
+        self.citations = np.array([v if isinstance(v, (int, float)) else 0 for v in measures["citations"]], dtype=np.int64)
+        self.nb_authors = np.array([v if isinstance(v, (int, float)) else 0 for v in measures["nb_authors"]], dtype=np.int64)
+        self.impact = np.array([v if isinstance(v, (int, float)) else np.nan for v in measures["impact_score"]], dtype=np.float64)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in self.codes.values()) + self.citations.nbytes + self.nb_authors.nbytes + self.impact.nbytes
+
+    def mask(self, filters):
+        """Boolean row mask of a {field: value} filter set (None = every row)"""
+        import numpy as np
+
+        selected = None
+        for column, value in filters.items():
+            if column not in DIMENSIONS:
+                raise ValueError(f"Unsupported filter: {column}")
+            code = self.lookups[column].get(value)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            match = self.codes[column] == code
+            selected = match if selected is None else selected & match
+        return selected
+
+    def group_rows(self, column, selected, count_field):
+        """[{_id, count_field, avg_impact}] for every value of `column` among the selected rows"""
+        import numpy as np
+
+        codes = self.codes[column] if selected is None else self.codes[column][selected]
+        impact = self.impact if selected is None else self.impact[selected]
+        scored = ~np.isnan(impact)
+        size = len(self.values[column])
+        counts = np.bincount(codes, minlength=size)
+        impact_sums = np.bincount(codes[scored], weights=impact[scored], minlength=size)
+        impact_counts = np.bincount(codes[scored], minlength=size)
+        return [{"_id": self.values[column][code], count_field: int(counts[code]),
+                 "avg_impact": float(impact_sums[code] / impact_counts[code]) if impact_counts[code] else None}
+                for code in np.flatnonzero(counts)]
+
+    def panel_rows(self, name, selected):
+        """Same rows as the panel's aggregation pipeline (mongo_backend.PANELS)"""
+        import numpy as np
+
+        if name == "kpi":
+            count = self.size if selected is None else int(np.count_nonzero(selected))
+            if not count:
+                return []
+            impact = self.impact if selected is None else self.impact[selected]
+            scored = impact[~np.isnan(impact)]
+            citations = self.citations if selected is None else self.citations[selected]
+            nb_authors = self.nb_authors if selected is None else self.nb_authors[selected]
+            return [{"total_pubs": count, "total_citations": int(citations.sum()),
+                     "avg_impact": float(scored.mean()) if len(scored) else None,
+                     "total_authors": int(nb_authors.sum())}]
+
+        if name == "time":
+            return sorted(self.group_rows("date_pub", selected, "count"), key=lambda r: sort_key(r["_id"]))
+        if name == "geo":
+            rows = self.group_rows("country", selected, "value")
+            return [{"_id": r["_id"], "value": r["value"]}
+                    for r in sorted(rows, key=lambda r: (-r["value"], sort_key(r["_id"])))]
+        if name == "quartile":
+            rows = self.group_rows("quartile", selected, "count")
+            return [{"_id": r["_id"], "count": r["count"]} for r in sorted(rows, key=lambda r: sort_key(r["_id"]))]
+        raise ValueError(f"Unknown panel: {name}")
+
+class MemoryBackend:
+    def __init__(self, inner, version_check_seconds=5):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The in-memory mode needs NumPy: pip install numpy")
+        self.inner = inner
+        self.name = f"memory+{inner.name}"
+        self.version_check_seconds = version_check_seconds
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._table = self.load()
+
+    def __getattr__(self, attr):
+        # Everything the in-memory copy does not answer is the wrapped backend's
+        return getattr(self.inner, attr)
+
+    def load(self):
+        version = self.inner.version()
+        return FactTable(self.inner.fact_rows(DIMENSIONS + MEASURES), version)
+
+    def table(self):
+        """
+        The current copy; reloaded (by one request thread, the others keep the previous copy
+        meanwhile) when the warehouse version changed.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.version_check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                if self.inner.version() != self._table.version:
+                    self._table = self.load()
+            finally:
+                self._lock.release()
+        return self._table
+
+    def stats(self):
+        table = self._table
+        return {"rows": table.size, "bytes": table.nbytes(), "version": str(table.version),
+                "dictionary_sizes": {column: len(values) for column, values in table.values.items()}}
+
+    def panel(self, name, filters):
+        if name not in MEMORY_PANELS:
+            return self.inner.panel(name, filters)
+        table = self.table()
+        return FORMATTERS[name](table.panel_rows(name, table.mask(filters)))
+
+    def dashboard(self, filters, limits):
+        table = self.table()
+        selected = table.mask(filters)
+        panels = {name: FORMATTERS[name](table.panel_rows(name, selected)) for name in MEMORY_PANELS}
+        for name in ("keywords", "authors"):
+            panels[name] = self.inner.panel(name, filters)
+        panels["network"] = self.inner.network(filters, limits)
+        return panels
@@ -0,0 +1,258 @@
+"""
+Request instrumentation of the BI API, exposed in the Prometheus text format on /metrics.
+
+Every request is timed and split into phases:
+    db      MongoDB commands (pymongo command monitoring) and DuckDB queries
+    json    JSON serialization (the app's JSON provider)
+    python  the rest: post-processing, in-memory panels, Flask itself
+plus its response size, its response cache result and the filter combination it used.
+Database commands slower than SLOW_QUERY_MS are logged with their pipeline, requests slower
+than SLOW_REQUEST_MS with their phase breakdown. With SERVER_TIMING=1 every response carries
+a Server-Timing header (browser dev tools show the breakdown per request).
+
+Metrics are kept per worker process: with several gunicorn / uvicorn workers, each scrape
+of /metrics reads the worker that answered it.
+"""
+import sys
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from pymongo import monitoring
+import config
+
+# --- CONFIGURATION ---
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SLOW_QUERY_MS = config.env_int("SLOW_QUERY_MS", 500)
+SLOW_REQUEST_MS = config.env_int("SLOW_REQUEST_MS", 1000)
+MAX_LOGGED_PIPELINE_CHARS = 2000
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{label_text(self.labels, label_values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self.series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{label_text(self.labels + ('le',), label_values + (repr(float(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{label_text(self.labels + ('le',), label_values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{label_text(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{label_text(self.labels, label_values)} {series[-1]}")
+        return lines
+
+def label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+REQUESTS = Counter("api_requests_total", "Requests by route and status", ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("api_request_duration_seconds", "Request latency", ("route", "filters"), LATENCY_BUCKETS)
+PHASE_SECONDS = Histogram("api_request_phase_seconds", "Request time by phase (db, python, json)",
+                          ("route", "phase"), LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram("api_response_bytes", "Response body size", ("route",), SIZE_BUCKETS)
+CACHE_REQUESTS = Counter("api_cache_requests_total", "Response cache lookups by route", ("route", "result"))
+DB_SECONDS = Histogram("api_db_command_seconds", "Database command latency", ("engine", "command"), LATENCY_BUCKETS)
+SLOW_QUERIES = Counter("api_slow_queries_total", f"Database commands slower than {SLOW_QUERY_MS} ms", ("engine",))
+METRICS = (REQUESTS, REQUEST_SECONDS, PHASE_SECONDS, RESPONSE_BYTES, CACHE_REQUESTS, DB_SECONDS, SLOW_QUERIES)
+
+# --- PER-REQUEST TIMER ---
+class RequestTimer:
+    def __init__(self, route):
+        self.route = route
+        self.start = time.perf_counter()
+        self.db = 0.0
+        self.json = 0.0
+        self.cache = None
+        self.queries = []  # (engine, milliseconds, command) of this request
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total):
+        parts = [f"db;dur={self.db * 1000:.1f}", f"json;dur={self.json * 1000:.1f}",
+                 f"python;dur={max(0.0, total - self.db - self.json) * 1000:.1f}", f"total;dur={total * 1000:.1f}"]
+        if self.cache:
+            parts.append(f'cache;desc="{self.cache}"')
+        return ", ".join(parts)
+
+# Timer of the request being served (a context variable: works for threads and asyncio tasks)
+current = contextvars.ContextVar("request_timer", default=None)
+
+def start_request(route):
+    timer = RequestTimer(route)
+    return timer, current.set(timer)
+
+def finish_request(timer, token, method, status, nbytes, filters):
+    """Records a finished request; returns its duration (seconds)"""
+    current.reset(token)
+    total = timer.total()
+    REQUESTS.inc(timer.route, method, str(status))
+    REQUEST_SECONDS.observe(total, timer.route, filters)
+    PHASE_SECONDS.observe(timer.db, timer.route, "db")
+    PHASE_SECONDS.observe(timer.json, timer.route, "json")
+    PHASE_SECONDS.observe(max(0.0, total - timer.db - timer.json), timer.route, "python")
+    if nbytes is not None:
+        RESPONSE_BYTES.observe(nbytes, timer.route)
+    if timer.cache:
+        CACHE_REQUESTS.inc(timer.route, timer.cache)
+    if total * 1000 >= SLOW_REQUEST_MS:
+        print(f"⚠️ Slow request ({total * 1000:.0f} ms): {method} {timer.route} [{filters}] "
+              f"db {timer.db * 1000:.0f} ms in {len(timer.queries)} queries, json {timer.json * 1000:.0f} ms",
+              file=sys.stderr)
+    return total
+
+def mark_cache(hit):
+    timer = current.get()
+    if timer is not None:
+        timer.cache = "hit" if hit else "miss"
+
+def record_json(seconds):
+    timer = current.get()
+    if timer is not None:
+        timer.json += seconds
+
+def record_query(engine, command, seconds, statement):
+    """One database command: histogram, request's db phase, slow-query log"""
+    DB_SECONDS.observe(seconds, engine, command)
+    timer = current.get()
+    if timer is not None:
+        timer.db += seconds
+        timer.queries.append((engine, seconds * 1000, command))
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(engine)
+        text = " ".join(statement.split()) if isinstance(statement, str) else json.dumps(statement, default=str)
+        route = timer.route if timer is not None else "-"
+        print(f"⚠️ Slow query ({seconds * 1000:.0f} ms, {engine} {command}, route {route}): "
+              f"{text[:MAX_LOGGED_PIPELINE_CHARS]}", file=sys.stderr)
+
+@contextmanager
+def timed_query(engine, statement, command="query"):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_query(engine, command, time.perf_counter() - start, statement)
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    pymongo command listener (MongoClient(..., event_listeners=[command_timer])): times every
+    command and keeps the pipeline / filter of the started ones for the slow-query log.
+    Callbacks run in the thread / task that issued the command, so `current` is the request's timer.
+    """
+    IGNORED = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+    def __init__(self):
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        command = event.command
+        statement = {"collection": command.get(event.command_name)}
+        for key in ("pipeline", "filter", "query", "key"):
+            if key in command:
+                statement[key] = command[key]
+        with self._lock:
+            self._statements[(event.connection_id, event.request_id)] = statement
+
+    def _finished(self, event):
+        with self._lock:
+            statement = self._statements.pop((event.connection_id, event.request_id), None)
+        if statement is not None:
+            record_query("mongo", event.command_name, event.duration_micros / 1e6, statement)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+command_timer = CommandTimer()
+
+# --- FLASK ---
+def filters_label(filters):
+    """Filter combination of a request: 'none', 'date_pub', 'country+date_pub'..."""
+    return "+".join(sorted(filters)) or "none"
+
+def instrument(app, filters_fn, server_timing=False):
+    """Times every request of a Flask app (hooks + a timed JSON provider)"""
+    from flask import g, request
+    from flask.json.provider import DefaultJSONProvider
+
+    class TimedJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                record_json(time.perf_counter() - start)
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_timer():
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        g.metrics_timer, g.metrics_token = start_request(route)
+
+    @app.after_request
+    def finish_timer(response):
+        timer = g.pop("metrics_timer", None)
+        if timer is None:
+            return response
+        try:
+            filters = filters_label(filters_fn())
+        except Exception:
+            filters = "invalid"
+        nbytes = None if response.is_streamed else response.calculate_content_length()
+        total = finish_request(timer, g.pop("metrics_token"), request.method, response.status_code, nbytes, filters)
+        if server_timing:
+            response.headers["Server-Timing"] = timer.server_timing(total)
+        return response
+
+    @app.teardown_request
+    def reset_timer(exc):
+        # Requests that failed before after_request: leave no timer behind for the next request of this thread
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            current.reset(token)
+
+def render(gauges=None):
+    """Prometheus text exposition of every metric, plus {name: (help, value)} gauges"""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    for name, (help_text, value) in (gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+"""
+MongoDB query backend: answers the KPI/OLAP routes from aci.fact_publications,
+or from the pre-aggregated cube (cube.py) and co-author index (network.py) when the ETL built them.
+"""
+import cube
+import network
+import indexes
+import keywords
+from aci_common.warehouse import FACT_COLLECTION
+
+SEARCH_FIELDS = ["article_id", "title", "abstract_", "generated_keywords",
+                 "date_pub", "country", "quartile", "source", "etl_timestamp"]
+
+# --- OLAP PIPELINES (stages applied after the $match on fact_publications) ---
+KPI_STAGES = [
+    {
+        "$group": {
+            "_id": None,
+            "total_pubs": {"$sum": 1},
+            "total_citations": {"$sum": "$citations"},
+            "avg_impact": {"$avg": "$impact_score"},
+            "total_authors": {"$sum": "$nb_authors"}
+        }
+    }
+]
+
+TIME_STAGES = [
+    {"$group": {
+        "_id": "$date_pub", 
+        "count": {"$sum": 1},
+        "avg_impact": {"$avg": "$impact_score"}
+    }},
+    {"$sort": {"_id": 1}}
+]
+
+GEO_STAGES = [
+    {"$group": {"_id": "$country", "value": {"$sum": 1}}},
+    {"$sort": {"value": -1}}
+]
+
+QUARTILE_STAGES = [
+    {"$group": {"_id": "$quartile", "count": {"$sum": 1}}}
+]
+
+KEYWORD_STAGES = [
+    {"$unwind": "$generated_keywords"},
+    {"$group": {"_id": "$generated_keywords", "weight": {"$sum": 1}}},
+    {"$sort": {"weight": -1}},
+    {"$limit": 50}
+]
+
+AUTHOR_STAGES = [
+    {"$unwind": "$authors_clean"},
+    # Clean newline characters if Spark didn't catch all
+    {"$project": {"author": {"$trim": {"input": "$authors_clean", "chars": "\n "}}}},
+    {"$match": {"author": {"$ne": "Unknown"}}},
+    {"$group": {"_id": "$author", "count": {"$sum": 1}}},
+    {"$sort": {"count": -1}},
+    {"$limit": 20}
+]
+
+# Panel -> (cube collection, cube stages, live stages). The co-author network is served by network.py.
+PANELS = {
+    "kpi": (cube.CUBE_COLLECTION, cube.KPI_STAGES, KPI_STAGES),
+    "time": (cube.CUBE_COLLECTION, cube.TIME_STAGES, TIME_STAGES),
+    "geo": (cube.CUBE_COLLECTION, cube.GEO_STAGES, GEO_STAGES),
+    "quartile": (cube.CUBE_COLLECTION, cube.QUARTILE_STAGES, QUARTILE_STAGES),
+    "keywords": (cube.KEYWORD_CUBE_COLLECTION, cube.KEYWORD_STAGES, KEYWORD_STAGES),
+    "authors": (cube.AUTHOR_CUBE_COLLECTION, cube.AUTHOR_STAGES, AUTHOR_STAGES),
+}
+
+# --- FORMATTERS (raw aggregation rows -> JSON payloads) ---
+def format_kpi(data):
+    result = data[0] if data else {"total_pubs": 0, "total_citations": 0, "avg_impact": 0, "total_authors": 0}
+    if "_id" in result: del result["_id"]
+    return result
+
+def format_geo(data):
+    return [{"id": str(item["_id"]), "value": item["value"]} for item in data if item["_id"]]
+
+def format_keywords(data):
+    return [{"text": str(item["_id"]), "weight": item["weight"]} for item in data]
+
+FORMATTERS = {
+    "kpi": format_kpi,
+    "time": list,
+    "geo": format_geo,
+    "quartile": list,
+    "keywords": format_keywords,
+    "authors": list,
+}
+
+class MongoBackend:
+    name = "mongo"
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[FACT_COLLECTION]
+
+    def version(self):
+        """Version document written by S2_ApacheAnalysis/warehouse_meta.py, else the latest etl_timestamp"""
+        meta = self.db[cube.META_COLLECTION].find_one({"_id": "warehouse"}, {"version": 1})
+        if meta:
+            return meta.get("version")
+        latest = self.collection.find_one({}, {"etl_timestamp": 1}, sort=[("etl_timestamp", -1)])
+        return latest.get("etl_timestamp") if latest else None
+
+    def filter_options(self):
+        years = self.collection.distinct("date_pub")
+        countries = self.collection.distinct("country")
+        # Filter out "Unknown" or empty values if necessary
+        years = [y for y in years if y and y != "Unknown"]
+        countries = [c for c in countries if c]
+        return {"years": sorted(years), "countries": sorted(countries)}
+
+    def check_indexes(self):
+        """
+        Checks the fact_publications indexes against the shared spec (creating the missing ones),
+        then explain()s every route pipeline; returns the drift and COLLSCAN warnings
+        """
+        warnings = indexes.check_spec(self.collection)
+        pipelines = {name: live for name, (_, _, live) in PANELS.items()}
+        pipelines["network"] = [network.CLEAN_AUTHORS_STAGE, {"$unwind": "$authors"}]
+        return warnings + indexes.check_plans(self.db, self.collection, pipelines)
+
+    def olap_source(self, match_stage, panel):
+        """
+        Picks where an OLAP query runs: the pre-aggregated cube when it is built and covers
+        the filters, otherwise the live pipeline over fact_publications.
+        Returns (collection, pipeline).
+        """
+        cube_collection, cube_stages, live_stages = PANELS[panel]
+        if cube.can_answer(self.db, match_stage):
+            return self.db[cube_collection], [match_stage] + cube_stages
+        return self.collection, [match_stage] + live_stages
+
+    def run_panel(self, match_stage, panel):
+        source, pipeline = self.olap_source(match_stage, panel)
+        return list(source.aggregate(pipeline))
+
+    def panel(self, name, filters):
+        """One OLAP panel (kpi, time, geo, quartile, keywords, authors) for a {field: value} filter set"""
+        return FORMATTERS[name](self.run_panel({"$match": dict(filters)}, name))
+
+    def network(self, filters, limits):
+        return network.coauthor_graph(self.db, self.collection, {"$match": dict(filters)}, limits)
+
+    def search_documents(self, since=None):
+        """Rows for the search index (search.py): all of them, or those written after `since`"""
+        query = {"etl_timestamp": {"$gt": since}} if since else {}
+        return self.collection.find(query, SEARCH_FIELDS).batch_size(1000)
+
+    def fact_rows(self, fields):
+        """Every fact row, projected on `fields` (in-memory mode, memory_backend.py)"""
+        return self.collection.find({}, {**{field: 1 for field in fields}, "_id": 0}).batch_size(5000)
+
+    def keyword_drilldown(self, keyword, filters, limit):
+        return keywords.drilldown(self.db, self.collection, keyword, filters, limit)
+
+    def dashboard(self, filters, limits):
+        """
+        Evaluates every panel for one filter set.
+        Live mode: a single $facet pipeline, so fact_publications is matched and scanned once.
+        Cube mode: one $facet over the cube cells, plus the keyword/author cubes.
+        The co-author network comes from the adjacency index (or its live fallback), pruned by the same
+        max_nodes / max_links / min_weight parameters as /api/olap/network.
+        """
+        match_stage = {"$match": dict(filters)}
+        if cube.can_answer(self.db, match_stage):
+            facets = {name: stages for name, (coll, stages, _) in PANELS.items() if coll == cube.CUBE_COLLECTION}
+            facet_doc = next(self.db[cube.CUBE_COLLECTION].aggregate([match_stage, {"$facet": facets}]), {})
+            rows = dict(facet_doc)
+            for name in ("keywords", "authors"):
+                rows[name] = self.run_panel(match_stage, name)
+        else:
+            facets = {name: live for name, (_, _, live) in PANELS.items()}
+            rows = next(self.collection.aggregate([match_stage, {"$facet": facets}]), {})
+
+        panels = {name: FORMATTERS[name](rows.get(name, [])) for name in PANELS}
+        panels["network"] = self.network(filters, limits)
+        return panels
@@ -0,0 +1,131 @@
+"""
+Co-authorship graph queries.
+The preferred path reads the adjacency index built at ETL time by
+S2_ApacheAnalysis/build_network.py (integer author ids, per-cell node and edge weights):
+the top nodes are chosen first, then only the edges between them are summed, and names
+are resolved for the returned ids only. When the index is not built, the same pruning
+runs as a live aggregation over fact_publications, with pair generation done server-side.
+Either way the response size is bounded by max_nodes / max_links.
+"""
+import cube
+from aci_common.warehouse import AUTHOR_COLLECTION, NODE_COLLECTION, EDGE_COLLECTION
+
+DEFAULT_MAX_NODES = 100
+DEFAULT_MAX_LINKS = 300
+MAX_NODES_LIMIT = 2000
+MAX_LINKS_LIMIT = 10000
+
+def is_built(db):
+    return db[cube.META_COLLECTION].find_one({"_id": "network"}, {"_id": 1}) is not None
+
+def parse_limits(args):
+    """Reads max_nodes / max_links / min_weight from the query string, clamped to safe bounds"""
+    def read_int(name, default, upper):
+        try:
+            value = int(args.get(name, default))
+        except (TypeError, ValueError):
+            value = default
+        return max(1, min(value, upper))
+
+    return {
+        "max_nodes": read_int("max_nodes", DEFAULT_MAX_NODES, MAX_NODES_LIMIT),
+        "max_links": read_int("max_links", DEFAULT_MAX_LINKS, MAX_LINKS_LIMIT),
+        "min_weight": read_int("min_weight", 1, MAX_LINKS_LIMIT),
+    }
+
+# The graph queries are built here and run by the backends (sync below, async in async_mongo_backend.py)
+def indexed_nodes_pipeline(match_stage, max_nodes):
+    return [
+        match_stage,
+        {"$group": {"_id": "$a", "value": {"$sum": "$w"}}},
+        {"$sort": {"value": -1, "_id": 1}},
+        {"$limit": max_nodes}
+    ]
+
+def indexed_links_pipeline(match_stage, ids, min_weight, max_links):
+    return [
+        {"$match": {**match_stage["$match"], "a": {"$in": ids}, "b": {"$in": ids}}},
+        {"$group": {"_id": {"a": "$a", "b": "$b"}, "value": {"$sum": "$w"}}},
+        {"$match": {"value": {"$gte": min_weight}}},
+        {"$sort": {"value": -1}},
+        {"$limit": max_links}
+    ]
+
+def indexed_response(node_rows, link_rows, names):
+    return {
+        "nodes": [{"id": names[row["_id"]], "value": row["value"]} for row in node_rows],
+        "links": [{"source": names[row["_id"]["a"]], "target": names[row["_id"]["b"]], "value": row["value"]}
+                  for row in link_rows]
+    }
+
+def indexed_graph(db, match_stage, max_nodes, max_links, min_weight):
+    node_rows = list(db[NODE_COLLECTION].aggregate(indexed_nodes_pipeline(match_stage, max_nodes)))
+    ids = [row["_id"] for row in node_rows]
+    if not ids:
+        return {"nodes": [], "links": []}
+
+    link_rows = list(db[EDGE_COLLECTION].aggregate(indexed_links_pipeline(match_stage, ids, min_weight, max_links)))
+    names = {doc["_id"]: doc["name"] for doc in db[AUTHOR_COLLECTION].find({"_id": {"$in": ids}})}
+    return indexed_response(node_rows, link_rows, names)
+
+# Cleaned, per-paper unique author list (same rules as the ETL: trimmed, no newlines, no 'Unknown')
+CLEAN_AUTHORS_STAGE = {"$project": {"authors": {"$setUnion": [{"$filter": {
+    "input": {"$map": {
+        "input": {"$ifNull": ["$authors_clean", []]},
+        "as": "a",
+        "in": {"$replaceAll": {"input": {"$trim": {"input": "$$a"}}, "find": "\n", "replacement": ""}}
+    }},
+    "as": "a",
+    "cond": {"$and": [{"$ne": ["$$a", ""]}, {"$ne": ["$$a", "Unknown"]}]}
+}}]}}}
+
+def pair_stages(names, min_weight, max_links):
+    """Unordered author pairs per paper, restricted to the kept nodes, summed into weighted links"""
+    return [
+        CLEAN_AUTHORS_STAGE,
+        {"$project": {"authors": {"$filter": {"input": "$authors", "as": "a", "cond": {"$in": ["$$a", names]}}}}},
+        {"$match": {"authors.1": {"$exists": True}}},
+        {"$project": {"authors": 1, "pos": {"$range": [0, {"$size": "$authors"}]}}},
+        {"$unwind": "$pos"},
+        {"$project": {
+            "a": {"$arrayElemAt": ["$authors", "$pos"]},
+            "b": {"$slice": ["$authors", {"$add": ["$pos", 1]}, {"$size": "$authors"}]}
+        }},
+        {"$unwind": "$b"},
+        {"$group": {"_id": {"a": {"$min": ["$a", "$b"]}, "b": {"$max": ["$a", "$b"]}}, "value": {"$sum": 1}}},
+        {"$match": {"value": {"$gte": min_weight}}},
+        {"$sort": {"value": -1}},
+        {"$limit": max_links}
+    ]
+
+def live_nodes_pipeline(match_stage, max_nodes):
+    return [
+        match_stage,
+        CLEAN_AUTHORS_STAGE,
+        {"$unwind": "$authors"},
+        {"$group": {"_id": "$authors", "value": {"$sum": 1}}},
+        {"$sort": {"value": -1, "_id": 1}},
+        {"$limit": max_nodes}
+    ]
+
+def live_response(node_rows, link_rows):
+    return {
+        "nodes": [{"id": row["_id"], "value": row["value"]} for row in node_rows],
+        "links": [{"source": row["_id"]["a"], "target": row["_id"]["b"], "value": row["value"]} for row in link_rows]
+    }
+
+def live_graph(collection, match_stage, max_nodes, max_links, min_weight):
+    node_rows = list(collection.aggregate(live_nodes_pipeline(match_stage, max_nodes)))
+    names = [row["_id"] for row in node_rows]
+    if not names:
+        return {"nodes": [], "links": []}
+
+    # Pairs are only generated between the kept nodes, so the expansion stays bounded
+    link_rows = list(collection.aggregate([match_stage] + pair_stages(names, min_weight, max_links)))
+    return live_response(node_rows, link_rows)
+
+def coauthor_graph(db, collection, match_stage, limits):
+    """Top-k co-authorship graph for one filter set: {"nodes": [...], "links": [...]}"""
+    if cube.covers(match_stage) and is_built(db):
+        return indexed_graph(db, match_stage, **limits)
+    return live_graph(collection, match_stage, **limits)
@@ -0,0 +1,215 @@
+"""
+Parquet query backend: answers the KPI/OLAP routes straight from the partitioned warehouse
+the Spark ETL writes (hdfs_data/date_pub=*/country=*/part-*.parquet, see
+S2_ApacheAnalysis/warehouse_layout.py), without MongoDB.
+DuckDB is used as an embedded columnar engine: filters on the partition columns skip whole
+directories, row groups are skipped on their min/max statistics, only the referenced columns
+are read, and the aggregations are vectorized.
+Every method returns exactly the same payloads as MongoBackend.
+"""
+import os
+import glob
+import hashlib
+import threading
+import metrics
+
+# Filterable columns (the keys build_filters() produces); anything else is rejected
+FILTER_COLUMNS = ("date_pub", "country", "quartile", "source")
+SEARCH_COLUMNS = ("article_id", "title", "abstract_", "generated_keywords",
+                  "date_pub", "country", "quartile", "source", "etl_timestamp")
+
+# Cleaned, per-paper unique author list (same rules as the Mongo pipelines)
+CLEAN_AUTHORS = """list_distinct(list_filter(
+    list_transform(coalesce(authors_clean, []), a -> replace(trim(a), chr(10), '')),
+    a -> a <> '' AND a <> 'Unknown'))"""
+
+class ParquetBackend:
+    name = "parquet"
+
+    def __init__(self, path):
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError("The parquet backend needs DuckDB: pip install duckdb")
+        if not os.path.isdir(path):
+            raise RuntimeError(f"Parquet warehouse not found: {path}")
+
+        self.path = os.path.abspath(path)
+        # Partition values stay strings whatever the layout (date_pub=2023 is the string '2023')
+        self.source = (f"read_parquet('{os.path.join(self.path, '**', '*.parquet')}', "
+                       f"hive_partitioning = true, hive_types_autocast = false, union_by_name = true)")
+        self.con = duckdb.connect(database=":memory:")
+        self._local = threading.local()
+        self._version = (None, None)  # (marker mtime, content version)
+
+    def cursor(self):
+        """DuckDB connections are not shared across threads: one cursor per request thread"""
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._local.cursor = self.con.cursor()
+        return cur
+
+    def query(self, sql, params=()):
+        with metrics.timed_query("duckdb", sql):
+            cur = self.cursor().execute(sql, list(params))
+            columns = [d[0] for d in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def where(self, filters, extra=None):
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Unsupported filter: {column}")
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        if extra:
+            clauses.append(extra)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def files_mtime(self):
+        """Spark rewrites _SUCCESS at the end of every job; fall back to the newest file"""
+        marker = os.path.join(self.path, "_SUCCESS")
+        if os.path.exists(marker):
+            return os.path.getmtime(marker)
+        files = glob.glob(os.path.join(self.path, "**", "*.parquet"), recursive=True)
+        return max((os.path.getmtime(f) for f in files), default=None)
+
+    def version(self):
+        """
+        Content version, same definition as S2_ApacheAnalysis/warehouse_meta.py (row count + sum of
+        content_hash), so an ETL re-run over the same articles keeps the API cache. It is only
+        recomputed when the files change; older trees without content_hash fall back to the mtime.
+        """
+        mtime = self.files_mtime()
+        if self._version[0] == mtime:
+            return self._version[1]
+        try:
+            row = self.query(f"SELECT count(*) AS n, coalesce(sum(content_hash::HUGEINT), 0) AS total, "
+                             f"count(content_hash) AS hashed FROM {self.source}")[0]
+            digest = f"{row['n']}:{row['total'] % (1 << 64)}"
+            version = hashlib.sha1(digest.encode()).hexdigest()[:16] if row["hashed"] == row["n"] else mtime
+        except Exception:
+            version = mtime
+        self._version = (mtime, version)
+        return version
+
+    def filter_options(self):
+        years = [r["v"] for r in self.query(f"SELECT DISTINCT date_pub AS v FROM {self.source}")]
+        countries = [r["v"] for r in self.query(f"SELECT DISTINCT country AS v FROM {self.source}")]
+        years = [y for y in years if y and y != "Unknown"]
+        countries = [c for c in countries if c]
+        return {"years": sorted(years), "countries": sorted(countries)}
+
+    def panel(self, name, filters):
+        where, params = self.where(filters)
+
+        if name == "kpi":
+            rows = self.query(f"""
+                SELECT count(*) AS total_pubs,
+                       coalesce(sum(citations), 0) AS total_citations,
+                       CASE WHEN count(*) = 0 THEN 0 ELSE avg(impact_score) END AS avg_impact,
+                       coalesce(sum(nb_authors), 0) AS total_authors
+                FROM {self.source}{where}""", params)
+            return rows[0]
+
+        if name == "time":
+            return self.query(f"""
+                SELECT date_pub AS _id, count(*) AS count, avg(impact_score) AS avg_impact
+                FROM {self.source}{where}
+                GROUP BY date_pub ORDER BY date_pub NULLS FIRST""", params)
+
+        if name == "geo":
+            where, params = self.where(filters, "country IS NOT NULL AND country <> ''")
+            return self.query(f"""
+                SELECT country AS id, count(*) AS value
+                FROM {self.source}{where}
+                GROUP BY country ORDER BY value DESC""", params)
+
+        if name == "quartile":
+            return self.query(f"""
+                SELECT quartile AS _id, count(*) AS count
+                FROM {self.source}{where}
+                GROUP BY quartile""", params)
+
+        if name == "keywords":
+            return self.query(f"""
+                SELECT CAST(kw AS VARCHAR) AS text, count(*) AS weight
+                FROM (SELECT unnest(generated_keywords) AS kw FROM {self.source}{where})
+                GROUP BY kw ORDER BY weight DESC LIMIT 50""", params)
+
+        if name == "authors":
+            return self.query(f"""
+                SELECT author AS _id, count(*) AS count
+                FROM (SELECT trim(unnest(authors_clean), chr(10) || ' ') AS author FROM {self.source}{where})
+                WHERE author <> 'Unknown'
+                GROUP BY author ORDER BY count DESC LIMIT 20""", params)
+
+        raise ValueError(f"Unknown panel: {name}")
+
+    def network(self, filters, limits):
+        where, params = self.where(filters)
+        papers = f"SELECT row_number() OVER () AS pid, {CLEAN_AUTHORS} AS authors FROM {self.source}{where}"
+
+        node_rows = self.query(f"""
+            SELECT a AS id, count(*) AS value
+            FROM (SELECT unnest(authors) AS a FROM ({papers}))
+            GROUP BY a ORDER BY value DESC, a LIMIT ?""", params + [limits["max_nodes"]])
+        names = [row["id"] for row in node_rows]
+        if not names:
+            return {"nodes": [], "links": []}
+
+        # Pairs are only generated between the kept nodes, so the self-join stays bounded
+        link_rows = self.query(f"""
+            WITH pa AS (
+                SELECT pid, a FROM (SELECT pid, unnest(authors) AS a FROM ({papers}))
+                WHERE list_contains(?, a)
+            )
+            SELECT x.a AS source, y.a AS target, count(*) AS value
+            FROM pa x JOIN pa y ON x.pid = y.pid AND x.a < y.a
+            GROUP BY x.a, y.a
+            HAVING count(*) >= ?
+            ORDER BY value DESC LIMIT ?""", params + [names, limits["min_weight"], limits["max_links"]])
+
+        return {"nodes": node_rows, "links": link_rows}
+
+    def search_documents(self, since=None):
+        """Rows for the search index (search.py); older trees may lack some columns"""
+        available = {row["column_name"] for row in self.query(f"DESCRIBE SELECT * FROM {self.source}")}
+        columns = ", ".join(c for c in SEARCH_COLUMNS if c in available)
+        if since is not None and "etl_timestamp" in available:
+            return self.query(f"SELECT {columns} FROM {self.source} WHERE etl_timestamp > ?", [since])
+        return self.query(f"SELECT {columns} FROM {self.source}")
+
+    def fact_rows(self, fields):
+        """Every fact row, projected on `fields` (in-memory mode, memory_backend.py)"""
+        available = {row["column_name"] for row in self.query(f"DESCRIBE SELECT * FROM {self.source}")}
+        columns = ", ".join(f for f in fields if f in available)
+        return self.query(f"SELECT {columns} FROM {self.source}")
+
+    def keyword_drilldown(self, keyword, filters, limit):
+        """Same payload as keywords.drilldown(); list_contains() on generated_keywords"""
+        keyword = " ".join(word.capitalize() for word in keyword.split())
+        where, params = self.where(filters, "list_contains(generated_keywords, ?)")
+        params = params + [keyword]
+
+        def breakdown(column):
+            return self.query(f"""
+                SELECT {column} AS _id, count(*) AS count FROM {self.source}{where}
+                GROUP BY {column} ORDER BY count DESC, {column}""", params)
+
+        papers = self.query(f"""
+            SELECT title, date_pub, country, quartile, source, citations FROM {self.source}{where}
+            ORDER BY citations DESC NULLS LAST LIMIT ?""", params + [limit])
+        by_year = breakdown("date_pub")
+        return {
+            "keyword": keyword,
+            "total": sum(row["count"] for row in by_year),
+            "by_year": by_year,
+            "by_country": [row for row in breakdown("country") if row["_id"]],
+            "papers": papers
+        }
+
+    def dashboard(self, filters, limits):
+        panels = {name: self.panel(name, filters) for name in ("kpi", "time", "geo", "quartile", "keywords", "authors")}
+        panels["network"] = self.network(filters, limits)
+        return panels
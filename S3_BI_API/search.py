@@ -0,0 +1,421 @@
+"""
+Full-text search over the warehouse: an in-process inverted index, BM25-ranked,
+with prefix matching on the last query word for search-as-you-type.
+
+The index is persisted as immutable segments (search_index/seg-*): a sorted vocabulary, plus
+the postings and the document table as flat files that are memory-mapped, not loaded, at startup.
+Every ETL run adds one small segment with the rows written since the last refresh; their
+previous versions are tombstoned in the manifest. When most of the index would be rewritten
+anyway, it is rebuilt as one fresh segment.
+When several worker processes share the directory, one of them refreshes it at a time
+(file lock) and the others load its manifest.
+"""
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import time
+import heapq
+import shutil
+import bisect
+import threading
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the single-process dev server runs there
+    fcntl = None
+
+# --- CONFIGURATION ---
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2              # Title terms count twice (keywords and abstract once)
+PREFIX_EXPANSIONS = 20       # Most frequent completions scored for the last query word
+MAX_SEGMENTS = 8             # More than this and the next refresh rebuilds one segment
+REBUILD_RATIO = 0.5          # Same when the refresh would replace half the documents
+VERSION_CHECK_SECONDS = 5
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "with", "in", "on", "at", "to", "from", "by", "as", "is",
+    "are", "be", "its", "it", "this", "that", "these", "their", "we", "our", "via", "vs"
+}
+TOKEN_RE = re.compile(r"[^\W_]+")
+RESULT_FIELDS = ("title", "date_pub", "country", "quartile", "source")
+
+# --- TEXT ANALYSIS (same plural folding as the ETL keywords) ---
+def stem(word):
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("s") and len(word) > 3:
+        return word[:-1]
+    return word
+
+def words(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+def analyze(text):
+    return [stem(w) for w in words(text) if w not in STOPWORDS]
+
+def document_terms(doc):
+    terms = Counter()
+    for _ in range(TITLE_BOOST):
+        terms.update(analyze(doc.get("title")))
+    terms.update(analyze(" ".join(doc.get("generated_keywords") or [])))
+    abstract = doc.get("abstract_")
+    if abstract and abstract != "N/A":
+        terms.update(analyze(abstract))
+    return terms
+
+def document_key(doc):
+    """Stable id of a warehouse row across ETL runs"""
+    return str(doc.get("article_id") or doc.get("_id") or f"{doc.get('title')}|{doc.get('date_pub')}")
+
+# --- SEGMENTS ---
+class Segment:
+    """
+    One immutable, memory-mapped piece of the index. Files:
+      terms.json     sorted vocabulary, document frequencies, postings offsets (loaded)
+      postings.bin   uint32 [doc, tf, doc, tf, ...] per term
+      lengths.bin    uint32 token count per document (BM25 length normalization)
+      docs.bin       one JSON record per document (key + RESULT_FIELDS), concatenated
+      docs.idx       uint64 byte offsets of the records in docs.bin, len(docs) + 1 entries
+      keys.json      document keys, read only when a snapshot is built
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "terms.json"), encoding="utf-8") as f:
+            vocab = json.load(f)
+        self.terms = vocab["terms"]                     # sorted: prefix lookups are a bisect
+        self.df = vocab["df"]
+        self.offsets = vocab["offsets"]                 # in postings, len(terms) + 1 entries
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+
+        self._maps = []
+        self.postings_view = self._map("postings.bin", "I")
+        self.lengths = self._map("lengths.bin", "I")
+        self.doc_offsets = self._map("docs.idx", "Q")
+        self.doc_blob = self._map("docs.bin", "B")
+        self.size = len(self.lengths)
+        self.total_length = sum(self.lengths)
+
+    def _map(self, name, typecode):
+        """Read-only view of a segment file as an array of `typecode` items"""
+        f = open(os.path.join(self.path, name), "rb")
+        if not os.fstat(f.fileno()).st_size:
+            self._maps.append((f, None))
+            return memoryview(b"").cast(typecode)  # an empty warehouse: nothing to map
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append((f, m))
+        return memoryview(m).cast(typecode)
+
+    def doc(self, local_id):
+        """Decodes one document record from the mapped table"""
+        start, end = self.doc_offsets[local_id], self.doc_offsets[local_id + 1]
+        return json.loads(bytes(self.doc_blob[start:end]))
+
+    def keys(self):
+        with open(os.path.join(self.path, "keys.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def postings(self, term):
+        i = self.term_ids.get(term)
+        if i is None:
+            return ()
+        view = self.postings_view[2 * self.offsets[i]:2 * self.offsets[i + 1]]
+        return zip(view[0::2], view[1::2])
+
+    def completions(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + "\uffff")
+        return zip(self.terms[start:end], self.df[start:end])
+
+    def close(self):
+        for view in (self.postings_view, self.lengths, self.doc_offsets, self.doc_blob):
+            view.release()
+        for f, m in self._maps:
+            if m is not None:
+                m.close()
+            f.close()
+
+    @staticmethod
+    def write(path, docs):
+        """docs: rows from the backend; writes the segment files into `path`"""
+        inverted, keys = {}, []
+        lengths, doc_offsets, blob = array("I"), array("Q", [0]), bytearray()
+        for local_id, doc in enumerate(docs):
+            terms = document_terms(doc)
+            for term, tf in terms.items():
+                inverted.setdefault(term, []).append((local_id, tf))
+            key = document_key(doc)
+            record = {"key": key, **{field: doc.get(field) for field in RESULT_FIELDS}}
+            blob += json.dumps(record, ensure_ascii=False, default=str).encode("utf-8")
+            doc_offsets.append(len(blob))
+            lengths.append(sum(terms.values()))
+            keys.append(key)
+
+        terms = sorted(inverted)
+        postings, offsets = array("I"), [0]
+        for term in terms:
+            for local_id, tf in inverted[term]:
+                postings.extend((local_id, tf))
+            offsets.append(len(postings) // 2)
+
+        os.makedirs(path)
+        for name, data in (("postings.bin", postings), ("lengths.bin", lengths), ("docs.idx", doc_offsets)):
+            with open(os.path.join(path, name), "wb") as f:
+                data.tofile(f)
+        with open(os.path.join(path, "docs.bin"), "wb") as f:
+            f.write(blob)
+        with open(os.path.join(path, "keys.json"), "w", encoding="utf-8") as f:
+            json.dump(keys, f, ensure_ascii=False)
+        with open(os.path.join(path, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump({"terms": terms, "df": [len(inverted[t]) for t in terms], "offsets": offsets}, f)
+        return len(keys)
+
+class IndexState:
+    """Immutable snapshot searched by requests; refreshes swap in a new one"""
+    def __init__(self, segments, deleted, high_water):
+        self.segments = segments
+        self.deleted = deleted                          # one set of tombstoned local ids per segment
+        self.high_water = high_water
+        self.live_docs = sum(s.size - len(d) for s, d in zip(segments, deleted))
+        total_length = sum(s.total_length for s in segments)
+        total_docs = sum(s.size for s in segments)
+        self.avg_length = total_length / total_docs if total_docs else 0.0
+        self.locations = {}                             # document key -> (segment, local id), newest wins
+        for si, (segment, dead) in enumerate(zip(segments, deleted)):
+            for local_id, key in enumerate(segment.keys()):
+                if local_id not in dead:
+                    self.locations[key] = (si, local_id)
+
+@contextmanager
+def refresh_lock(directory):
+    """Exclusive across the processes sharing `directory`; yields False when another one holds it"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# --- INDEX ---
+class SearchIndex:
+    def __init__(self, directory):
+        self.directory = directory
+        self.state = IndexState([], [], None)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._version = None
+        self._last_version_check = 0.0
+        self.load()
+
+    # Persistence
+    def manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def load(self):
+        if not os.path.exists(self.manifest_path()):
+            return
+        try:
+            with open(self.manifest_path(), encoding="utf-8") as f:
+                manifest = json.load(f)
+            segments = [Segment(os.path.join(self.directory, name)) for name in manifest["segments"]]
+        except FileNotFoundError:
+            # Replaced by another worker meanwhile (or written in an older layout):
+            # the next version check loads or rebuilds it
+            return
+        deleted = [set(manifest["deleted"].get(name, [])) for name in manifest["segments"]]
+        with self._lock:
+            self.state = IndexState(segments, deleted, manifest.get("high_water"))
+            self._version = manifest.get("version")
+
+    def save_manifest(self, names, deleted, high_water, version):
+        tmp_path = self.manifest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "segments": names,
+                "deleted": {name: sorted(dead) for name, dead in zip(names, deleted) if dead},
+                "high_water": high_water,
+                "version": version,
+                "saved_at": datetime.now().isoformat()
+            }, f)
+        os.replace(tmp_path, self.manifest_path())
+
+    # Updates
+    def refresh(self, backend, rebuild=False):
+        """
+        Brings the index up to date with the backend's warehouse.
+        Incremental: rows written after the index high-water mark go into a new segment and
+        replace their previous versions. Returns the number of documents indexed.
+        """
+        state = self.state
+        version = str(backend.version())  # compared as stored in the manifest
+        since = None if rebuild or state.high_water is None else datetime.fromisoformat(state.high_water)
+        docs = list(backend.search_documents(since))
+
+        if since is not None and not docs:
+            self._version = version
+            return 0
+        if since is not None and (len(state.segments) >= MAX_SEGMENTS or len(docs) > REBUILD_RATIO * state.live_docs):
+            return self.refresh(backend, rebuild=True)
+
+        timestamps = [d["etl_timestamp"] for d in docs if d.get("etl_timestamp") is not None]
+        high_water = max(timestamps).isoformat() if timestamps else state.high_water
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"seg-{time.time_ns()}"
+        Segment.write(os.path.join(self.directory, name), docs)
+        segment = Segment(os.path.join(self.directory, name))
+
+        if since is None:
+            segments, deleted = [segment], [set()]
+        else:
+            deleted = [set(dead) for dead in state.deleted] + [set()]
+            for key in segment.keys():
+                location = state.locations.get(key)
+                if location:
+                    deleted[location[0]].add(location[1])
+            segments = state.segments + [segment]
+
+        names = [os.path.basename(s.path) for s in segments]
+        self.save_manifest(names, deleted, high_water, version)
+        with self._lock:
+            self.state = IndexState(segments, deleted, high_water)
+            self._version = version
+
+        if since is None:
+            self.remove_unused(names, state.segments)
+        return len(docs)
+
+    def remove_unused(self, names, old_segments):
+        """Drops the files of replaced segments (requests still holding the old snapshot keep their mmap)"""
+        for segment in old_segments:
+            if os.path.basename(segment.path) not in names:
+                shutil.rmtree(segment.path, ignore_errors=True)
+
+    def refresh_if_stale(self, backend):
+        """Polls the warehouse version every few seconds; a change refreshes the index in the background"""
+        now = time.monotonic()
+        if now - self._last_version_check < VERSION_CHECK_SECONDS:
+            return
+        self._last_version_check = now
+        try:
+            if str(backend.version()) == self._version:
+                return
+        except Exception as e:
+            print(f"⚠️ Search: could not read warehouse version: {e}", file=sys.stderr)
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, args=(backend,), daemon=True).start()
+
+    def _background_refresh(self, backend):
+        try:
+            with refresh_lock(self.directory) as owner:
+                if not owner:
+                    return  # another worker is refreshing: a later version check loads its manifest
+                # Another worker may have refreshed already: start from what is on disk
+                self.load()
+                if self._version == str(backend.version()):
+                    print("✅ Search index loaded from disk")
+                    return
+                count = self.refresh(backend)
+            print(f"✅ Search index refreshed ({count} documents)")
+        except Exception as e:
+            print(f"❌ Search index refresh failed: {e}", file=sys.stderr)
+        finally:
+            self._refreshing = False
+
+    # Queries
+    def expand(self, state, prefix):
+        """Most frequent indexed terms starting with `prefix` (frequencies include tombstoned documents)"""
+        df = Counter()
+        for segment in state.segments:
+            for term, n in segment.completions(prefix):
+                df[term] += n
+        return [term for term, _ in df.most_common(PREFIX_EXPANSIONS)]
+
+    def search(self, query, filters=None, limit=DEFAULT_LIMIT, prefix=True):
+        """
+        BM25 over title / keywords / abstract. With prefix=True, the last word of the query
+        (unless followed by a space) also matches the terms it begins.
+        """
+        state = self.state
+        terms = analyze(query)
+        last = words(query)[-1:]
+        if prefix and last and last[0] not in STOPWORDS and not query.endswith(" "):
+            terms += self.expand(state, last[0])
+        terms = list(dict.fromkeys(terms))
+
+        scores = Counter()
+        n_docs = state.live_docs
+        for term in terms:
+            # Live postings only, so that df counts the same documents as n_docs
+            live = [
+                (si, local_id, tf)
+                for si, (segment, dead) in enumerate(zip(state.segments, state.deleted))
+                for local_id, tf in segment.postings(term) if local_id not in dead
+            ]
+            if not live:
+                continue
+            df = len(live)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for si, local_id, tf in live:
+                norm = 1 - BM25_B + BM25_B * state.segments[si].lengths[local_id] / state.avg_length
+                scores[(si, local_id)] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+        def matches(loc):
+            doc = state.segments[loc[0]].doc(loc[1])
+            return all(doc.get(field) == value for field, value in filters.items())
+
+        hits = [(score, loc) for loc, score in scores.items() if not filters or matches(loc)]
+        top = heapq.nlargest(limit, hits)
+        results = []
+        for score, (si, local_id) in top:
+            doc = state.segments[si].doc(local_id)
+            results.append({"id": doc["key"], "score": round(score, 4), **{f: doc.get(f) for f in RESULT_FIELDS}})
+        return {"query": query, "total": len(hits), "results": results}
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """Indexed terms completing the last word of `prefix`, most frequent first"""
+        last = words(prefix)
+        return self.expand(self.state, last[-1])[:limit] if last else []
+
+    def stats(self):
+        state = self.state
+        return {
+            "segments": len(state.segments),
+            "documents": state.live_docs,
+            "deleted": sum(len(d) for d in state.deleted),
+            "terms": sum(len(s.terms) for s in state.segments),
+            "high_water": state.high_water,
+            "refreshing": self._refreshing
+        }
+
+def parse_limit(args):
+    try:
+        value = int(args.get("limit", DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        value = DEFAULT_LIMIT
+    return max(1, min(value, MAX_LIMIT))
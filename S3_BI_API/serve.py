@@ -0,0 +1,54 @@
+"""
+Server launcher of the BI API, configured from the environment (config.py):
+    SERVER=gunicorn   WEB_CONCURRENCY worker processes x SERVER_THREADS threads (WSGI, app.py)
+    SERVER=asgi       WEB_CONCURRENCY uvicorn workers, async OLAP routes (asgi.py)
+    SERVER=dev        Flask's development server (FLASK_DEBUG=1 for the reloader/debugger)
+Workers import the app after the fork, so each one opens its own MongoDB connection pool.
+"""
+import sys
+import config
+
+def run_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    class GunicornServer(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{config.HOST}:{config.PORT}",
+                "workers": config.SERVER_WORKERS,
+                "threads": config.SERVER_THREADS,
+                "worker_class": "gthread",
+                "timeout": config.SERVER_TIMEOUT,
+                "keepalive": 5,
+                "max_requests": config.SERVER_MAX_REQUESTS,
+                "max_requests_jitter": config.SERVER_MAX_REQUESTS // 10,
+                "preload_app": False,  # pymongo clients must not be shared across a fork
+                "accesslog": "-",
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    GunicornServer().run()
+
+def run_asgi():
+    import uvicorn
+    uvicorn.run("asgi:app", host=config.HOST, port=config.PORT, workers=config.SERVER_WORKERS,
+                timeout_keep_alive=5, limit_max_requests=config.SERVER_MAX_REQUESTS or None)
+
+def run_dev():
+    from app import app
+    app.run(host=config.HOST, port=config.PORT, debug=config.DEBUG)
+
+SERVERS = {"gunicorn": run_gunicorn, "asgi": run_asgi, "dev": run_dev}
+
+if __name__ == "__main__":
+    if config.SERVER not in SERVERS:
+        print(f"❌ ERROR: SERVER must be one of {', '.join(SERVERS)} (got '{config.SERVER}')", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Starting {config.SERVER} server on {config.HOST}:{config.PORT} "
+          f"({config.SERVER_WORKERS} workers, backend: {config.QUERY_BACKEND})")
+    SERVERS[config.SERVER]()
@@ -1,8 +1,8 @@
 import { Component, NgZone, OnInit, OnDestroy, ChangeDetectorRef, Inject, PLATFORM_ID, ViewEncapsulation } from "@angular/core"
 import { CommonModule, isPlatformBrowser } from "@angular/common"
 import { FormsModule } from "@angular/forms"
-import { finalize } from "rxjs/operators";
-import { forkJoin } from "rxjs";
+import { finalize, shareReplay } from "rxjs/operators";
+import { Observable } from "rxjs";
 
 // amCharts Imports
 import * as am5 from "@amcharts/amcharts5"
@@ -16,7 +16,7 @@ import am5themes_Animated from "@amcharts/amcharts5/themes/Animated"
 import am5themes_Responsive from "@amcharts/amcharts5/themes/Responsive"
 
 // Import Service and Types
-import { ApiService, KPIData, DataPoint } from "../services/api"
+import { ApiService, KPIData, DataPoint, DashboardData } from "../services/api"
 
 @Component({
   selector: "app-dashboard",
@@ -38,6 +38,10 @@ export class Dashboard implements OnInit, OnDestroy {
   availableYears: string[] = []
   availableCountries: string[] = []
 
+  // One /api/dashboard request per filter set, shared by the KPIs and every tab
+  private dashboardKey = ""
+  private dashboard$?: Observable<DashboardData>
+
   // Injected properties
   private platformId: Object
   private zone: NgZone
@@ -112,9 +116,18 @@ export class Dashboard implements OnInit, OnDestroy {
     this.loadTab(this.currentTab)
   }
 
+  getDashboardData(): Observable<DashboardData> {
+    const key = `${this.selectedYear}|${this.selectedCountry}`
+    if (!this.dashboard$ || this.dashboardKey !== key) {
+      this.dashboardKey = key
+      this.dashboard$ = this.api.getDashboard(this.selectedYear, this.selectedCountry).pipe(shareReplay(1))
+    }
+    return this.dashboard$
+  }
+
   loadKPIs() {
-    this.api.getSummaryKPI(this.selectedYear, this.selectedCountry).subscribe((data) => {
-      if (data) this.kpiData = data
+    this.getDashboardData().subscribe((data) => {
+      if (data) this.kpiData = data.kpi
       // KPI data is light, but good to detect changes just in case
       this.cdr.detectChanges();
     })
@@ -136,9 +149,6 @@ export class Dashboard implements OnInit, OnDestroy {
   }
 
   loadTab(index: number) {
-    const y = this.selectedYear;
-    const c = this.selectedCountry;
-    
     let containerId = "";
     if (index === 1) containerId = "chartdiv";
     else if (index === 2) containerId = "piediv";
@@ -154,60 +164,57 @@ export class Dashboard implements OnInit, OnDestroy {
       // to force the view to update and hide the spinner.
 
       if (index === 1) {
-        this.api.getTimeStats(y, c)
+        this.getDashboardData()
           .pipe(finalize(() => {
              this.isLoading = false;
              this.cdr.detectChanges(); // <--- FIX
           }))
           .subscribe((data) => {
-            this.createBarChart(data);
+            this.createBarChart(data.time);
           });
 
       } else if (index === 2) {
-        this.api.getQuartileStats(y, c)
+        this.getDashboardData()
           .pipe(finalize(() => {
             this.isLoading = false;
             this.cdr.detectChanges(); // <--- FIX
           }))
           .subscribe((data) => {
-            this.createPieChart(data);
+            this.createPieChart(data.quartile);
           });
 
       } else if (index === 3) {
-        forkJoin([
-          this.api.getGeoStats(y, c),
-          this.api.getTopAuthors(y, c)
-        ])
+        this.getDashboardData()
         .pipe(finalize(() => {
           this.isLoading = false;
           this.cdr.detectChanges(); // <--- FIX
         }))
         .subscribe({
-          next: ([geoData, authorData]) => {
-            this.createMap(geoData);
-            this.createHBarChart(authorData);
+          next: (data) => {
+            this.createMap(data.geo);
+            this.createHBarChart(data.authors);
           },
           error: (err) => console.error("Error loading Tab 3 data", err)
         });
 
       } else if (index === 4) {
-        this.api.getKeywordStats(y, c)
+        this.getDashboardData()
           .pipe(finalize(() => {
             this.isLoading = false;
             this.cdr.detectChanges(); // <--- FIX
           }))
           .subscribe((data) => {
-            this.createWordCloud(data);
+            this.createWordCloud(data.keywords);
           });
 
       } else if (index === 5) {
-        this.api.getCoAuthorNetwork(y, c)
+        this.getDashboardData()
           .pipe(finalize(() => {
             this.isLoading = false;
             this.cdr.detectChanges(); // <--- FIX
           }))
           .subscribe((data) => {
-            this.createNetworkGraph(data);
+            this.createNetworkGraph(data.network);
           });
       }
     }, 100);
@@ -25,7 +25,34 @@ export interface DataPoint {
 
 export interface NetworkData {
   nodes: Array<{ id: string, value: number }>;
-  links: Array<{ source: string, target: string }>;
+  links: Array<{ source: string, target: string, value?: number }>;
+}
+
+// Every panel for one filter set, as returned by /api/dashboard
+export interface DashboardData {
+  kpi: KPIData;
+  time: DataPoint[];
+  geo: DataPoint[];
+  quartile: DataPoint[];
+  keywords: DataPoint[];
+  network: NetworkData;
+  authors: DataPoint[];
+}
+
+// One keyword under the current filters, as returned by /api/olap/keywords/<keyword>
+export interface KeywordDrilldown {
+  keyword: string;
+  total: number;
+  by_year: DataPoint[];
+  by_country: DataPoint[];
+  papers: Array<{ title: string, date_pub: string, country: string, quartile: string, source: string, citations: number }>;
+}
+
+// /api/search (BM25 over titles, keywords and abstracts)
+export interface SearchResults {
+  query: string;
+  total: number;
+  results: Array<{ id: string, score: number, title: string, date_pub: string, country: string, quartile: string, source: string }>;
 }
 
 @Injectable({
@@ -47,6 +74,11 @@ export class ApiService {
     return this.http.get<FilterOptions>(`${this.baseUrl}/filters/options`);
   }
 
+  // Single round trip for all panels: preferred over the per-panel calls below
+  getDashboard(year: string = 'All', country: string = 'All'): Observable<DashboardData> {
+    return this.http.get<DashboardData>(`${this.baseUrl}/dashboard`, { params: this.getParams(year, country) });
+  }
+
   getSummaryKPI(year: string = 'All', country: string = 'All'): Observable<KPIData> {
     return this.http.get<KPIData>(`${this.baseUrl}/kpi/summary`, { params: this.getParams(year, country) });
   }
@@ -67,6 +99,19 @@ export class ApiService {
     return this.http.get<DataPoint[]>(`${this.baseUrl}/olap/keywords`, { params: this.getParams(year, country) });
   }
 
+  getKeywordDrilldown(keyword: string, year: string, country: string): Observable<KeywordDrilldown> {
+    return this.http.get<KeywordDrilldown>(`${this.baseUrl}/olap/keywords/${encodeURIComponent(keyword)}`, { params: this.getParams(year, country) });
+  }
+
+  search(query: string, year: string = 'All', country: string = 'All', limit: number = 10): Observable<SearchResults> {
+    const params = this.getParams(year, country).set('q', query).set('limit', limit);
+    return this.http.get<SearchResults>(`${this.baseUrl}/search`, { params });
+  }
+
+  suggest(prefix: string): Observable<string[]> {
+    return this.http.get<string[]>(`${this.baseUrl}/search/suggest`, { params: new HttpParams().set('q', prefix) });
+  }
+
   getCoAuthorNetwork(year: string, country: string): Observable<NetworkData> {
     return this.http.get<NetworkData>(`${this.baseUrl}/olap/network`, { params: this.getParams(year, country) });
   }
@@ -0,0 +1,2 @@
+# Code shared by the pipeline stages, installed in each of them: pip install ./aci_common
+# (S1_DataCollecting scrapers, S2_ApacheAnalysis ETL and S3_BI_API images).
@@ -0,0 +1,50 @@
+import os
+import gzip
+import json
+
+EXPORT_BATCH_SIZE = 1000
+
+def output_format(path):
+    """'.ndjson' / '.jsonl' -> one document per line, anything else -> JSON array ('.gz' compresses either)"""
+    base = path[:-3] if path.endswith(".gz") else path
+    return "ndjson" if base.endswith((".ndjson", ".jsonl")) else "json"
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+def export_cursor(cursor, path, fmt=None):
+    """
+    Streams a Mongo cursor to disk one document at a time, so memory stays constant
+    whatever the collection size. The file is written next to `path` and renamed at the end,
+    so readers never see a half-written export (nor a leftover one after an error). Returns the number of documents written.
+    """
+    fmt = fmt or output_format(path)
+    tmp_path = f"{path}.tmp"
+    count = 0
+
+    try:
+        with open_output(tmp_path, compress=path.endswith(".gz")) as f:
+            if fmt == "json":
+                f.write("[")
+            for doc in cursor:
+                line = json.dumps(doc, ensure_ascii=False, default=str)
+                if fmt == "json":
+                    f.write(("\n" if count == 0 else ",\n") + line)
+                else:
+                    f.write(line + "\n")
+                count += 1
+            if fmt == "json":
+                f.write("\n]\n" if count else "]\n")
+        os.replace(tmp_path, path)
+    finally:
+        # A failed export leaves the previous file as it was, and no partial one next to it
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+def export_collection(collection, path, query=None, projection=None, fmt=None):
+    projection = projection if projection is not None else {"_id": 0}
+    cursor = collection.find(query or {}, projection).batch_size(EXPORT_BATCH_SIZE)
+    return export_cursor(cursor, path, fmt)
@@ -0,0 +1,48 @@
+"""
+Keyword rules of the fact table: the stoplist the Spark ETL applies (S2_ApacheAnalysis/etl_transforms.py)
+and a plain-Python copy of its keyword extraction, for tools that must produce the same keywords
+without Spark (the synthetic warehouse of the API benchmarks). Change both sides together.
+"""
+import re
+
+# Stoplist: English function words + title boilerplate + the crawl keyword itself
+KEYWORD_STOPWORDS = [
+    "a", "an", "the", "and", "or", "but", "nor", "of", "for", "with", "without", "in", "on", "at", "to", "from",
+    "by", "as", "into", "onto", "over", "under", "between", "through", "toward", "towards", "via", "about",
+    "is", "are", "be", "its", "it", "this", "that", "these", "those", "their", "our", "we", "can", "how", "what",
+    "when", "where", "which", "who", "why", "not", "no", "vs", "versus", "based", "using", "use", "approach",
+    "analysis", "study", "paper", "review", "survey", "case", "new", "novel", "framework", "system",
+    "systems", "application", "applications", "perspective", "blockchain", "blockchains"
+]
+KEYWORD_MIN_LENGTH = 3
+
+def tokenize(text):
+    """etl_transforms.tokenize: lowercased, every punctuation / symbol run is a separator"""
+    return re.sub(r"[\W_]+", " ", (text or "").lower()).strip().split(" ")
+
+def stem(word):
+    """etl_transforms.stem: plural folding, "contracts" -> "contract", "policies" -> "policy" """
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("s") and len(word) > KEYWORD_MIN_LENGTH:
+        return word[:-1]
+    return word
+
+def initcap(phrase):
+    return " ".join(w[:1].upper() + w[1:] for w in phrase.split(" "))
+
+def title_keywords(title, stopwords=KEYWORD_STOPWORDS):
+    """etl_transforms.keywords_expr: stemmed unigrams, then bigrams of adjacent kept tokens, in display case"""
+    stopwords = set(stopwords)
+    tokens = tokenize(title)
+
+    def keep(w):
+        return len(w) >= KEYWORD_MIN_LENGTH and w not in stopwords and not re.fullmatch("[0-9]+", w)
+
+    unigrams = [stem(w) for w in tokens if keep(w)]
+    bigrams = [f"{stem(w)} {stem(tokens[i + 1])}" for i, w in enumerate(tokens[:-1]) if keep(w) and keep(tokens[i + 1])]
+    return [initcap(k) for k in dict.fromkeys(unigrams + bigrams)]
@@ -0,0 +1,74 @@
+"""
+MongoDB layout of the warehouse: the collections the ETL (S2_ApacheAnalysis) writes and the BI API
+(S3_BI_API) reads, the cube dimensions, and the fact_publications index specification. The ETL
+creates the indexes after every write; the API ensures the missing ones at startup and reports
+the ones that drifted from this spec.
+"""
+# pymongo.ASCENDING / DESCENDING (this package does not depend on pymongo)
+ASCENDING, DESCENDING = 1, -1
+
+RAW_COLLECTION = "articles"                 # scraped articles (S1_DataCollecting)
+FACT_COLLECTION = "fact_publications"
+META_COLLECTION = "etl_meta"
+
+# Pre-aggregated cells: year x country x quartile x source
+CUBE_COLLECTION = "cube_publications"
+KEYWORD_CUBE_COLLECTION = "cube_keywords"
+AUTHOR_CUBE_COLLECTION = "cube_authors"
+CUBE_DIMENSIONS = ("date_pub", "country", "quartile", "source")
+
+# Co-authorship adjacency index
+AUTHOR_COLLECTION = "network_authors"   # {_id: int id, name}
+NODE_COLLECTION = "network_nodes"       # {<dims>, a: id, w: papers}
+EDGE_COLLECTION = "network_edges"       # {<dims>, a: id, b: id, w: co-authored papers}, a < b
+
+# Keyword inverted index (keyword -> papers)
+POSTINGS_COLLECTION = "keyword_postings"
+
+# The API filters on any combination of year / country / quartile with equality matches:
+# each of the 7 combinations is a prefix of one of the three compound indexes below,
+# and the leading date_pub / country keys also serve distinct() for the filter dropdowns.
+INDEX_SPEC = [
+    ("date_country_quartile", [("date_pub", ASCENDING), ("country", ASCENDING), ("quartile", ASCENDING)]),
+    ("country_quartile", [("country", ASCENDING), ("quartile", ASCENDING)]),
+    ("quartile_date", [("quartile", ASCENDING), ("date_pub", ASCENDING)]),
+    # Multikey: one entry per array element (keyword / author drill-downs)
+    ("generated_keywords", [("generated_keywords", ASCENDING)]),
+    ("authors_clean", [("authors_clean", ASCENDING)]),
+    # Warehouse version lookup and incremental (--since) refreshes
+    ("etl_timestamp", [("etl_timestamp", DESCENDING)]),
+    ("article_id", [("article_id", ASCENDING)]),
+]
+
+INDEX_OPTIONS = {
+    # Upsert key of incremental ETL runs (rows written before article_id existed are skipped)
+    "article_id": {"unique": True, "partialFilterExpression": {"article_id": {"$type": "string"}}},
+}
+
+def ensure_indexes(collection, names=None):
+    """Creates the INDEX_SPEC indexes (all, or only `names`) on fact_publications; returns their names"""
+    created = []
+    for name, keys in INDEX_SPEC:
+        if names is None or name in names:
+            collection.create_index(keys, name=name, **INDEX_OPTIONS.get(name, {}))
+            created.append(name)
+    return created
+
+def index_drift(collection):
+    """
+    fact_publications' indexes against INDEX_SPEC: (names of the missing indexes, one warning per
+    index whose keys or uniqueness differ from the spec).
+    """
+    existing = collection.index_information()
+    missing, warnings = [], []
+    for name, keys in INDEX_SPEC:
+        info = existing.get(name)
+        if info is None:
+            missing.append(name)
+            continue
+        actual = [(field, int(direction)) for field, direction in info["key"]]
+        if actual != list(keys):
+            warnings.append(f"index {name} is on {actual}, the spec says {list(keys)}")
+        if bool(info.get("unique")) != bool(INDEX_OPTIONS.get(name, {}).get("unique")):
+            warnings.append(f"index {name}: unique={bool(info.get('unique'))} differs from the spec")
+    return missing, warnings